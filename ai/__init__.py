@@ -4,9 +4,21 @@ MIRA DRDO - AI Modules Package
 This package contains AI/ML modules for:
 - PDF Advertisement Extraction (pdf_extractor.py)
 - Embedding Generation (embedding_generator.py)
+- Embedding Cache (embedding_cache.py)
+- Binary Embedding Storage (embedding_codec.py)
+- Incremental Embedding Refresh (embedding_refresh.py)
 - Similarity Calculation (similarity_calculator.py)
+- LLM Response Cache (llm_cache.py)
+- Pooled Ollama Client (ollama_client.py)
+- Candidate Pool Preparation (candidate_pool.py)
+- Expert Vector Index (expert_index.py)
+- Distilled W2 Surrogate (score_distiller.py)
 - Relevance Scoring (relevance_scorer.py)
+- Materialized Score Store (score_store.py)
+- Advertisement Batch Scoring (batch_scorer.py)
 - Panel Generation (panel_generator.py)
+- Panel Composition Rules (panel_rules.py)
+- Global Panel Assignment (panel_assignment.py)
 
 These modules work together to:
 1. Generate semantic embeddings for items, experts, and candidates
@@ -19,6 +31,8 @@ from .pdf_extractor import extract_advertisement, AdvertisementExtractor
 
 # Import embedding functions
 from .embedding_generator import (
+    get_embedding_model_name,
+    is_embedding_model_loaded,
     generate_embedding,
     generate_item_embedding,
     generate_expert_embedding,
@@ -26,26 +40,137 @@ from .embedding_generator import (
     generate_item_text,
     generate_expert_text,
     generate_candidate_text,
-    batch_generate_embeddings
+    batch_generate_embeddings,
+    resolve_embeddings
+)
+
+# Import embedding cache
+from .embedding_cache import (
+    EmbeddingCache,
+    init_embedding_cache,
+    get_embedding_cache,
+    get_embedding_cache_stats
+)
+
+# Import binary storage codec
+from .embedding_codec import (
+    encode_embedding,
+    decode_embedding,
+    is_encoded,
+    quantize_int8,
+    int8_cosine_scores,
+    migrate_collection_embeddings
+)
+
+# Import incremental refresh
+from .embedding_refresh import (
+    embedding_fingerprint,
+    embedding_stamp,
+    needs_refresh,
+    refresh_collection_embeddings
+)
+
+# Import LLM response cache
+from .llm_cache import (
+    LLMCache,
+    init_llm_cache,
+    get_llm_cache,
+    get_llm_cache_stats
+)
+
+# Import Ollama client
+from .ollama_client import (
+    OllamaClient,
+    CircuitBreaker,
+    OllamaUnavailableError,
+    Deadline,
+    LATENCY_BUDGET,
+    get_ollama_client,
+    set_ollama_client
 )
 
 # Import similarity functions
 from .similarity_calculator import (
     cosine_similarity,
     batch_cosine_similarity,
+    embeddings_to_matrix,
+    cosine_similarity_matrix,
     llm_similarity,
+    llm_batch_similarity,
     llm_generate_reason,
+    llm_generate_reason_stream,
+    ReasonRestart,
+    cached_llm_score,
+    cross_encoder_similarity,
+    get_cross_encoder_model_name,
+    is_cross_encoder_loaded,
     calculate_expert_item_similarity,
     calculate_expert_candidates_similarity,
     get_ollama_status
 )
 
+# Import candidate pool
+from .candidate_pool import (
+    CandidatePool,
+    update_centroid,
+    apply_candidate_change,
+    rebuild_item_centroid,
+    get_item_candidate_pool
+)
+
+# Import expert index
+from .expert_index import (
+    ExpertIndex,
+    init_expert_index,
+    get_expert_index,
+    retrieve_expert_ids
+)
+
+# Import distilled w2 surrogate
+from .score_distiller import (
+    W2Surrogate,
+    pair_features,
+    init_score_distiller,
+    log_w2_examples,
+    train_w2_surrogate,
+    get_w2_surrogate,
+    surrogate_w2,
+    get_surrogate_status
+)
+
+# Import score store functions
+from .score_store import (
+    init_score_store,
+    save_scores,
+    save_item_scores,
+    get_ranked_scores,
+    load_scored_experts,
+    invalidate_scores,
+    delete_scores
+)
+
+# Import advertisement batch scoring
+from .batch_scorer import score_items
+
 # Import relevance scoring functions
 from .relevance_scorer import (
     calculate_relevance_score,
     batch_calculate_relevance_scores,
+    ScoringBatch,
+    explain_relevance,
+    stream_relevance_reason,
+    prefetch_reasons,
+    reason_handle,
     rank_experts,
-    DEFAULT_WEIGHTS
+    reblend_scores,
+    int8_shortlist,
+    top_per_category,
+    branch_and_bound_w2,
+    llm_usage_summary,
+    DEFAULT_WEIGHTS,
+    LLM_RERANK_TOP,
+    USE_W2_SURROGATE,
+    USE_CROSS_ENCODER
 )
 
 # Import panel generation functions
@@ -55,15 +180,30 @@ from .panel_generator import (
     validate_panel,
     suggest_replacements,
     PANEL_SIZES,
+    PANEL_RULES,
     DEFAULT_PANEL_COMPOSITION
 )
 
+from .panel_rules import (
+    category_rules,
+    parse_rules,
+    check_rules,
+    solve_panel
+)
+
+from .panel_assignment import (
+    assign_panels,
+    MAX_BOARDS_PER_EXPERT
+)
+
 __all__ = [
     # PDF Extraction
     'extract_advertisement',
     'AdvertisementExtractor',
     
     # Embedding Generation
+    'get_embedding_model_name',
+    'is_embedding_model_loaded',
     'generate_embedding',
     'generate_item_embedding',
     'generate_expert_embedding',
@@ -72,21 +212,114 @@ __all__ = [
     'generate_expert_text',
     'generate_candidate_text',
     'batch_generate_embeddings',
+    'resolve_embeddings',
+    
+    # Embedding Cache
+    'EmbeddingCache',
+    'init_embedding_cache',
+    'get_embedding_cache',
+    'get_embedding_cache_stats',
+    
+    # Binary storage
+    'encode_embedding',
+    'decode_embedding',
+    'is_encoded',
+    'quantize_int8',
+    'int8_cosine_scores',
+    'migrate_collection_embeddings',
+    
+    # Embedding Refresh
+    'embedding_fingerprint',
+    'embedding_stamp',
+    'needs_refresh',
+    'refresh_collection_embeddings',
+    
+    # LLM Response Cache
+    'LLMCache',
+    'init_llm_cache',
+    'get_llm_cache',
+    'get_llm_cache_stats',
+    
+    # Ollama Client
+    'OllamaClient',
+    'CircuitBreaker',
+    'OllamaUnavailableError',
+    'Deadline',
+    'LATENCY_BUDGET',
+    'get_ollama_client',
+    'set_ollama_client',
     
     # Similarity Calculation
     'cosine_similarity',
     'batch_cosine_similarity',
+    'embeddings_to_matrix',
+    'cosine_similarity_matrix',
     'llm_similarity',
+    'llm_batch_similarity',
     'llm_generate_reason',
+    'llm_generate_reason_stream',
+    'ReasonRestart',
+    'cached_llm_score',
+    'cross_encoder_similarity',
+    'get_cross_encoder_model_name',
+    'is_cross_encoder_loaded',
     'calculate_expert_item_similarity',
     'calculate_expert_candidates_similarity',
     'get_ollama_status',
     
+    # Candidate Pool
+    'CandidatePool',
+    'update_centroid',
+    'apply_candidate_change',
+    'rebuild_item_centroid',
+    'get_item_candidate_pool',
+    
+    # Distilled W2 Surrogate
+    'W2Surrogate',
+    'pair_features',
+    'init_score_distiller',
+    'log_w2_examples',
+    'train_w2_surrogate',
+    'get_w2_surrogate',
+    'surrogate_w2',
+    'get_surrogate_status',
+    
     # Relevance Scoring
     'calculate_relevance_score',
     'batch_calculate_relevance_scores',
+    'ScoringBatch',
+    'explain_relevance',
+    'stream_relevance_reason',
+    'prefetch_reasons',
+    'reason_handle',
     'rank_experts',
+    'reblend_scores',
+    'int8_shortlist',
+    'top_per_category',
+    'branch_and_bound_w2',
+    'llm_usage_summary',
     'DEFAULT_WEIGHTS',
+    'LLM_RERANK_TOP',
+    'USE_W2_SURROGATE',
+    'USE_CROSS_ENCODER',
+    
+    # Score Store
+    'init_score_store',
+    'save_scores',
+    'save_item_scores',
+    'get_ranked_scores',
+    'load_scored_experts',
+    'invalidate_scores',
+    'delete_scores',
+    
+    # Advertisement Batch Scoring
+    'score_items',
+    
+    # Expert Index
+    'ExpertIndex',
+    'init_expert_index',
+    'get_expert_index',
+    'retrieve_expert_ids',
     
     # Panel Generation
     'generate_optimal_panel',
@@ -94,7 +327,18 @@ __all__ = [
     'validate_panel',
     'suggest_replacements',
     'PANEL_SIZES',
-    'DEFAULT_PANEL_COMPOSITION'
+    'PANEL_RULES',
+    'DEFAULT_PANEL_COMPOSITION',
+    
+    # Panel Composition Rules
+    'category_rules',
+    'parse_rules',
+    'check_rules',
+    'solve_panel',
+    
+    # Global Panel Assignment
+    'assign_panels',
+    'MAX_BOARDS_PER_EXPERT'
 ]
 
 
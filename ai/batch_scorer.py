@@ -0,0 +1,163 @@
+"""
+MIRA DRDO - Advertisement Batch Scoring Module
+
+Scores every item of an advertisement against every expert in one pass:
+- Expert embeddings are resolved, decoded and stacked once
+- w1 for all items comes from one items x experts matrix product
+- w3/w4 come from each item's candidate pool (its stored centroid, or its
+  candidate documents) against the same expert matrix
+- w2 is the same cheap w2 as /calculate without use_llm: distilled or
+  CrossEncoder when enabled (W2_SURROGATE / W2_CROSS_ENCODER), the
+  cosine-based estimate otherwise; an item can be refined with LLM
+  scores afterwards through batch_calculate_relevance_scores
+
+Results have the shape batch_calculate_relevance_scores returns, so they
+are stored, re-blended and turned into panels the same way.
+"""
+
+import time
+from typing import Any, Callable, Dict, List
+import numpy as np
+from .candidate_pool import CandidatePool, get_item_candidate_pool
+from .embedding_generator import generate_item_text, generate_expert_text, resolve_embeddings
+from .similarity_calculator import embeddings_to_matrix, cosine_similarity_matrix
+from .relevance_scorer import (
+    DEFAULT_WEIGHTS,
+    USE_W2_SURROGATE,
+    USE_CROSS_ENCODER,
+    reason_handle,
+    cheap_w2_scores,
+    _safe_expert_texts
+)
+
+
+def score_items(
+    items: List[Dict[str, Any]],
+    experts: List[Dict[str, Any]],
+    weights: Dict[str, float] = None,
+    candidates_fn: Callable[[Dict[str, Any]], List[Dict[str, Any]]] = None,
+    use_cached_embeddings: bool = True,
+    progress_fn: Callable[[Dict[str, Any]], None] = None,
+    use_surrogate: bool = None,
+    use_cross_encoder: bool = None
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Score every item against every expert without LLM calls.
+
+    Args:
+        items: Item documents (e.g. all items of one advertisement)
+        experts: Expert documents
+        weights: Custom weights (missing keys take DEFAULT_WEIGHTS)
+        candidates_fn: Loads the candidate documents of an item that has
+            no stored candidate centroid (default: no candidates)
+        use_cached_embeddings: Whether to use pre-computed embeddings from DB
+        progress_fn: Called after each item with item_id, item_no, done,
+            total, experts_scored, best_score and seconds
+        use_surrogate: w2 from the distilled model (default: W2_SURROGATE setting)
+        use_cross_encoder: w2 from the CrossEncoder (default: W2_CROSS_ENCODER setting)
+
+    Returns:
+        Dictionary of item _id (string) -> score results, each list in the
+        order of experts
+    """
+    weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+    use_surrogate = USE_W2_SURROGATE if use_surrogate is None else use_surrogate
+    use_cross_encoder = USE_CROSS_ENCODER if use_cross_encoder is None else use_cross_encoder
+    if not items or not experts:
+        return {str(item.get('_id', '')): [] for item in items}
+
+    # Expert side: resolved and stacked once for every item
+    expert_embeddings = resolve_embeddings(
+        experts, 'skillEmbedding', generate_expert_text, use_cached_embeddings
+    )
+    expert_matrix, _ = embeddings_to_matrix(expert_embeddings)
+    dim = expert_matrix.shape[1]
+
+    # w1: Item-Expert cosine for every pair in one product
+    item_embeddings = resolve_embeddings(items, 'embedding', generate_item_text, use_cached_embeddings)
+    item_matrix, _ = embeddings_to_matrix(item_embeddings, dim)
+    w1_matrix = cosine_similarity_matrix(item_matrix, expert_matrix).astype(np.float64) * 100
+
+    # Expert texts for the w2 model, built once for every item
+    expert_texts = _safe_expert_texts(experts) if use_surrogate or use_cross_encoder else []
+
+    expert_info = [
+        (str(expert.get('_id', '')), expert.get('name', ''), expert.get('category', ''),
+         expert.get('reason', 'Expert has relevant skills and domain expertise.'))
+        for expert in experts
+    ]
+
+    results = {}
+    started = time.perf_counter()
+    for k, item in enumerate(items):
+        w1 = w1_matrix[k]
+
+        # w2: Distilled or CrossEncoder where enabled, cosine-based estimate otherwise
+        w2 = w1.copy()
+        w2_methods = ['cosine'] * len(experts)
+        if expert_texts:
+            cheap, _ = cheap_w2_scores(
+                generate_item_text(item), expert_texts, w1, use_surrogate, use_cross_encoder
+            )
+            for i, (score, w2_method) in cheap.items():
+                w2[i] = score
+                w2_methods[i] = w2_method
+
+        # w3/w4: Expert-Candidates average cosine from the item's pool
+        pool = get_item_candidate_pool(item)
+        if pool is None and candidates_fn is not None:
+            candidates = candidates_fn(item)
+            if candidates:
+                pool = CandidatePool(candidates, use_cached_embeddings, dim)
+        if pool is not None:
+            w3 = pool.score_experts(expert_matrix)['avg_cosine_scores'] * 100
+            w4 = w3  # LLM disabled for candidates, cosine-based estimate
+        else:
+            w3 = w1  # No candidates: use item-expert scores as proxy
+            w4 = w2
+
+        final_scores = (
+            weights['w1_item_expert_cosine'] * w1 +
+            weights['w2_item_expert_llm'] * w2 +
+            weights['w3_expert_candidates_cosine'] * w3 +
+            weights['w4_expert_candidates_llm'] * w4
+        )
+
+        item_results = []
+        for i, (expert_id, name, category, reason) in enumerate(expert_info):
+            item_results.append({
+                'expert_id': expert_id,
+                'expert_name': name,
+                'category': category,
+                'final_score': round(float(final_scores[i]), 2),
+                'component_scores': {
+                    'w1_item_expert_cosine': round(float(w1[i]), 2),
+                    'w2_item_expert_llm': round(float(w2[i]), 2),
+                    'w3_expert_candidates_cosine': round(float(w3[i]), 2),
+                    'w4_expert_candidates_llm': round(float(w4[i]), 2)
+                },
+                'reason': reason,
+                'reason_handle': reason_handle(item, {'_id': expert_id}, False),
+                'weights_used': weights,
+                'w2_method': w2_methods[i]
+            })
+        results[str(item.get('_id', ''))] = item_results
+
+        if progress_fn is not None:
+            progress_fn({
+                'item_id': str(item.get('_id', '')),
+                'item_no': item.get('itemNo'),
+                'done': k + 1,
+                'total': len(items),
+                'experts_scored': len(item_results),
+                'best_score': round(float(final_scores.max()), 2),
+                'seconds': round(time.perf_counter() - started, 3)
+            })
+
+    return results
+
+
+# Export functions
+__all__ = [
+    'score_items'
+]
@@ -0,0 +1,89 @@
+"""
+MIRA DRDO - Cache Utilities
+
+Shared building blocks for the AI caches:
+- A bounded, thread-safe in-process LRU with hit/miss counters
+- Content hashing of (normalised) text for stable cache keys
+"""
+
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace so formatting-only differences share a cache key."""
+    return re.sub(r'\s+', ' ', text or '').strip()
+
+
+def content_hash(*parts: str) -> str:
+    """
+    SHA-256 hex digest of one or more text parts.
+
+    Parts are normalised and joined with a separator that cannot appear
+    in normalised text, so ('a b', 'c') and ('a', 'b c') hash differently.
+    """
+    joined = '\x1f'.join(normalize_text(part) for part in parts)
+    return hashlib.sha256(joined.encode('utf-8')).hexdigest()
+
+
+class LRUCache:
+    """Bounded least-recently-used mapping, safe to share across request threads."""
+
+    def __init__(self, max_size: int = 4096):
+        self.max_size = max_size
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value (refreshing its recency) or None."""
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            return None
+
+    def put(self, key: str, value: Any) -> None:
+        """Insert a value, evicting the least recently used entry when full."""
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def pop(self, key: str) -> Optional[Any]:
+        """Remove and return a value if present."""
+        with self._lock:
+            return self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        """Size and hit/miss counters."""
+        return {
+            'size': len(self._data),
+            'max_size': self.max_size,
+            'hits': self.hits,
+            'misses': self.misses
+        }
+
+
+# Export
+__all__ = [
+    'normalize_text',
+    'content_hash',
+    'LRUCache'
+]
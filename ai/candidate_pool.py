@@ -0,0 +1,365 @@
+"""
+MIRA DRDO - Candidate Pool Module
+
+This module prepares the candidate side of expert matching once per item:
+- Resolves (or generates) every candidate embedding a single time
+- Stacks them into one normalised float32 matrix
+- Scores all experts against all candidates with one matrix product
+
+The expert x candidate similarity matrix feeds w3/w4 for every expert and,
+at no extra cost, a per-expert list of the best matching candidates.
+
+Each item also stores a running centroid (mean of the normalised candidate
+embeddings) and a candidate count. w3 is the average raw cosine against all
+candidates, clamped to [0, 1]; that average equals the dot product with the
+centroid, so w3 can be computed without reading any candidate documents and
+both paths give the same score.
+"""
+
+from typing import List, Dict, Any, Optional, Tuple
+from datetime import datetime
+import numpy as np
+from .embedding_generator import generate_candidate_text, resolve_embeddings
+from .similarity_calculator import embeddings_to_matrix, cosine_similarity_matrix
+from .embedding_codec import encode_embedding, decode_embedding
+
+
+# Attempts at a centroid update before giving up under constant concurrent changes
+_CENTROID_UPDATE_RETRIES = 20
+
+
+class CandidatePool:
+    """Candidate embeddings and texts for one item, built once per scoring run."""
+
+    def __init__(
+        self,
+        candidates: List[Dict[str, Any]],
+        use_cached_embeddings: bool = True,
+        dim: int = None
+    ):
+        """
+        Build the candidate matrix for an item.
+
+        Args:
+            candidates: Candidate documents that applied to the item
+            use_cached_embeddings: Whether to use pre-computed embeddings from DB
+            dim: Embedding dimension to align with the expert matrix
+        """
+        candidates = candidates or []
+        embeddings = resolve_embeddings(
+            candidates, 'skillEmbedding', generate_candidate_text, use_cached_embeddings
+        )
+
+        # Candidates without an embedding are left out, as in the per-expert path
+        kept = [i for i, emb in enumerate(embeddings) if emb is not None and len(emb) > 0]
+        self.candidates = [candidates[i] for i in kept]
+        self.texts = [generate_candidate_text(c) for c in self.candidates]
+        self.matrix, _ = embeddings_to_matrix([embeddings[i] for i in kept], dim)
+        self.centroid = None
+        self.count = len(self.candidates)
+
+    @classmethod
+    def from_centroid(cls, centroid: List[float], count: int) -> 'CandidatePool':
+        """
+        Build a pool from an item's stored candidate centroid.
+
+        The pool scores w3/w4 exactly as the matrix path does, but has no
+        per-candidate rows, so it cannot produce top matching candidates.
+
+        Args:
+            centroid: Mean of the normalised candidate embeddings
+            count: Number of candidates folded into the centroid
+        """
+        pool = cls.__new__(cls)
+        pool.candidates = []
+        pool.texts = []
+        pool.centroid = decode_embedding(centroid)
+        pool.matrix = np.zeros((0, len(pool.centroid)), dtype=np.float32)
+        pool.count = int(count)
+        return pool
+
+    def __len__(self) -> int:
+        return self.count
+
+    def mean_vector(self) -> Optional[np.ndarray]:
+        """
+        Mean of the normalised candidate vectors (None for an empty pool).
+
+        An expert's w3 is its unit vector's dot product with this, clamped
+        to [0, 1].
+        """
+        if self.centroid is not None:
+            return self.centroid if len(self) > 0 else None
+        if len(self.candidates) == 0:
+            return None
+        return self.matrix.astype(np.float64).mean(axis=0)
+
+    def similarity_matrix(self, expert_matrix: np.ndarray) -> np.ndarray:
+        """
+        Cosine similarity of every expert against every candidate.
+
+        Args:
+            expert_matrix: Normalised expert matrix of shape (experts, dim)
+
+        Returns:
+            Array of shape (experts, candidates) with scores in [0, 1]
+        """
+        if len(self) == 0:
+            return np.zeros((expert_matrix.shape[0], 0), dtype=np.float32)
+        return cosine_similarity_matrix(expert_matrix, self.matrix)
+
+    def score_experts(
+        self,
+        expert_matrix: np.ndarray,
+        top_candidates: int = 0
+    ) -> Dict[str, Any]:
+        """
+        Compute pool-level scores for all experts from one similarity matrix.
+
+        Args:
+            expert_matrix: Normalised expert matrix of shape (experts, dim)
+            top_candidates: Number of best matching candidates to report per expert
+
+        Returns:
+            Dictionary containing:
+            - avg_cosine_scores: Mean candidate cosine per expert, clamped
+              to [0, 1] after averaging (so it equals the centroid path)
+            - top_candidates: Per-expert list of best candidates (or None)
+        """
+        n_experts = expert_matrix.shape[0]
+
+        if self.centroid is not None and len(self) > 0:
+            dim = min(expert_matrix.shape[1], len(self.centroid))
+            avg = expert_matrix[:, :dim] @ self.centroid[:dim]
+            return {
+                'avg_cosine_scores': np.clip(avg, 0.0, 1.0).astype(np.float64),
+                'top_candidates': [[] for _ in range(n_experts)] if top_candidates else None
+            }
+
+        if len(self.candidates) == 0:
+            return {
+                'avg_cosine_scores': np.zeros(n_experts),
+                'top_candidates': [[] for _ in range(n_experts)] if top_candidates else None
+            }
+
+        raw = expert_matrix @ self.matrix.T
+        result = {
+            'avg_cosine_scores': np.clip(raw.astype(np.float64).mean(axis=1), 0.0, 1.0),
+            'top_candidates': None
+        }
+
+        if top_candidates:
+            scores = np.clip(raw, 0.0, 1.0)
+            k = min(top_candidates, len(self))
+            # argpartition picks the top-k per row, then only those k are sorted
+            top_idx = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            top_scores = np.take_along_axis(scores, top_idx, axis=1)
+            order = np.argsort(-top_scores, axis=1, kind='stable')
+            top_idx = np.take_along_axis(top_idx, order, axis=1)
+
+            result['top_candidates'] = [
+                [self._describe(j, float(scores[row, j])) for j in top_idx[row]]
+                for row in range(n_experts)
+            ]
+
+        return result
+
+    def _describe(self, index: int, similarity: float) -> Dict[str, Any]:
+        """Summarise a candidate for the top matching candidates list."""
+        candidate = self.candidates[index]
+        return {
+            'candidate_id': str(candidate.get('_id', '')),
+            'candidate_name': candidate.get('name', ''),
+            'similarity': round(similarity * 100, 2)
+        }
+
+
+def _normalize(embedding: Optional[List[float]]) -> Optional[np.ndarray]:
+    """L2-normalise an embedding, returning None if it is missing or zero."""
+    embedding = decode_embedding(embedding)
+    if embedding is None:
+        return None
+    vec = embedding.astype(np.float64)
+    norm = np.linalg.norm(vec)
+    return vec / norm if norm > 0 else None
+
+
+def update_centroid(
+    centroid: Optional[List[float]],
+    count: int,
+    add_embedding: Optional[List[float]] = None,
+    remove_embedding: Optional[List[float]] = None
+) -> Tuple[Optional[List[float]], int]:
+    """
+    Fold one candidate into (or out of) a running centroid.
+
+    An edit is a remove of the old embedding plus an add of the new one.
+
+    Args:
+        centroid: Current centroid (None if the item has no candidates yet)
+        count: Number of candidates in the current centroid
+        add_embedding: Embedding of a candidate joining the pool
+        remove_embedding: Embedding of a candidate leaving the pool
+
+    Returns:
+        Tuple of (new centroid or None when empty, new count)
+    """
+    added = _normalize(add_embedding)
+    removed = _normalize(remove_embedding)
+
+    dim = next((len(v) for v in (added, removed) if v is not None), None)
+    centroid = decode_embedding(centroid)
+    if centroid is not None:
+        total = centroid.astype(np.float64) * count
+    elif dim is not None:
+        total = np.zeros(dim)
+    else:
+        return centroid, count
+
+    if removed is not None and count > 0:
+        total = total - removed
+        count -= 1
+    if added is not None:
+        total = total + added
+        count += 1
+
+    if count <= 0:
+        return None, 0
+    return (total / count).tolist(), count
+
+
+def apply_candidate_change(
+    items_collection,
+    item_id,
+    add_embedding: Optional[List[float]] = None,
+    remove_embedding: Optional[List[float]] = None,
+    candidates_collection=None
+) -> None:
+    """
+    Update an item's stored candidate centroid after a candidate change.
+
+    The centroid is read, folded and written back only if no other change
+    wrote it in between (candidateCentroidVersion is unchanged); otherwise
+    the update is retried on the new centroid, so concurrent changes to the
+    same item are never lost.
+
+    An item without a centroid yet (candidateCount missing) may already
+    have candidates, so its centroid is rebuilt from the candidates
+    collection, which must already hold the change, instead of folded.
+
+    Args:
+        items_collection: MongoDB items collection
+        item_id: ObjectId of the item the candidate applied to
+        add_embedding: Embedding of an added (or edited, new version) candidate
+        remove_embedding: Embedding of a removed (or edited, old version) candidate
+        candidates_collection: MongoDB candidates collection
+            (default: 'candidates' in the items' database)
+    """
+    if item_id is None or (add_embedding is None and remove_embedding is None):
+        return
+
+    for _ in range(_CENTROID_UPDATE_RETRIES):
+        item = items_collection.find_one(
+            {'_id': item_id},
+            {'candidateCentroid': 1, 'candidateCount': 1, 'candidateCentroidVersion': 1}
+        )
+        if not item:
+            return
+        if 'candidateCount' not in item:
+            if candidates_collection is None:
+                candidates_collection = items_collection.database['candidates']
+            rebuild_item_centroid(items_collection, candidates_collection, item_id)
+            return
+
+        centroid, count = update_centroid(
+            item.get('candidateCentroid'),
+            item.get('candidateCount', 0),
+            add_embedding,
+            remove_embedding
+        )
+        # A count check alone would miss a concurrent edit (remove + add)
+        result = items_collection.update_one(
+            {'_id': item_id, 'candidateCentroidVersion': item.get('candidateCentroidVersion')},
+            {
+                '$set': {
+                    'candidateCentroid': encode_embedding(centroid),
+                    'candidateCount': count,
+                    'candidatePoolUpdatedAt': datetime.now()
+                },
+                '$inc': {'candidateCentroidVersion': 1}
+            }
+        )
+        if result.matched_count:
+            return
+
+    print(f"⚠️ Candidate centroid of item {item_id} kept changing; rebuild it with rebuild_item_centroid")
+
+
+def rebuild_item_centroid(items_collection, candidates_collection, item_id) -> int:
+    """
+    Recompute an item's candidate centroid from its candidate documents.
+
+    Used after bulk embedding refreshes, for items without a centroid yet
+    and to repair drift. Like apply_candidate_change, the result is only
+    written if no other change wrote the centroid in between (otherwise
+    the candidates are read again).
+
+    Returns:
+        Number of candidates folded into the centroid
+    """
+    for _ in range(_CENTROID_UPDATE_RETRIES):
+        item = items_collection.find_one({'_id': item_id}, {'candidateCentroidVersion': 1})
+        if not item:
+            return 0
+
+        total = None
+        count = 0
+        cursor = candidates_collection.find(
+            {'appliedItemId': item_id},
+            {'skillEmbedding': 1}
+        )
+        for cand in cursor:
+            vec = _normalize(cand.get('skillEmbedding'))
+            if vec is None:
+                continue
+            total = vec.copy() if total is None else total + vec
+            count += 1
+
+        result = items_collection.update_one(
+            {'_id': item_id, 'candidateCentroidVersion': item.get('candidateCentroidVersion')},
+            {
+                '$set': {
+                    'candidateCentroid': encode_embedding(total / count) if count else None,
+                    'candidateCount': count,
+                    'candidatePoolUpdatedAt': datetime.now()
+                },
+                '$inc': {'candidateCentroidVersion': 1}
+            }
+        )
+        if result.matched_count:
+            return count
+
+    print(f"⚠️ Candidate centroid of item {item_id} kept changing while it was rebuilt")
+    return count
+
+
+def get_item_candidate_pool(item: Dict[str, Any]) -> Optional[CandidatePool]:
+    """
+    Return a centroid-backed CandidatePool for an item, if one is stored.
+
+    Returns None when the item has no centroid yet, so callers fall back
+    to loading the candidate documents.
+    """
+    if item.get('candidateCentroid') and item.get('candidateCount', 0) > 0:
+        return CandidatePool.from_centroid(item['candidateCentroid'], item['candidateCount'])
+    return None
+
+
+# Export functions
+__all__ = [
+    'CandidatePool',
+    'update_centroid',
+    'apply_candidate_change',
+    'rebuild_item_centroid',
+    'get_item_candidate_pool'
+]
@@ -0,0 +1,153 @@
+"""
+MIRA DRDO - Embedding Cache Module
+
+Content-hash cache in front of the sentence-transformer model:
+- Key: (model name, SHA-256 of the normalised input text)
+- Tier 1: bounded in-process LRU
+- Tier 2: persistent MongoDB collection shared across workers and restarts
+  (vectors stored in the binary format of embedding_codec)
+
+Identical expert, item and candidate texts (e.g. the same discipline and
+qualification text across advertisements) are embedded once and reused.
+"""
+
+import os
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from .cache import LRUCache, content_hash
+from .embedding_codec import encode_embedding, decode_embedding
+
+
+class EmbeddingCache:
+    """Two-tier embedding cache keyed by model name and text hash."""
+
+    def __init__(self, max_size: int = 4096, collection=None):
+        """
+        Args:
+            max_size: Maximum number of embeddings held in memory
+            collection: MongoDB collection for the persistent tier (optional)
+        """
+        self.memory = LRUCache(max_size)
+        self.collection = collection
+        self.memory_hits = 0
+        self.persistent_hits = 0
+        self.misses = 0
+        self.persistent_errors = 0
+
+    @staticmethod
+    def make_key(model_name: str, text: str) -> str:
+        return f"{model_name}:{content_hash(text)}"
+
+    def get_many(self, model_name: str, texts: List[str]) -> List[Optional[List[float]]]:
+        """
+        Look up embeddings for several texts.
+
+        Memory misses are fetched from the persistent tier with one query
+        and promoted into memory.
+
+        Returns:
+            Embeddings aligned with texts (None for misses)
+        """
+        keys = [self.make_key(model_name, text) for text in texts]
+        found = [self.memory.get(key) for key in keys]
+        self.memory_hits += sum(emb is not None for emb in found)
+
+        missing = {key for key, emb in zip(keys, found) if emb is None}
+        fetched = {}
+        if missing and self.collection is not None:
+            try:
+                for doc in self.collection.find({'_id': {'$in': list(missing)}}):
+                    embedding = decode_embedding(doc.get('embedding'))
+                    if embedding is None:
+                        continue
+                    fetched[doc['_id']] = embedding.tolist()
+                    self.memory.put(doc['_id'], fetched[doc['_id']])
+            except Exception as e:
+                self.persistent_errors += 1
+                print(f"⚠️ Embedding cache read failed: {e}")
+
+        for i, key in enumerate(keys):
+            if found[i] is None:
+                found[i] = fetched.get(key)
+                if found[i] is not None:
+                    self.persistent_hits += 1
+                else:
+                    self.misses += 1
+
+        return found
+
+    def get(self, model_name: str, text: str) -> Optional[List[float]]:
+        return self.get_many(model_name, [text])[0]
+
+    def put_many(self, model_name: str, texts: List[str], embeddings: List[Optional[List[float]]]) -> None:
+        """Store embeddings in both tiers (None entries are skipped)."""
+        docs = []
+        for text, emb in zip(texts, embeddings):
+            if emb is None:
+                continue
+            key = self.make_key(model_name, text)
+            self.memory.put(key, emb)
+            docs.append({'_id': key, 'model': model_name, 'embedding': encode_embedding(emb)})
+
+        if docs and self.collection is not None:
+            try:
+                from pymongo import UpdateOne
+                now = datetime.now()
+                self.collection.bulk_write([
+                    UpdateOne(
+                        {'_id': doc['_id']},
+                        {'$set': {**doc, 'updatedAt': now}},
+                        upsert=True
+                    )
+                    for doc in docs
+                ], ordered=False)
+            except Exception as e:
+                self.persistent_errors += 1
+                print(f"⚠️ Embedding cache write failed: {e}")
+
+    def put(self, model_name: str, text: str, embedding: Optional[List[float]]) -> None:
+        self.put_many(model_name, [text], [embedding])
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for both tiers."""
+        lookups = self.memory_hits + self.persistent_hits + self.misses
+        return {
+            'memory_size': len(self.memory),
+            'memory_max_size': self.memory.max_size,
+            'memory_hits': self.memory_hits,
+            'persistent_hits': self.persistent_hits,
+            'misses': self.misses,
+            'hit_rate': round((lookups - self.misses) / lookups, 4) if lookups else 0.0,
+            'persistent_enabled': self.collection is not None,
+            'persistent_errors': self.persistent_errors
+        }
+
+
+# Module-level cache shared by the embedding generator
+_cache = EmbeddingCache(max_size=int(os.getenv('EMBEDDING_CACHE_SIZE', '4096')))
+
+
+def init_embedding_cache(collection) -> None:
+    """Attach the persistent MongoDB tier (called once at app startup)."""
+    _cache.collection = collection
+    try:
+        collection.create_index('model')
+    except Exception as e:
+        print(f"⚠️ Could not index embedding cache: {e}")
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    return _cache
+
+
+def get_embedding_cache_stats() -> Dict[str, Any]:
+    return _cache.stats()
+
+
+# Export
+__all__ = [
+    'EmbeddingCache',
+    'init_embedding_cache',
+    'get_embedding_cache',
+    'get_embedding_cache_stats'
+]
@@ -0,0 +1,248 @@
+"""
+MIRA DRDO - Embedding Codec Module
+
+Compact storage format for embeddings in MongoDB.
+
+Instead of a BSON array of 384 doubles (~4.6 KB per document), vectors are
+stored as a small sub-document:
+
+    {'dtype': 'float32', 'dim': 384, 'data': Binary(<little-endian bytes>)}
+
+float32 takes 1.5 KB and float16 0.75 KB. Reading decodes straight into
+NumPy with np.frombuffer (zero-copy for float32). The legacy list format is
+still read during rollout, and migrate_collection_embeddings converts
+existing documents in bulk.
+
+For large expert pools an optional int8 mode keeps each normalised vector
+as int8 codes plus one float32 scale (a quarter of float32 memory). The
+codes are held by the expert index (see expert_index.py) and only used for
+a first-pass cosine ranking; the shortlist is rescored from the
+full-precision vectors.
+"""
+
+import os
+from typing import Any, Dict, List, Optional, Tuple, Union
+import numpy as np
+from bson.binary import Binary
+from pymongo import UpdateOne
+
+
+# Storage dtype for newly written embeddings ('float32' or 'float16')
+STORAGE_DTYPE = os.getenv('EMBEDDING_STORAGE_DTYPE', 'float32')
+
+# In-memory quantization for first-pass ranking ('none' or 'int8')
+QUANTIZATION_MODE = os.getenv('EMBEDDING_QUANTIZATION', 'none')
+
+# Experts per category rescored in full precision after an int8 first pass
+QUANTIZED_RESCORE_TOP = int(os.getenv('QUANTIZED_RESCORE_TOP', '300'))
+
+# Rows dequantized at a time when scoring an int8 matrix
+_INT8_BLOCK_ROWS = 4096
+
+# Little-endian NumPy dtypes per storage dtype
+_NUMPY_DTYPES = {
+    'float32': np.dtype('<f4'),
+    'float16': np.dtype('<f2')
+}
+
+
+def encode_embedding(
+    vector: Union[List[float], np.ndarray, None],
+    dtype: str = None
+) -> Optional[Dict[str, Any]]:
+    """
+    Encode a vector for storage.
+
+    Args:
+        vector: Embedding as a list or NumPy array
+        dtype: 'float32' or 'float16' (default: STORAGE_DTYPE)
+
+    Returns:
+        Encoded sub-document, or None for a missing/empty vector
+    """
+    if vector is None or len(vector) == 0:
+        return None
+
+    dtype = dtype or STORAGE_DTYPE
+    if dtype not in _NUMPY_DTYPES:
+        raise ValueError(f"Unsupported embedding dtype: {dtype}")
+
+    array = np.asarray(vector, dtype=_NUMPY_DTYPES[dtype])
+    return {
+        'dtype': dtype,
+        'dim': int(array.shape[0]),
+        'data': Binary(array.tobytes())
+    }
+
+
+def is_encoded(value: Any) -> bool:
+    """Whether a stored value uses the binary format."""
+    return isinstance(value, dict) and 'data' in value and 'dtype' in value
+
+
+def decode_embedding(value: Any) -> Optional[np.ndarray]:
+    """
+    Decode a stored embedding into a float32 NumPy array.
+
+    Accepts the binary format, the legacy list format and arrays.
+    float32 data is returned as a read-only zero-copy view of the BSON bytes.
+
+    Returns:
+        1-D float32 array, or None if nothing usable is stored
+    """
+    if value is None:
+        return None
+
+    if is_encoded(value):
+        dtype = _NUMPY_DTYPES.get(value['dtype'])
+        if dtype is None:
+            return None
+        # Binary is a bytes subclass, so this is a view of the BSON payload
+        array = np.frombuffer(value['data'], dtype=dtype)
+        if value.get('dim') and array.shape[0] != value['dim']:
+            return None
+        return array if dtype == _NUMPY_DTYPES['float32'] else array.astype(np.float32)
+
+    if isinstance(value, np.ndarray):
+        return value.astype(np.float32, copy=False) if value.size else None
+
+    if isinstance(value, (list, tuple)):
+        return np.asarray(value, dtype=np.float32) if len(value) else None
+
+    return None
+
+
+def quantize_int8(
+    embeddings: List[Optional[Union[List[float], np.ndarray]]],
+    dim: int = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Quantize embeddings to int8 codes with one scale per vector.
+
+    Each vector is L2-normalised and mapped symmetrically onto [-127, 127],
+    so code * scale approximates the normalised vector. Vectors are
+    quantized _INT8_BLOCK_ROWS at a time; no float32 matrix of all rows is
+    allocated.
+
+    Args:
+        embeddings: Vectors (lists, arrays or stored values; None = missing),
+            or a 2-D array of vectors
+        dim: Embedding dimension (default: first available vector)
+
+    Returns:
+        Tuple of (int8 codes of shape (n, dim), float32 scales of shape (n,)).
+        Missing or zero vectors get zero codes and a zero scale.
+    """
+    if isinstance(embeddings, np.ndarray) and embeddings.ndim == 2:
+        vectors = embeddings
+        if dim is None:
+            dim = vectors.shape[1]
+    else:
+        vectors = [decode_embedding(emb) for emb in embeddings]
+        if dim is None:
+            dim = next((len(v) for v in vectors if v is not None), 0)
+
+    codes = np.zeros((len(vectors), dim), dtype=np.int8)
+    scales = np.zeros(len(vectors), dtype=np.float32)
+    for start in range(0, len(vectors), _INT8_BLOCK_ROWS):
+        rows = vectors[start:start + _INT8_BLOCK_ROWS]
+        if isinstance(rows, np.ndarray):
+            n = min(dim, rows.shape[1])
+            block = np.zeros((len(rows), dim), dtype=np.float32)
+            block[:, :n] = rows[:, :n]
+        else:
+            block = np.zeros((len(rows), dim), dtype=np.float32)
+            for r, vec in enumerate(rows):
+                if vec is not None:
+                    n = min(dim, len(vec))
+                    block[r, :n] = vec[:n]
+
+        norms = np.linalg.norm(block, axis=1)
+        peaks = np.abs(block).max(axis=1) / np.where(norms > 0, norms, 1.0) if dim else norms
+        valid = norms > 0
+        block_scales = np.where(valid, peaks / 127.0, 0.0).astype(np.float32)
+        divisor = (norms * block_scales)[:, None]
+        codes[start:start + len(rows)] = np.where(
+            valid[:, None], np.rint(block / np.where(divisor > 0, divisor, 1.0)), 0
+        ).astype(np.int8)
+        scales[start:start + len(rows)] = block_scales
+    return codes, scales
+
+
+def int8_cosine_scores(query: np.ndarray, codes: np.ndarray, scales: np.ndarray) -> np.ndarray:
+    """
+    Approximate cosine similarity of a query against an int8 matrix.
+
+    Args:
+        query: Query vector (normalised internally)
+        codes: int8 codes from quantize_int8
+        scales: Per-row scales from quantize_int8
+
+    Returns:
+        float32 array of approximate cosines (unclipped)
+    """
+    query = np.asarray(query, dtype=np.float32)
+    norm = np.linalg.norm(query)
+    if norm == 0 or codes.shape[0] == 0:
+        return np.zeros(codes.shape[0], dtype=np.float32)
+    query = query / norm
+
+    scores = np.empty(codes.shape[0], dtype=np.float32)
+    for start in range(0, codes.shape[0], _INT8_BLOCK_ROWS):
+        block = codes[start:start + _INT8_BLOCK_ROWS]
+        scores[start:start + len(block)] = block.astype(np.float32) @ query
+    return scores * scales
+
+
+def migrate_collection_embeddings(
+    collection,
+    fields: List[str],
+    dtype: str = None,
+    batch_size: int = 500
+) -> Dict[str, int]:
+    """
+    Convert legacy list embeddings in a collection to the binary format.
+
+    Args:
+        collection: MongoDB collection
+        fields: Embedding fields to convert (e.g. ['skillEmbedding'])
+        dtype: Target dtype (default: STORAGE_DTYPE)
+        batch_size: Documents per bulk write
+
+    Returns:
+        Dictionary with 'migrated' and 'skipped' counts
+    """
+    stats = {'migrated': 0, 'skipped': 0}
+
+    for field in fields:
+        ops = []
+        cursor = collection.find({field: {'$type': 'array'}}, {field: 1}).batch_size(batch_size)
+        for doc in cursor:
+            encoded = encode_embedding(doc.get(field), dtype)
+            if encoded is None:
+                stats['skipped'] += 1
+                continue
+            ops.append(UpdateOne({'_id': doc['_id']}, {'$set': {field: encoded}}))
+            if len(ops) >= batch_size:
+                collection.bulk_write(ops, ordered=False)
+                stats['migrated'] += len(ops)
+                ops = []
+        if ops:
+            collection.bulk_write(ops, ordered=False)
+            stats['migrated'] += len(ops)
+
+    return stats
+
+
+# Export functions
+__all__ = [
+    'STORAGE_DTYPE',
+    'QUANTIZATION_MODE',
+    'QUANTIZED_RESCORE_TOP',
+    'encode_embedding',
+    'decode_embedding',
+    'is_encoded',
+    'quantize_int8',
+    'int8_cosine_scores',
+    'migrate_collection_embeddings'
+]
@@ -6,12 +6,15 @@ This module generates embeddings for:
 - Expert profiles (skills, role, specializations)
 - Candidate profiles (skills, qualifications)
 
-Uses sentence-transformers for creating semantic embeddings.
+Uses sentence-transformers for creating semantic embeddings, with a
+content-hash cache (embedding_cache.py) in front of the model.
 """
 
 import os
 from typing import List, Dict, Any, Optional, Union
 import numpy as np
+from .embedding_cache import get_embedding_cache
+from .embedding_codec import decode_embedding
 
 # Lazy loading to avoid slow startup
 _model = None
@@ -32,10 +35,23 @@ def _get_model():
     return _model
 
 
+def get_embedding_model_name() -> str:
+    """Name of the sentence-transformer model used for all embeddings."""
+    return _model_name
+
+
+def is_embedding_model_loaded() -> bool:
+    """Whether the real model is available (otherwise random vectors are returned)."""
+    return _get_model() is not None
+
+
 def generate_embedding(text: str) -> Optional[List[float]]:
     """
     Generate embedding vector for a given text.
     
+    Identical (whitespace-normalised) texts are served from the embedding
+    cache instead of running the model again.
+    
     Args:
         text: Input text to embed
         
@@ -46,14 +62,20 @@ def generate_embedding(text: str) -> Optional[List[float]]:
     if not text or not text.strip():
         return None
     
+    cache = get_embedding_cache()
+    cached = cache.get(_model_name, text)
+    if cached is not None:
+        return cached
+    
     model = _get_model()
     if model is None:
         # Fallback: return a random embedding for testing when model unavailable
         return list(np.random.randn(384).astype(float))
     
     try:
-        embedding = model.encode(text, convert_to_numpy=True)
-        return embedding.tolist()
+        embedding = model.encode(text, convert_to_numpy=True).tolist()
+        cache.put(_model_name, text, embedding)
+        return embedding
     except Exception as e:
         print(f"Error generating embedding: {e}")
         return None
@@ -227,26 +249,86 @@ def batch_generate_embeddings(texts: List[str]) -> List[Optional[List[float]]]:
     """
     Generate embeddings for multiple texts at once (more efficient).
     
+    Cached texts are skipped; the rest are encoded in one model call.
+    
     Args:
         texts: List of input texts
         
     Returns:
         List of embedding vectors
     """
+    if not texts:
+        return []
+    
+    cache = get_embedding_cache()
+    embeddings = cache.get_many(_model_name, texts)
+    missing = [i for i, emb in enumerate(embeddings) if emb is None]
+    if not missing:
+        return embeddings
+    
     model = _get_model()
     if model is None:
-        return [list(np.random.randn(384).astype(float)) for _ in texts]
+        for i in missing:
+            embeddings[i] = list(np.random.randn(384).astype(float))
+        return embeddings
     
     try:
-        embeddings = model.encode(texts, convert_to_numpy=True)
-        return [emb.tolist() for emb in embeddings]
+        # Duplicate texts within the batch are encoded once
+        unique_texts = list(dict.fromkeys(texts[i] for i in missing))
+        encoded = [emb.tolist() for emb in model.encode(unique_texts, convert_to_numpy=True)]
+        cache.put_many(_model_name, unique_texts, encoded)
+        by_text = dict(zip(unique_texts, encoded))
+        for i in missing:
+            embeddings[i] = by_text[texts[i]]
+        return embeddings
     except Exception as e:
         print(f"Error in batch embedding: {e}")
         return [None] * len(texts)
 
 
+def resolve_embeddings(
+    docs: List[Dict[str, Any]],
+    field: str,
+    text_fn,
+    use_cached_embeddings: bool = True
+) -> List[Optional[Union[List[float], np.ndarray]]]:
+    """
+    Collect stored embeddings for a list of documents, generating the
+    missing ones with a single batched model call.
+    
+    Stored embeddings (binary or legacy list format) are decoded to float32
+    NumPy arrays; generated ones are returned as lists.
+    
+    Args:
+        docs: MongoDB documents (experts, items or candidates)
+        field: Field holding the stored embedding ('skillEmbedding' or 'embedding')
+        text_fn: Text generator for the document type (e.g. generate_expert_text)
+        use_cached_embeddings: Whether to use pre-computed embeddings from DB
+        
+    Returns:
+        List of embedding vectors aligned with docs (None where no text)
+    """
+    embeddings = [
+        decode_embedding(doc.get(field)) if use_cached_embeddings else None
+        for doc in docs
+    ]
+    
+    missing = [i for i, emb in enumerate(embeddings) if emb is None]
+    if missing:
+        texts = {i: text_fn(docs[i]) for i in missing}
+        to_embed = [i for i in missing if texts[i] and texts[i].strip()]
+        if to_embed:
+            generated = batch_generate_embeddings([texts[i] for i in to_embed])
+            for i, emb in zip(to_embed, generated):
+                embeddings[i] = emb
+    
+    return embeddings
+
+
 # Export functions
 __all__ = [
+    'get_embedding_model_name',
+    'is_embedding_model_loaded',
     'generate_embedding',
     'generate_item_embedding',
     'generate_expert_embedding',
@@ -254,5 +336,6 @@ __all__ = [
     'generate_item_text',
     'generate_expert_text',
     'generate_candidate_text',
-    'batch_generate_embeddings'
+    'batch_generate_embeddings',
+    'resolve_embeddings'
 ]
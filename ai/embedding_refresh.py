@@ -0,0 +1,256 @@
+"""
+MIRA DRDO - Embedding Refresh Module
+
+Incremental re-embedding of experts, items and candidates.
+
+Every stored embedding is stamped with:
+- embeddingFingerprint: SHA-256 of the text generate_*_text produces
+- embeddingModel: name of the model that produced the vector
+
+A refresh only re-embeds documents whose fingerprint or model differs
+(or that have no embedding yet), so a nightly run over a mostly unchanged
+database costs little more than reading it.
+
+The refresh streams each collection in chunks with a projection of just the
+text fields, encodes the stale documents of a chunk with one batched model
+call (sorted by text length to minimise padding) and writes them back with
+one unordered bulk_write per chunk. Vectors are written in the binary
+format of embedding_codec.
+"""
+
+import os
+from datetime import datetime
+from typing import Any, Callable, Dict
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+from .cache import content_hash
+from .embedding_codec import encode_embedding
+from .embedding_generator import (
+    batch_generate_embeddings,
+    generate_item_text,
+    generate_expert_text,
+    generate_candidate_text,
+    get_embedding_model_name,
+    is_embedding_model_loaded
+)
+
+
+# Documents read, encoded and written per chunk
+DEFAULT_BATCH_SIZE = int(os.getenv('EMBEDDING_REFRESH_BATCH_SIZE', '256'))
+
+# Model name stamped on random vectors written while the model is unavailable,
+# so the next refresh with the real model replaces them
+FALLBACK_MODEL_NAME = 'random-fallback'
+
+# Fingerprint fields read alongside the text fields
+_STAMP_FIELDS = ['embeddingFingerprint', 'embeddingModel']
+
+# Embedding field, text generator and the fields it reads, per document kind
+EMBEDDING_TARGETS = {
+    'expert': {
+        'field': 'skillEmbedding',
+        'text_fn': generate_expert_text,
+        'text_fields': ['name', 'role', 'skills', 'qualifications', 'specializations',
+                        'affiliation', 'category', 'reason']
+    },
+    'item': {
+        'field': 'embedding',
+        'text_fn': generate_item_text,
+        'text_fields': ['itemNo', 'discipline', 'title', 'essentialQualification', 'description',
+                        'gateCode', 'equivalentDegrees', 'organization']
+    },
+    'candidate': {
+        'field': 'skillEmbedding',
+        'text_fn': generate_candidate_text,
+        'text_fields': ['name', 'skills', 'qualifications', 'gateScore', 'gatePaper',
+                        'experience', 'education', 'appliedItemId']
+    }
+}
+
+
+def embedding_fingerprint(text: str) -> str:
+    """Fingerprint of the text an embedding was generated from."""
+    return content_hash(text)
+
+
+def current_model_name() -> str:
+    """Name stamped on newly generated embeddings (fallback if the model is missing)."""
+    return get_embedding_model_name() if is_embedding_model_loaded() else FALLBACK_MODEL_NAME
+
+
+def embedding_stamp(text: str, model_name: str = None) -> Dict[str, Any]:
+    """Fields stored next to an embedding to detect when it goes stale."""
+    return {
+        'embeddingFingerprint': embedding_fingerprint(text),
+        'embeddingModel': model_name or current_model_name(),
+        'embeddingUpdatedAt': datetime.now()
+    }
+
+
+def needs_refresh(
+    doc: Dict[str, Any],
+    kind: str,
+    text: str = None,
+    has_embedding: bool = None,
+    model_name: str = None
+) -> bool:
+    """
+    Check whether a document's stored embedding is missing or stale.
+
+    Args:
+        doc: Expert, item or candidate document
+        kind: 'expert', 'item' or 'candidate'
+        text: Pre-computed text for the document (generated if omitted)
+        has_embedding: Whether an embedding is stored (read from doc if omitted,
+            so projected documents without the vector can be checked)
+        model_name: Model currently producing embeddings (see current_model_name)
+    """
+    target = EMBEDDING_TARGETS[kind]
+    if has_embedding is None:
+        has_embedding = bool(doc.get(target['field']))
+    if not has_embedding:
+        return True
+    model_name = model_name or current_model_name()
+    if model_name == FALLBACK_MODEL_NAME:
+        # Without the real model, never replace a real vector with random noise
+        accepted = {get_embedding_model_name(), FALLBACK_MODEL_NAME}
+    else:
+        accepted = {model_name}
+    if doc.get('embeddingModel') not in accepted:
+        return True
+    if text is None:
+        text = target['text_fn'](doc)
+    return doc.get('embeddingFingerprint') != embedding_fingerprint(text)
+
+
+def _chunks(cursor, size: int):
+    """Yield lists of up to `size` documents from a cursor."""
+    chunk = []
+    for doc in cursor:
+        chunk.append(doc)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def refresh_collection_embeddings(
+    collection,
+    kind: str,
+    force: bool = False,
+    label_fn: Callable[[Dict[str, Any]], str] = None,
+    batch_size: int = None,
+    progress_fn: Callable[[Dict[str, Any]], None] = None
+) -> Dict[str, Any]:
+    """
+    Re-embed the stale documents of one collection in batched chunks.
+
+    Args:
+        collection: MongoDB collection (experts, items or candidates)
+        kind: 'expert', 'item' or 'candidate'
+        force: Re-embed every document regardless of fingerprint
+        label_fn: Builds a readable label for error messages
+        batch_size: Documents per chunk (default: DEFAULT_BATCH_SIZE)
+        progress_fn: Called after each chunk with the running counts
+
+    Returns:
+        Dictionary containing:
+        - skipped / refreshed / failed: Document counts
+        - chunks: Number of chunks processed
+        - errors: Error messages for failed documents
+        - refreshed_ids: _ids of the re-embedded documents
+    """
+    target = EMBEDDING_TARGETS[kind]
+    field = target['field']
+    label_fn = label_fn or (lambda doc: str(doc.get('_id')))
+    batch_size = max(1, batch_size or DEFAULT_BATCH_SIZE)
+
+    stats = {'skipped': 0, 'refreshed': 0, 'failed': 0, 'chunks': 0,
+             'errors': [], 'refreshed_ids': []}
+    model_name = current_model_name()
+
+    # The vectors themselves are never read; only which documents lack one
+    missing_ids = {
+        doc['_id'] for doc in collection.find({field: {'$in': [None, []]}}, {'_id': 1})
+    }
+    projection = {name: 1 for name in target['text_fields'] + _STAMP_FIELDS}
+    cursor = collection.find({}, projection).batch_size(batch_size)
+
+    for chunk in _chunks(cursor, batch_size):
+        stale = []
+        for doc in chunk:
+            try:
+                text = target['text_fn'](doc)
+                if force or needs_refresh(doc, kind, text, doc['_id'] not in missing_ids, model_name):
+                    if text and text.strip():
+                        stale.append((doc, text))
+                    else:
+                        stats['failed'] += 1
+                        stats['errors'].append(f"{kind.title()} {label_fn(doc)}: no text to embed")
+                else:
+                    stats['skipped'] += 1
+            except Exception as e:
+                stats['failed'] += 1
+                stats['errors'].append(f"{kind.title()} {label_fn(doc)}: {str(e)}")
+
+        if stale:
+            # Similar lengths in one encode call keep padding to a minimum
+            stale.sort(key=lambda pair: len(pair[1]))
+            embeddings = batch_generate_embeddings([text for _, text in stale])
+
+            ops = []
+            op_docs = []
+            for (doc, text), embedding in zip(stale, embeddings):
+                if not embedding:
+                    stats['failed'] += 1
+                    stats['errors'].append(f"{kind.title()} {label_fn(doc)}: embedding failed")
+                    continue
+                ops.append(UpdateOne(
+                    {'_id': doc['_id']},
+                    {'$set': {field: encode_embedding(embedding), **embedding_stamp(text, model_name)}}
+                ))
+                op_docs.append(doc)
+
+            if ops:
+                failed_indexes = set()
+                try:
+                    collection.bulk_write(ops, ordered=False)
+                except BulkWriteError as e:
+                    for err in e.details.get('writeErrors', []):
+                        failed_indexes.add(err['index'])
+                        stats['errors'].append(
+                            f"{kind.title()} {label_fn(op_docs[err['index']])}: {err.get('errmsg')}"
+                        )
+                for i, doc in enumerate(op_docs):
+                    if i in failed_indexes:
+                        stats['failed'] += 1
+                    else:
+                        stats['refreshed'] += 1
+                        stats['refreshed_ids'].append(doc['_id'])
+
+        stats['chunks'] += 1
+        if progress_fn:
+            progress_fn({
+                'kind': kind,
+                'chunk': stats['chunks'],
+                'processed': stats['skipped'] + stats['refreshed'] + stats['failed'],
+                'skipped': stats['skipped'],
+                'refreshed': stats['refreshed'],
+                'failed': stats['failed']
+            })
+
+    return stats
+
+
+# Export functions
+__all__ = [
+    'DEFAULT_BATCH_SIZE',
+    'FALLBACK_MODEL_NAME',
+    'EMBEDDING_TARGETS',
+    'embedding_fingerprint',
+    'current_model_name',
+    'embedding_stamp',
+    'needs_refresh',
+    'refresh_collection_embeddings'
+]
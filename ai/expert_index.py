@@ -0,0 +1,473 @@
+"""
+MIRA DRDO - Expert Index Module
+
+In-process vector index of expert embeddings, partitioned by category,
+answering "top-k experts of each category for this item vector".
+
+- Small partitions: exact search (one matrix product + argpartition)
+- Large partitions (EXPERT_INDEX_IVF_THRESHOLD experts and up): an IVF
+  index - spherical k-means lists, of which the EXPERT_INDEX_NPROBE
+  closest to the query are scanned exactly
+- With EMBEDDING_QUANTIZATION=int8 the vectors are held as int8 codes,
+  which also give the int8 first pass of batch scoring its cosines
+  (approximate_scores), so no request re-quantizes the experts
+
+The index is built lazily from the experts collection and kept in sync by
+the expert routes (create, update, delete) and the embedding refresh.
+Each worker process holds its own copy: every expert change also bumps a
+version stamp stored in MongoDB (INDEX_STATE_COLLECTION), and a worker
+whose copy was built at another version rebuilds it on its next read.
+"""
+
+import os
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from pymongo import ReturnDocument
+from .embedding_codec import (
+    decode_embedding,
+    quantize_int8,
+    int8_cosine_scores,
+    QUANTIZATION_MODE
+)
+from .embedding_generator import generate_expert_text, resolve_embeddings
+from .embedding_refresh import EMBEDDING_TARGETS
+
+
+# Partition size from which searches use the IVF lists instead of a full scan
+IVF_THRESHOLD = int(os.getenv('EXPERT_INDEX_IVF_THRESHOLD', '20000'))
+
+# IVF lists scanned per query
+IVF_NPROBE = int(os.getenv('EXPERT_INDEX_NPROBE', '8'))
+
+# Experts retrieved per category before scoring (0 = score every expert)
+DEFAULT_RETRIEVE_TOP = int(os.getenv('EXPERT_RETRIEVE_TOP', '50'))
+
+# Collection (in the experts' database) holding the shared index version
+INDEX_STATE_COLLECTION = os.getenv('EXPERT_INDEX_STATE_COLLECTION', 'expert_index_state')
+
+# Fields read from expert documents to index them
+_INDEX_FIELDS = ['category', 'skillEmbedding'] + EMBEDDING_TARGETS['expert']['text_fields']
+
+
+def _category_key(expert: Dict[str, Any]) -> str:
+    """Partition key, matching the category grouping of the scorer (top_per_category)."""
+    return (expert.get('category') or '').lower()
+
+
+def _unit(vector: np.ndarray, dim: int) -> Optional[np.ndarray]:
+    """Truncate/pad to dim and L2-normalise (None for zero vectors)."""
+    row = np.zeros(dim, dtype=np.float32)
+    n = min(dim, len(vector))
+    row[:n] = vector[:n]
+    norm = np.linalg.norm(row)
+    return row / norm if norm > 0 else None
+
+
+def _train_kmeans(vectors: np.ndarray, nlist: int, iterations: int = 10, seed: int = 0) -> np.ndarray:
+    """Spherical k-means on unit vectors, returning normalised centroids."""
+    rng = np.random.default_rng(seed)
+    sample = vectors
+    if len(vectors) > nlist * 64:
+        sample = vectors[rng.choice(len(vectors), nlist * 64, replace=False)]
+    centroids = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+
+    for _ in range(iterations):
+        assignment = np.argmax(sample @ centroids.T, axis=1)
+        for c in range(nlist):
+            members = sample[assignment == c]
+            if len(members):
+                centroids[c] = members.sum(axis=0)
+        norms = np.linalg.norm(centroids, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        centroids /= norms
+    return centroids
+
+
+class _Partition:
+    """Vectors of one expert category."""
+
+    def __init__(self, dim: int, quantized: bool):
+        self.dim = dim
+        self.quantized = quantized
+        self.rows = {}          # expert_id -> unit vector, or (codes, scale) when quantized
+        self.lists = {}         # expert_id -> IVF list (when centroids exist)
+        self.centroids = None
+        self.trained_size = 0
+        self._ids = None        # Stacked view, rebuilt lazily after changes
+        self._row_of = None
+        self._matrix = None
+        self._scales = None
+        self._list_rows = None
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def upsert(self, expert_id: str, unit: np.ndarray) -> None:
+        if self.quantized:
+            codes, scales = quantize_int8([unit], self.dim)
+            self.rows[expert_id] = (codes[0], scales[0])
+        else:
+            self.rows[expert_id] = unit
+        if self.centroids is not None:
+            self.lists[expert_id] = int(np.argmax(self.centroids @ unit))
+        self._ids = None
+
+    def remove(self, expert_id: str) -> None:
+        if self.rows.pop(expert_id, None) is not None:
+            self.lists.pop(expert_id, None)
+            self._ids = None
+
+    def _vector(self, expert_id: str) -> np.ndarray:
+        row = self.rows[expert_id]
+        return row[0].astype(np.float32) * row[1] if self.quantized else row
+
+    def _build(self) -> None:
+        ids = list(self.rows)
+        n = len(ids)
+
+        # (Re)train the IVF lists when the partition crosses the threshold
+        # or has halved/doubled since the last training
+        if n >= IVF_THRESHOLD:
+            if self.centroids is None or not (self.trained_size / 2 <= n <= self.trained_size * 2):
+                vectors = np.stack([self._vector(i) for i in ids])
+                self.centroids = _train_kmeans(vectors, max(1, int(np.sqrt(n))))
+                self.trained_size = n
+                assignment = np.argmax(vectors @ self.centroids.T, axis=1)
+                self.lists = dict(zip(ids, assignment.tolist()))
+        elif self.centroids is not None:
+            self.centroids = None
+            self.trained_size = 0
+            self.lists = {}
+
+        if self.quantized:
+            self._matrix = np.stack([self.rows[i][0] for i in ids]) if n else np.zeros((0, self.dim), np.int8)
+            self._scales = np.array([self.rows[i][1] for i in ids], dtype=np.float32)
+        else:
+            self._matrix = np.stack([self.rows[i] for i in ids]) if n else np.zeros((0, self.dim), np.float32)
+
+        self._list_rows = None
+        if self.centroids is not None:
+            grouped = {}
+            for row, expert_id in enumerate(ids):
+                grouped.setdefault(self.lists[expert_id], []).append(row)
+            self._list_rows = {c: np.asarray(rows) for c, rows in grouped.items()}
+        self._row_of = {expert_id: row for row, expert_id in enumerate(ids)}
+        self._ids = ids
+
+    def _scan(self, query: np.ndarray, rows: np.ndarray = None) -> np.ndarray:
+        """Cosines of the query against the given rows (default: all)."""
+        matrix = self._matrix if rows is None else self._matrix[rows]
+        if self.quantized:
+            scales = self._scales if rows is None else self._scales[rows]
+            return int8_cosine_scores(query, matrix, scales)
+        return matrix @ query
+
+    def scores(self, query: np.ndarray, expert_ids: List[str]) -> np.ndarray:
+        """Cosines of the query against the given experts of this partition."""
+        if self._ids is None:
+            self._build()
+        rows = np.array([self._row_of[i] for i in expert_ids], dtype=int)
+        # Past a quarter of the partition one block scan beats gathering rows
+        if len(rows) * 4 > len(self._ids):
+            return self._scan(query)[rows]
+        return self._scan(query, rows)
+
+    def search(self, query: np.ndarray, k: int) -> List[Tuple[str, float]]:
+        """Top-k (expert_id, cosine) pairs, best first."""
+        if self._ids is None:
+            self._build()
+        if not self._ids or k <= 0:
+            return []
+
+        if self._list_rows is not None:
+            nprobe = min(IVF_NPROBE, len(self.centroids))
+            probe = np.argpartition(-(self.centroids @ query), nprobe - 1)[:nprobe]
+            rows = np.concatenate([self._list_rows.get(int(c), np.zeros(0, dtype=int)) for c in probe])
+        else:
+            rows = np.arange(len(self._ids))
+        if len(rows) == 0:
+            return []
+
+        scores = self._scan(query, rows)
+
+        k = min(k, len(rows))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(self._ids[rows[i]], float(scores[i])) for i in top]
+
+
+class ExpertIndex:
+    """Category-partitioned expert vectors with exact and IVF top-k search."""
+
+    def __init__(self, collection=None, quantization: str = None):
+        """
+        Args:
+            collection: MongoDB experts collection the index is built from
+            quantization: 'int8' or 'none' (default: EMBEDDING_QUANTIZATION)
+        """
+        self.collection = collection
+        self.quantized = (quantization or QUANTIZATION_MODE) == 'int8'
+        self.partitions = {}
+        self.category_of = {}
+        self.dim = None
+        self.built = False
+        self.version = None     # Shared version the copy was built at
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self.category_of)
+
+    def invalidate(self) -> None:
+        """Drop all vectors; the next search rebuilds from the collection."""
+        with self._lock:
+            self.partitions = {}
+            self.category_of = {}
+            self.built = False
+
+    def _state(self):
+        if self.collection is None:
+            return None
+        return self.collection.database[INDEX_STATE_COLLECTION]
+
+    def stored_version(self) -> Optional[int]:
+        """Shared index version in MongoDB (None without a collection)."""
+        state = self._state()
+        if state is None:
+            return None
+        doc = state.find_one({'_id': 'experts'}, {'version': 1})
+        return doc.get('version', 0) if doc else 0
+
+    def _bump_version(self) -> Optional[int]:
+        state = self._state()
+        if state is None:
+            return None
+        doc = state.find_one_and_update(
+            {'_id': 'experts'},
+            {'$inc': {'version': 1}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        return doc['version']
+
+    def mark_stale(self) -> None:
+        """
+        Record a change to the experts collection that was not synced
+        expert by expert: every worker, this one included, rebuilds its
+        copy on its next read.
+        """
+        with self._lock:
+            self._bump_version()
+            self.invalidate()
+
+    def build(self) -> int:
+        """
+        Load every expert from the collection.
+
+        Experts without a stored embedding are embedded in one batched call.
+
+        Returns:
+            Number of experts indexed
+        """
+        with self._lock:
+            self.partitions = {}
+            self.category_of = {}
+            # Read before the experts, so changes made during the build
+            # trigger another one
+            self.version = self.stored_version()
+            if self.collection is not None:
+                experts = list(self.collection.find({}, {name: 1 for name in _INDEX_FIELDS}))
+                self._add_many(experts)
+            self.built = True
+            print(f"🗂️ Expert index built: {len(self)} experts in {len(self.partitions)} categories")
+            return len(self)
+
+    def ensure_built(self) -> None:
+        """Build on first use, and rebuild when another worker changed the experts."""
+        if not self.built or self.stored_version() != self.version:
+            self.build()
+
+    def _add_many(self, experts: List[Dict[str, Any]]) -> None:
+        embeddings = resolve_embeddings(experts, 'skillEmbedding', generate_expert_text)
+        for expert, embedding in zip(experts, embeddings):
+            self._upsert_vector(expert, decode_embedding(embedding))
+
+    def _upsert_vector(self, expert: Dict[str, Any], vector: Optional[np.ndarray]) -> None:
+        expert_id = str(expert['_id'])
+        self._remove(expert_id)
+        if vector is None:
+            return
+        if self.dim is None:
+            self.dim = len(vector)
+        unit = _unit(vector, self.dim)
+        if unit is None:
+            return
+        category = _category_key(expert)
+        if category not in self.partitions:
+            self.partitions[category] = _Partition(self.dim, self.quantized)
+        self.partitions[category].upsert(expert_id, unit)
+        self.category_of[expert_id] = category
+
+    def _remove(self, expert_id: str) -> None:
+        category = self.category_of.pop(expert_id, None)
+        if category is not None:
+            self.partitions[category].remove(expert_id)
+
+    def upsert(self, expert: Dict[str, Any]) -> None:
+        """Add or replace one expert (re-partitioned if its category changed)."""
+        with self._lock:
+            if self.built:
+                self._add_many([expert])
+
+    def remove(self, expert_id) -> None:
+        """Remove one expert."""
+        with self._lock:
+            if self.built:
+                self._remove(str(expert_id))
+
+    def sync(self, expert_ids: Iterable) -> None:
+        """
+        Re-read the given experts from the collection (removing deleted
+        ones) and bump the shared version so other workers rebuild.
+        """
+        ids = list(expert_ids)
+        if not ids or self.collection is None:
+            return
+        with self._lock:
+            version = self._bump_version()
+            if not self.built:
+                return
+            experts = list(self.collection.find({'_id': {'$in': ids}}, {name: 1 for name in _INDEX_FIELDS}))
+            found = {str(expert['_id']) for expert in experts}
+            for expert_id in ids:
+                if str(expert_id) not in found:
+                    self._remove(str(expert_id))
+            self._add_many(experts)
+            # Up to date without a rebuild only if no other worker changed
+            # the experts since this copy was last current
+            if self.version is not None and version == self.version + 1:
+                self.version = version
+
+    def search(
+        self,
+        query,
+        k: int,
+        categories: List[str] = None
+    ) -> Dict[str, List[Tuple[str, float]]]:
+        """
+        Top-k experts per category for a query vector.
+
+        Args:
+            query: Item embedding (list, array or stored value)
+            k: Experts returned per category
+            categories: Categories to search (default: all)
+
+        Returns:
+            Dictionary of category -> [(expert_id, cosine), ...], best first
+        """
+        with self._lock:
+            self.ensure_built()
+            vector = decode_embedding(query)
+            if vector is None or self.dim is None:
+                return {}
+            unit = _unit(vector, self.dim)
+            if unit is None:
+                return {}
+            names = categories or list(self.partitions)
+            return {
+                name: self.partitions[name].search(unit, k)
+                for name in names if name in self.partitions
+            }
+
+    def approximate_scores(self, query, expert_ids: List[Any]) -> np.ndarray:
+        """
+        Cosines of a query against the stored (int8 or float32) expert vectors.
+
+        Args:
+            query: Query vector (list, array or stored value)
+            expert_ids: Expert _ids to score
+
+        Returns:
+            Array of cosines aligned with expert_ids (NaN for experts not in
+            the index)
+        """
+        scores = np.full(len(expert_ids), np.nan)
+        with self._lock:
+            self.ensure_built()
+            vector = decode_embedding(query)
+            if vector is None or self.dim is None:
+                return scores
+            unit = _unit(vector, self.dim)
+            if unit is None:
+                return scores
+
+            by_category = {}
+            for position, expert_id in enumerate(expert_ids):
+                category = self.category_of.get(str(expert_id))
+                if category is not None:
+                    by_category.setdefault(category, []).append(position)
+            for category, positions in by_category.items():
+                ids = [str(expert_ids[p]) for p in positions]
+                scores[positions] = self.partitions[category].scores(unit, ids)
+        return scores
+
+    def stats(self) -> Dict[str, Any]:
+        """Partition sizes and search mode."""
+        with self._lock:
+            return {
+                'built': self.built,
+                'version': self.version,
+                'experts': len(self),
+                'dim': self.dim,
+                'quantized': self.quantized,
+                'partitions': {
+                    name: {
+                        'experts': len(partition),
+                        'mode': 'ivf' if len(partition) >= IVF_THRESHOLD else 'exact'
+                    }
+                    for name, partition in self.partitions.items()
+                }
+            }
+
+
+# Module-level index shared by the matching and expert routes
+_index = ExpertIndex()
+
+
+def init_expert_index(collection) -> None:
+    """Attach the experts collection (the index is built on first search)."""
+    _index.collection = collection
+    _index.invalidate()
+
+
+def get_expert_index() -> ExpertIndex:
+    return _index
+
+
+def retrieve_expert_ids(item_embedding, per_category: int = None) -> List[Any]:
+    """
+    _ids of the top experts per category for an item vector.
+
+    Args:
+        item_embedding: Item embedding (list, array or stored value)
+        per_category: Experts per category (default: DEFAULT_RETRIEVE_TOP)
+
+    Returns:
+        Expert _ids as strings, grouped by category, best first
+    """
+    per_category = DEFAULT_RETRIEVE_TOP if per_category is None else per_category
+    hits = _index.search(item_embedding, per_category)
+    return [expert_id for category_hits in hits.values() for expert_id, _ in category_hits]
+
+
+# Export
+__all__ = [
+    'ExpertIndex',
+    'INDEX_STATE_COLLECTION',
+    'IVF_THRESHOLD',
+    'IVF_NPROBE',
+    'DEFAULT_RETRIEVE_TOP',
+    'init_expert_index',
+    'get_expert_index',
+    'retrieve_expert_ids'
+]
@@ -0,0 +1,144 @@
+"""
+MIRA DRDO - LLM Response Cache Module
+
+Cache for Ollama scores and reasons, so the same item/expert pair is not
+sent to the LLM again on every panel regeneration or breakdown view:
+- Key: (prompt kind, model, prompt template version, SHA-256 of the
+  truncated texts and score context that go into the prompt)
+- Tier 1: bounded in-process LRU
+- Tier 2: MongoDB collection with a TTL index, shared across workers
+
+Because the key hashes exactly what the prompt contains, editing an expert
+or item changes the key and the stale entry is simply never read again
+(it expires with the TTL). Bump a template version when a prompt changes.
+"""
+
+import os
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+from .cache import LRUCache, content_hash
+
+
+# Prompt template versions; bump when the prompt text in similarity_calculator changes
+PROMPT_VERSIONS = {
+    'similarity': 'v1',
+    'batch_similarity': 'v1',
+    'reason': 'v1'
+}
+
+# Lifetime of cached responses
+LLM_CACHE_TTL = timedelta(days=int(os.getenv('LLM_CACHE_TTL_DAYS', '30')))
+
+
+class LLMCache:
+    """Two-tier cache of LLM responses keyed by prompt fingerprint."""
+
+    def __init__(self, max_size: int = 2048, collection=None, ttl: timedelta = LLM_CACHE_TTL):
+        """
+        Args:
+            max_size: Maximum number of responses held in memory
+            collection: MongoDB collection for the persistent tier (optional)
+            ttl: How long a response stays valid
+        """
+        self.memory = LRUCache(max_size)
+        self.collection = collection
+        self.ttl = ttl
+        self.memory_hits = 0
+        self.persistent_hits = 0
+        self.misses = 0
+        self.persistent_errors = 0
+
+    @staticmethod
+    def make_key(kind: str, model: str, *parts: str) -> str:
+        return f"{kind}:{model}:{PROMPT_VERSIONS[kind]}:{content_hash(*parts)}"
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return a cached response, or None on a miss or expired entry."""
+        now = datetime.now()
+        entry = self.memory.get(key)
+        if entry is not None and entry[1] > now:
+            self.memory_hits += 1
+            return entry[0]
+
+        if self.collection is not None:
+            try:
+                doc = self.collection.find_one({'_id': key})
+                # The TTL monitor runs periodically, so check expiry here too
+                if doc and doc.get('createdAt') and doc['createdAt'] + self.ttl > now:
+                    self.memory.put(key, (doc['value'], doc['createdAt'] + self.ttl))
+                    self.persistent_hits += 1
+                    return doc['value']
+            except Exception as e:
+                self.persistent_errors += 1
+                print(f"⚠️ LLM cache read failed: {e}")
+
+        self.misses += 1
+        return None
+
+    def peek(self, key: str) -> Optional[Any]:
+        """Return a response held in memory, without counting a lookup."""
+        entry = self.memory.get(key)
+        if entry is not None and entry[1] > datetime.now():
+            return entry[0]
+        return None
+
+    def put(self, key: str, value: Any) -> None:
+        """Store a response in both tiers."""
+        now = datetime.now()
+        self.memory.put(key, (value, now + self.ttl))
+        if self.collection is not None:
+            try:
+                self.collection.update_one(
+                    {'_id': key},
+                    {'$set': {'kind': key.split(':', 1)[0], 'value': value, 'createdAt': now}},
+                    upsert=True
+                )
+            except Exception as e:
+                self.persistent_errors += 1
+                print(f"⚠️ LLM cache write failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for both tiers."""
+        lookups = self.memory_hits + self.persistent_hits + self.misses
+        return {
+            'memory_size': len(self.memory),
+            'memory_max_size': self.memory.max_size,
+            'memory_hits': self.memory_hits,
+            'persistent_hits': self.persistent_hits,
+            'misses': self.misses,
+            'hit_rate': round((lookups - self.misses) / lookups, 4) if lookups else 0.0,
+            'persistent_enabled': self.collection is not None,
+            'persistent_errors': self.persistent_errors,
+            'ttl_days': self.ttl.days
+        }
+
+
+# Module-level cache shared by the LLM scoring functions
+_cache = LLMCache(max_size=int(os.getenv('LLM_CACHE_SIZE', '2048')))
+
+
+def init_llm_cache(collection) -> None:
+    """Attach the persistent MongoDB tier and its TTL index (called once at startup)."""
+    _cache.collection = collection
+    try:
+        collection.create_index('createdAt', expireAfterSeconds=int(_cache.ttl.total_seconds()))
+    except Exception as e:
+        print(f"⚠️ Could not create LLM cache TTL index: {e}")
+
+
+def get_llm_cache() -> LLMCache:
+    return _cache
+
+
+def get_llm_cache_stats() -> Dict[str, Any]:
+    return _cache.stats()
+
+
+# Export
+__all__ = [
+    'LLMCache',
+    'PROMPT_VERSIONS',
+    'init_llm_cache',
+    'get_llm_cache',
+    'get_llm_cache_stats'
+]
@@ -0,0 +1,411 @@
+"""
+MIRA DRDO - Ollama Client Module
+
+Pooled, bounded-concurrency client for the local Ollama server:
+- One shared ollama.Client whose HTTP connections are kept alive
+- At most OLLAMA_MAX_CONCURRENCY generate calls in flight at once
+  (match it to the server's OLLAMA_NUM_PARALLEL)
+- Per-call timeout (OLLAMA_TIMEOUT seconds)
+- A thread pool to fan out independent LLM calls with results returned
+  in input order
+- A health monitor: availability is probed with a cheap list() call and
+  cached for OLLAMA_STATUS_TTL seconds, then re-probed
+- A circuit breaker that opens after OLLAMA_BREAKER_FAILURES consecutive
+  failures or timeouts, rejects calls instantly while open, and lets one
+  trial call through (half-open) every OLLAMA_BREAKER_RESET seconds
+- Deadlines: map() can stop waiting when a request's latency budget runs
+  out and substitute a fallback for the calls that did not finish
+"""
+
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+
+# Generate calls allowed in flight at once
+DEFAULT_MAX_CONCURRENCY = int(os.getenv('OLLAMA_MAX_CONCURRENCY', '4'))
+
+# Seconds before a single generate call is abandoned
+DEFAULT_TIMEOUT = float(os.getenv('OLLAMA_TIMEOUT', '120'))
+
+# How long Ollama keeps the model loaded after a call (e.g. '5m'; None = server default)
+DEFAULT_KEEP_ALIVE = os.getenv('OLLAMA_KEEP_ALIVE') or None
+
+# Seconds a health probe result is trusted before re-probing
+STATUS_TTL = float(os.getenv('OLLAMA_STATUS_TTL', '30'))
+
+# Timeout of the health probe itself
+PROBE_TIMEOUT = float(os.getenv('OLLAMA_PROBE_TIMEOUT', '2'))
+
+# Consecutive failures that open the circuit, and seconds before a trial call
+BREAKER_FAILURES = int(os.getenv('OLLAMA_BREAKER_FAILURES', '3'))
+BREAKER_RESET = float(os.getenv('OLLAMA_BREAKER_RESET', '30'))
+
+# Default latency budget of a matching request in seconds (0 = no deadline)
+LATENCY_BUDGET = float(os.getenv('MATCHING_LATENCY_BUDGET', '60'))
+
+
+class Deadline:
+    """Point in time by which a request's LLM work has to be finished."""
+
+    def __init__(self, budget: float = None):
+        """
+        Args:
+            budget: Seconds from now (default: LATENCY_BUDGET; 0 or less = no deadline)
+        """
+        self.budget = LATENCY_BUDGET if budget is None else float(budget)
+        self.expires_at = time.monotonic() + self.budget if self.budget > 0 else None
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left (None when there is no deadline)."""
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        return self.expires_at is not None and time.monotonic() >= self.expires_at
+
+
+class OllamaUnavailableError(RuntimeError):
+    """Raised instead of calling Ollama while the circuit is open."""
+
+
+class CircuitBreaker:
+    """Closed / open / half-open breaker counting consecutive failures."""
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold: int = BREAKER_FAILURES, reset_timeout: float = BREAKER_RESET):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return self.CLOSED
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def allow(self) -> bool:
+        """Whether a call may go out now (one trial call at a time when half-open)."""
+        with self._lock:
+            state = self.state
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self.opened_at is not None:
+                print("✅ Ollama circuit closed")
+            self.failures = 0
+            self.opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            was_open = self.opened_at is not None
+            if was_open or self.failures >= self.failure_threshold:
+                # A failed trial call re-opens the circuit for another period
+                self.opened_at = time.monotonic()
+                if not was_open:
+                    print(f"⚠️ Ollama circuit opened after {self.failures} consecutive failures")
+            self._trial_in_flight = False
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'state': self.state,
+            'consecutive_failures': self.failures,
+            'failure_threshold': self.failure_threshold,
+            'reset_timeout': self.reset_timeout
+        }
+
+
+class OllamaClient:
+    """Thread-safe Ollama client with a concurrency limit and a worker pool."""
+
+    def __init__(
+        self,
+        host: str = None,
+        max_concurrency: int = None,
+        timeout: float = None,
+        keep_alive: str = None
+    ):
+        """
+        Args:
+            host: Ollama server URL (default: OLLAMA_HOST or the library default)
+            max_concurrency: Generate calls allowed in flight at once
+            timeout: Seconds per generate call
+            keep_alive: Model keep-alive passed to Ollama with every call
+        """
+        self.host = host or os.getenv('OLLAMA_HOST') or None
+        self.max_concurrency = max(1, max_concurrency or DEFAULT_MAX_CONCURRENCY)
+        self.timeout = timeout or DEFAULT_TIMEOUT
+        self.keep_alive = keep_alive or DEFAULT_KEEP_ALIVE
+        self._slots = threading.BoundedSemaphore(self.max_concurrency)
+        self._client = None
+        self._probe_client = None
+        self._executor = None
+        self._lock = threading.Lock()
+        self.breaker = CircuitBreaker()
+        self._status = None
+        self._status_at = 0.0
+
+    def _get_client(self):
+        """Create the underlying ollama.Client on first use."""
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    import httpx
+                    import ollama
+                    self._client = ollama.Client(
+                        host=self.host,
+                        timeout=self.timeout,
+                        limits=httpx.Limits(
+                            max_connections=self.max_concurrency,
+                            max_keepalive_connections=self.max_concurrency
+                        )
+                    )
+        return self._client
+
+    def list(self) -> Any:
+        """List installed models (also serves as a connectivity check)."""
+        return self._get_client().list()
+
+    def refresh_status(self) -> Dict[str, Any]:
+        """Probe the server with one short list() call and cache the result."""
+        if self._probe_client is None:
+            import ollama
+            self._probe_client = ollama.Client(host=self.host, timeout=PROBE_TIMEOUT)
+
+        was_available = self._status['available'] if self._status else None
+        try:
+            models = self._probe_client.list()
+            self.breaker.record_success()
+            status = {
+                'available': True,
+                'installed_models': [
+                    m.get('model') or m.get('name') for m in models.get('models', [])
+                ]
+            }
+            if was_available is not True:
+                print("✅ Ollama is available for local LLM inference")
+        except Exception as e:
+            self.breaker.record_failure()
+            status = {'available': False, 'installed_models': [], 'error': str(e)}
+            if was_available is not False:
+                print(f"⚠️ Ollama not available: {e}")
+                print("   Install Ollama from https://ollama.ai and run: ollama pull llama3.2")
+
+        self._status = status
+        self._status_at = time.monotonic()
+        return status
+
+    def is_available(self) -> bool:
+        """
+        Cheap availability check used before every LLM call.
+
+        Returns False immediately while the circuit is open; otherwise uses
+        the cached probe result and re-probes once it is older than the TTL
+        (or when the circuit is ready for a trial call).
+        """
+        state = self.breaker.state
+        if state == CircuitBreaker.OPEN:
+            return False
+        if state == CircuitBreaker.CLOSED and self._status is not None \
+                and time.monotonic() - self._status_at < STATUS_TTL:
+            return self._status['available']
+        with self._lock:
+            # Another thread may have probed while we waited
+            if self._status is not None and time.monotonic() - self._status_at < STATUS_TTL \
+                    and self.breaker.state == CircuitBreaker.CLOSED:
+                return self._status['available']
+            if not self.breaker.allow():
+                return False
+            return self.refresh_status()['available']
+
+    def status(self) -> Dict[str, Any]:
+        """Cached health status with circuit breaker state (probes at most once per TTL)."""
+        self.is_available()
+        status = dict(self._status or {'available': False, 'installed_models': []})
+        status['available'] = status['available'] and self.breaker.state != CircuitBreaker.OPEN
+        status['checked_seconds_ago'] = round(time.monotonic() - self._status_at, 1) if self._status else None
+        status['circuit'] = self.breaker.stats()
+        return status
+
+    def generate(
+        self,
+        prompt: str,
+        model: str,
+        options: Dict[str, Any] = None,
+        format: str = None
+    ) -> str:
+        """
+        Run one non-streaming generate call, waiting for a free slot.
+
+        Args:
+            prompt: Prompt text
+            model: Ollama model name
+            options: Sampling options (temperature, num_predict, ...)
+            format: 'json' to constrain the output to valid JSON
+
+        Returns:
+            The response text (raises on connection errors and timeouts)
+        """
+        if not self.breaker.allow():
+            raise OllamaUnavailableError("Ollama circuit is open")
+        client = self._get_client()
+        try:
+            with self._slots:
+                response = client.generate(
+                    model=model,
+                    prompt=prompt,
+                    options=options,
+                    format=format,
+                    keep_alive=self.keep_alive
+                )
+        except Exception:
+            self.breaker.record_failure()
+            raise
+        self.breaker.record_success()
+        return response.get('response', '')
+
+    def generate_stream(
+        self,
+        prompt: str,
+        model: str,
+        options: Dict[str, Any] = None
+    ) -> Iterator[str]:
+        """
+        Streaming generate call yielding response text chunks as Ollama produces them.
+
+        The concurrency slot is held until the stream is exhausted or closed.
+        """
+        if not self.breaker.allow():
+            raise OllamaUnavailableError("Ollama circuit is open")
+        client = self._get_client()
+        with self._slots:
+            try:
+                for chunk in client.generate(
+                    model=model,
+                    prompt=prompt,
+                    options=options,
+                    stream=True,
+                    keep_alive=self.keep_alive
+                ):
+                    text = chunk.get('response', '')
+                    if text:
+                        yield text
+            except GeneratorExit:
+                # Closed by the reader (e.g. client disconnected), not a server failure
+                self.breaker.record_success()
+                raise
+            except Exception:
+                self.breaker.record_failure()
+                raise
+        self.breaker.record_success()
+
+    def map(
+        self,
+        fn: Callable[[Any], Any],
+        items: Iterable[Any],
+        deadline: Deadline = None,
+        fallback: Callable[[Any], Any] = None
+    ) -> List[Any]:
+        """
+        Apply fn to every item on the worker pool.
+
+        Results are returned in input order. With a single item (or a
+        concurrency limit of 1) fn runs on the calling thread, unless a
+        deadline is given.
+
+        Args:
+            fn: Function to apply
+            items: Inputs, submitted in order (put the most important first)
+            deadline: Stop waiting when it expires; calls still queued are
+                cancelled and calls in flight are left to finish in the background
+            fallback: Produces the result for an item that missed the
+                deadline (default: None)
+        """
+        items = list(items)
+        if deadline is None or deadline.expires_at is None:
+            if len(items) <= 1 or self.max_concurrency == 1:
+                return [fn(item) for item in items]
+            return list(self._get_executor().map(fn, items))
+
+        if deadline.expired():
+            futures = []
+        else:
+            executor = self._get_executor()
+            futures = [executor.submit(fn, item) for item in items]
+            wait(futures, timeout=deadline.remaining())
+
+        results = []
+        for n, item in enumerate(items):
+            future = futures[n] if futures else None
+            if future is not None and future.done() and not future.cancelled():
+                results.append(future.result())
+            else:
+                if future is not None:
+                    future.cancel()
+                results.append(fallback(item) if fallback else None)
+        return results
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_concurrency,
+                        thread_name_prefix='ollama'
+                    )
+        return self._executor
+
+
+# Module-level client shared by all LLM calls
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_ollama_client() -> OllamaClient:
+    """Return the shared client, creating it from the environment on first use."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = OllamaClient()
+    return _client
+
+
+def set_ollama_client(client: Optional[OllamaClient]) -> None:
+    """Replace the shared client (e.g. to point at another host)."""
+    global _client
+    with _client_lock:
+        _client = client
+
+
+# Export
+__all__ = [
+    'OllamaClient',
+    'CircuitBreaker',
+    'OllamaUnavailableError',
+    'Deadline',
+    'LATENCY_BUDGET',
+    'DEFAULT_MAX_CONCURRENCY',
+    'DEFAULT_TIMEOUT',
+    'get_ollama_client',
+    'set_ollama_client'
+]
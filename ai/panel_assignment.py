@@ -0,0 +1,345 @@
+"""
+MIRA DRDO - Global Panel Assignment Module
+
+Fills the panels of many items at once (e.g. every item of one
+advertisement) instead of letting each item greedily take its best
+experts, which puts the same top expert on every board:
+- Maximizes the total relevance score over all seats
+- Each item gets the per-category seats of its panel composition
+- No expert sits on more than max_boards panels
+- Excluded pairs (e.g. experts who declined an item) are never assigned
+
+Every expert belongs to one category, so this is a bipartite b-matching
+whose LP relaxation is integral: scipy's MILP solver (HiGHS) solves it at
+the root. Without scipy, or with method='greedy', a greedy assignment
+improved by local search (replacements and pairwise swaps) is used.
+
+Candidate pairs are pruned without losing optimality: an item only needs
+an expert ranked below its top (seats + other items' seats in the
+category / max_boards) of a category if every better one is saturated on
+other boards, which cannot happen.
+"""
+
+import os
+import time
+from collections import Counter
+from typing import Any, Dict, List, Set, Tuple
+import numpy as np
+from .panel_generator import PANEL_SIZES, DEFAULT_PANEL_COMPOSITION
+
+
+# Boards a single expert may sit on by default
+MAX_BOARDS_PER_EXPERT = int(os.getenv('PANEL_MAX_BOARDS_PER_EXPERT', '2'))
+
+# Improvement rounds of the greedy fallback's local search
+LOCAL_SEARCH_ROUNDS = int(os.getenv('PANEL_LOCAL_SEARCH_ROUNDS', '20'))
+
+# Seconds the MILP solver may run before the greedy result is used
+MILP_TIME_LIMIT = float(os.getenv('PANEL_MILP_TIME_LIMIT', '30'))
+
+# Value of a filled seat, above any score difference: filling every seat
+# comes first, the total score second
+_SEAT_BONUS = 1000.0
+
+_CATEGORY_ORDER = {'chairperson': 0, 'departmental': 1, 'external': 2}
+
+# (item_id, expert_id, category, score)
+Pair = Tuple[str, str, str, float]
+
+
+def _candidate_pairs(
+    item_scores: Dict[str, List[Dict[str, Any]]],
+    compositions: Dict[str, Dict[str, int]],
+    max_boards: int,
+    excluded_pairs: Dict[str, Set[str]],
+    excluded_experts: Set[str]
+) -> Tuple[List[Pair], int]:
+    """
+    Candidate (item, expert) pairs after exclusions and exact pruning.
+
+    Returns:
+        Tuple of (pairs, number of pairs before pruning)
+    """
+    total_seats = Counter()
+    for composition in compositions.values():
+        total_seats.update(composition)
+
+    pairs = []
+    considered = 0
+    for item_id, scored_experts in item_scores.items():
+        composition = compositions[item_id]
+        blocked = excluded_pairs.get(item_id, set())
+        by_category = {}
+        for scored in scored_experts:
+            expert_id = scored.get('expert_id')
+            category = (scored.get('category') or '').lower()
+            if ('error' in scored or not expert_id or category not in composition
+                    or expert_id in blocked or expert_id in excluded_experts):
+                continue
+            by_category.setdefault(category, []).append((float(scored.get('final_score', 0)), expert_id))
+
+        for category, ranked in by_category.items():
+            seats = composition[category]
+            considered += len(ranked)
+            keep = seats + (total_seats[category] - seats) // max(1, max_boards)
+            ranked.sort(reverse=True)
+            pairs.extend((item_id, expert_id, category, score) for score, expert_id in ranked[:keep])
+    return pairs, considered
+
+
+def _solve_milp(
+    pairs: List[Pair],
+    compositions: Dict[str, Dict[str, int]],
+    max_boards: int,
+    time_limit: float
+):
+    """Optimal assignment with scipy's MILP solver (None if unavailable or unsolved)."""
+    try:
+        from scipy.optimize import milp, LinearConstraint, Bounds
+        from scipy.sparse import coo_matrix
+    except ImportError:
+        return None
+
+    seat_rows = {}
+    upper = []
+    for item_id, composition in compositions.items():
+        for category, seats in composition.items():
+            seat_rows[(item_id, category)] = len(upper)
+            upper.append(seats)
+    expert_rows = {}
+    for _, expert_id, _, _ in pairs:
+        if expert_id not in expert_rows:
+            expert_rows[expert_id] = len(upper)
+            upper.append(max_boards)
+
+    rows = np.empty(2 * len(pairs), dtype=np.int64)
+    rows[0::2] = [seat_rows[(item_id, category)] for item_id, _, category, _ in pairs]
+    rows[1::2] = [expert_rows[expert_id] for _, expert_id, _, _ in pairs]
+    cols = np.repeat(np.arange(len(pairs)), 2)
+    constraints = coo_matrix(
+        (np.ones(len(rows)), (rows, cols)), shape=(len(upper), len(pairs))
+    ).tocsr()
+
+    scores = np.array([score for _, _, _, score in pairs], dtype=np.float64)
+    result = milp(
+        -(scores + _SEAT_BONUS),
+        constraints=LinearConstraint(constraints, -np.inf, np.array(upper, dtype=np.float64)),
+        integrality=np.ones(len(pairs)),
+        bounds=Bounds(0, 1),
+        options={'time_limit': time_limit}
+    )
+    if result.x is None:
+        return None
+    return {k for k in np.flatnonzero(result.x > 0.5)}
+
+
+def _solve_greedy(
+    pairs: List[Pair],
+    compositions: Dict[str, Dict[str, int]],
+    max_boards: int,
+    rounds: int
+) -> Set[int]:
+    """Greedy assignment by score, improved by replacements and pairwise swaps."""
+    seats = {
+        (item_id, category): count
+        for item_id, composition in compositions.items()
+        for category, count in composition.items()
+    }
+    pair_index = {(item_id, expert_id): k for k, (item_id, expert_id, _, _) in enumerate(pairs)}
+    candidates = {}  # seat -> candidate pair indices, best first
+    for k in sorted(range(len(pairs)), key=lambda k: -pairs[k][3]):
+        candidates.setdefault((pairs[k][0], pairs[k][2]), []).append(k)
+
+    load = Counter()
+    members = {seat: set() for seat in seats}
+    for k in sorted(range(len(pairs)), key=lambda k: -pairs[k][3]):
+        item_id, expert_id, category, _ = pairs[k]
+        if len(members[(item_id, category)]) < seats[(item_id, category)] and load[expert_id] < max_boards:
+            members[(item_id, category)].add(k)
+            load[expert_id] += 1
+
+    for _ in range(rounds):
+        improved = False
+
+        # Replacement: a better expert with spare capacity takes a seat
+        # (or fills a seat left open)
+        for seat, ranked in candidates.items():
+            for k in ranked:
+                if k in members[seat] or load[pairs[k][1]] >= max_boards:
+                    continue
+                if len(members[seat]) < seats[seat]:
+                    members[seat].add(k)
+                    load[pairs[k][1]] += 1
+                    improved = True
+                    continue
+                worst = min(members[seat], key=lambda m: pairs[m][3], default=None)
+                if worst is None or pairs[k][3] <= pairs[worst][3]:
+                    break  # Candidates are best first: no later one is better
+                members[seat].remove(worst)
+                load[pairs[worst][1]] -= 1
+                members[seat].add(k)
+                load[pairs[k][1]] += 1
+                improved = True
+
+        # Swap: two items of the same category exchange members
+        by_category = {}
+        for seat in members:
+            by_category.setdefault(seat[1], []).append(seat)
+        for category, category_seats in by_category.items():
+            for a, seat_a in enumerate(category_seats):
+                for seat_b in category_seats[a + 1:]:
+                    for k_a in list(members[seat_a]):
+                        for k_b in list(members[seat_b]):
+                            if k_a not in members[seat_a]:
+                                break
+                            swapped_a = pair_index.get((seat_a[0], pairs[k_b][1]))
+                            swapped_b = pair_index.get((seat_b[0], pairs[k_a][1]))
+                            if swapped_a is None or swapped_b is None:
+                                continue
+                            if swapped_a in members[seat_a] or swapped_b in members[seat_b]:
+                                continue
+                            gain = (pairs[swapped_a][3] + pairs[swapped_b][3]) - (pairs[k_a][3] + pairs[k_b][3])
+                            if gain > 1e-9:
+                                members[seat_a].remove(k_a)
+                                members[seat_b].remove(k_b)
+                                members[seat_a].add(swapped_a)
+                                members[seat_b].add(swapped_b)
+                                improved = True
+                                break
+
+        if not improved:
+            break
+
+    return set().union(*members.values()) if members else set()
+
+
+def _independent_baseline(item_scores, compositions) -> Tuple[float, int]:
+    """Total score and busiest expert's load when every item picks on its own."""
+    total = 0.0
+    load = Counter()
+    for item_id, scored_experts in item_scores.items():
+        for category, seats in compositions[item_id].items():
+            ranked = sorted(
+                (e for e in scored_experts
+                 if 'error' not in e and (e.get('category') or '').lower() == category),
+                key=lambda e: -e.get('final_score', 0)
+            )[:seats]
+            total += sum(e.get('final_score', 0) for e in ranked)
+            load.update(e['expert_id'] for e in ranked)
+    return round(total, 2), max(load.values(), default=0)
+
+
+def assign_panels(
+    item_scores: Dict[str, List[Dict[str, Any]]],
+    panel_sizes: Dict[str, int] = None,
+    max_boards: int = None,
+    excluded_pairs: Dict[str, Set[str]] = None,
+    excluded_experts: Set[str] = None,
+    method: str = 'auto',
+    time_limit: float = None
+) -> Dict[str, Any]:
+    """
+    Fill the panels of several items together.
+
+    Args:
+        item_scores: Item _id -> scored experts (batch_calculate_relevance_scores
+            results, or the score store's load_scored_experts)
+        panel_sizes: Item _id -> panel size (3, 5 or 7; default 5)
+        max_boards: Panels one expert may sit on (default: MAX_BOARDS_PER_EXPERT)
+        excluded_pairs: Item _id -> expert ids never assigned to that item
+        excluded_experts: Expert ids never assigned
+        method: 'milp', 'greedy' or 'auto' (MILP, falling back to greedy)
+        time_limit: Seconds for the MILP solver (default: MILP_TIME_LIMIT)
+
+    Returns:
+        Dictionary containing:
+        - panels: Item _id -> recommended_panel and panel_composition
+        - total_score / seats_filled / seats_total
+        - max_expert_load / experts_used
+        - independent_total_score / independent_max_expert_load: the same
+          figures when each item picks its panel on its own
+        - method / solve_seconds / candidate_pairs / pairs_considered
+    """
+    panel_sizes = panel_sizes or {}
+    max_boards = MAX_BOARDS_PER_EXPERT if max_boards is None else max(1, int(max_boards))
+    compositions = {
+        item_id: PANEL_SIZES.get(panel_sizes.get(item_id, 5), DEFAULT_PANEL_COMPOSITION)
+        for item_id in item_scores
+    }
+
+    started = time.perf_counter()
+    pairs, considered = _candidate_pairs(
+        item_scores, compositions, max_boards, excluded_pairs or {}, set(excluded_experts or ())
+    )
+
+    chosen = None
+    used_method = 'greedy'
+    if method in ('auto', 'milp'):
+        chosen = _solve_milp(pairs, compositions, max_boards, MILP_TIME_LIMIT if time_limit is None else time_limit)
+        if chosen is not None:
+            used_method = 'milp'
+        else:
+            print("⚠️ MILP panel assignment unavailable, using greedy with local search")
+    if chosen is None:
+        chosen = _solve_greedy(pairs, compositions, max_boards, LOCAL_SEARCH_ROUNDS)
+    solve_seconds = time.perf_counter() - started
+
+    # Build each item's panel from its scored experts
+    scored_by_pair = {
+        (item_id, scored.get('expert_id')): scored
+        for item_id, scored_experts in item_scores.items()
+        for scored in scored_experts
+    }
+    panels = {item_id: [] for item_id in item_scores}
+    load = Counter()
+    for k in chosen:
+        item_id, expert_id, category, _ = pairs[k]
+        panels[item_id].append({
+            **scored_by_pair[(item_id, expert_id)],
+            'panel_role': 'chairperson' if category == 'chairperson' else 'member',
+            'selection_type': 'ai_assigned'
+        })
+        load[expert_id] += 1
+
+    results = {}
+    for item_id, panel in panels.items():
+        panel.sort(key=lambda x: (_CATEGORY_ORDER.get((x.get('category') or '').lower(), 99),
+                                  -x.get('final_score', 0)))
+        composition = compositions[item_id]
+        results[item_id] = {
+            'recommended_panel': panel,
+            'panel_composition': {
+                'target': composition,
+                'actual': {
+                    category: sum(1 for e in panel if (e.get('category') or '').lower() == category)
+                    for category in composition
+                }
+            },
+            'average_score': round(
+                sum(e.get('final_score', 0) for e in panel) / len(panel) if panel else 0, 2
+            )
+        }
+
+    independent_total, independent_load = _independent_baseline(item_scores, compositions)
+    return {
+        'panels': results,
+        'total_score': round(sum(pairs[k][3] for k in chosen), 2),
+        'seats_filled': len(chosen),
+        'seats_total': sum(sum(c.values()) for c in compositions.values()),
+        'max_expert_load': max(load.values(), default=0),
+        'experts_used': len(load),
+        'max_boards_per_expert': max_boards,
+        'independent_total_score': independent_total,
+        'independent_max_expert_load': independent_load,
+        'method': used_method,
+        'solve_seconds': round(solve_seconds, 3),
+        'candidate_pairs': len(pairs),
+        'pairs_considered': considered
+    }
+
+
+# Export functions
+__all__ = [
+    'assign_panels',
+    'MAX_BOARDS_PER_EXPERT'
+]
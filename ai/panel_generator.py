@@ -3,14 +3,19 @@ MIRA DRDO - Panel Generator Module
 
 This module generates optimal interview panels by:
 1. Ranking all experts by their relevance scores
-2. Selecting the best experts per category (Chairperson, Departmental, External)
-3. Ensuring panel composition requirements are met
+2. Selecting the highest-scoring panel that meets the composition rules
+   (the category counts of the panel size plus any custom rules, such as
+   "an external from outside DRDO" or "no two members from the same
+   affiliation"; see panel_rules.py)
 
 Returns both "AI Default Panel" and "All Scored Experts" for manual selection.
 """
 
-from typing import List, Dict, Any, Optional, Tuple
-from .relevance_scorer import batch_calculate_relevance_scores, rank_experts
+from typing import List, Dict, Any
+from .relevance_scorer import batch_calculate_relevance_scores, rank_experts, llm_usage_summary
+from .candidate_pool import CandidatePool
+from .ollama_client import Deadline
+from .panel_rules import category_rules, parse_rules, check_rules, solve_panel
 
 
 # Default panel composition
@@ -27,6 +32,9 @@ PANEL_SIZES = {
     7: {'chairperson': 1, 'departmental': 3, 'external': 3}
 }
 
+# The panel size presets as composition rules
+PANEL_RULES = {size: category_rules(composition) for size, composition in PANEL_SIZES.items()}
+
 
 def generate_optimal_panel(
     item: Dict[str, Any],
@@ -34,11 +42,28 @@ def generate_optimal_panel(
     candidates: List[Dict[str, Any]] = None,
     panel_size: int = 5,
     weights: Dict[str, float] = None,
-    use_llm: bool = False
+    use_llm: bool = False,
+    top_candidates: int = 0,
+    candidate_pool: CandidatePool = None,
+    quantization: str = None,
+    llm_rerank_top: int = None,
+    llm_batch_size: int = None,
+    deadline: Deadline = None,
+    scored_experts: List[Dict[str, Any]] = None,
+    use_surrogate: bool = None,
+    use_cross_encoder: bool = None,
+    branch_and_bound: bool = False,
+    rules: List[Dict[str, Any]] = None
 ) -> Dict[str, Any]:
     """
     Generate the optimal interview panel for an item.
     
+    The panel is the highest-scoring set of experts satisfying the
+    category counts of panel_size and the custom rules together. If no
+    set satisfies them, the counts are relaxed as little as possible (and
+    last the distinct rules) and the result lists the rules the panel
+    breaks.
+    
     Args:
         item: Item document from MongoDB
         experts: All available expert documents
@@ -46,6 +71,24 @@ def generate_optimal_panel(
         panel_size: Target panel size (3, 5, or 7)
         weights: Custom scoring weights
         use_llm: Whether to use LLM for scoring (slower but more accurate)
+        top_candidates: Number of best matching candidates to attach per expert
+        candidate_pool: Prepared CandidatePool (built from candidates if omitted)
+        quantization: 'int8' to shortlist experts on int8 vectors before scoring
+        llm_rerank_top: Experts per category scored by the LLM (0 = all)
+        llm_batch_size: Expert profiles per LLM scoring prompt
+        deadline: Request deadline for the LLM work (experts not reached
+            in time are ranked on cosine scores)
+        scored_experts: Results of batch_calculate_relevance_scores to build
+            the panel from (skips scoring; the scoring options are ignored)
+        use_surrogate: Whether w2 comes from the distilled model
+            (default: W2_SURROGATE setting)
+        use_cross_encoder: Whether w2 comes from the CrossEncoder where not
+            LLM-scored (default: W2_CROSS_ENCODER setting)
+        branch_and_bound: With use_llm, give LLM calls only to experts that
+            can still reach their category's panel slots (replaces
+            llm_rerank_top; fill slots are picked on the scores available)
+        rules: Composition rules added to the panel size's category counts
+            (see panel_rules.py); experts supply the profile fields they read
         
     Returns:
         Dictionary containing:
@@ -53,64 +96,48 @@ def generate_optimal_panel(
         - all_scored_experts: All experts with their scores
         - panel_composition: Breakdown by category
         - item_id: Reference to the item
+        - llm_usage: LLM calls made and avoided by reranking
+        - rules / constraints: Rules applied and how the solver met them
+    
+    Raises:
+        ValueError: If a rule is malformed
     """
     # Get panel composition for the size
     composition = PANEL_SIZES.get(panel_size, DEFAULT_PANEL_COMPOSITION)
+    panel_rules = category_rules(composition) + parse_rules(rules)
     
     # Calculate scores for all experts
-    scored_experts = batch_calculate_relevance_scores(
-        item,
-        experts,
-        candidates,
-        weights,
-        use_llm=use_llm
-    )
+    if scored_experts is None:
+        scored_experts = batch_calculate_relevance_scores(
+            item,
+            experts,
+            candidates,
+            weights,
+            use_llm=use_llm,
+            candidate_pool=candidate_pool,
+            top_candidates=top_candidates,
+            quantization=quantization,
+            llm_rerank_top=llm_rerank_top,
+            llm_batch_size=llm_batch_size,
+            deadline=deadline,
+            use_surrogate=use_surrogate,
+            use_cross_encoder=use_cross_encoder,
+            prune_top_k=composition if branch_and_bound else None
+        )
     
     # Rank all experts
     ranked_experts = rank_experts(scored_experts)
     
-    # Select best experts per category
-    recommended_panel = []
-    selected_ids = set()
-    
-    # Group by category
-    experts_by_category = {
-        'chairperson': [],
-        'departmental': [],
-        'external': []
-    }
-    
-    for expert in ranked_experts:
-        category = expert.get('category', 'departmental').lower()
-        if category in experts_by_category:
-            experts_by_category[category].append(expert)
-    
-    # Select top experts from each category
-    for category, count in composition.items():
-        available = experts_by_category.get(category, [])
-        for expert in available[:count]:
-            if expert['expert_id'] not in selected_ids:
-                recommended_panel.append({
-                    **expert,
-                    'panel_role': 'chairperson' if category == 'chairperson' else 'member',
-                    'selection_type': 'ai_recommended'
-                })
-                selected_ids.add(expert['expert_id'])
-    
-    # If we couldn't fill all slots, add from remaining experts
-    total_needed = sum(composition.values())
-    while len(recommended_panel) < total_needed:
-        for expert in ranked_experts:
-            if expert['expert_id'] not in selected_ids:
-                recommended_panel.append({
-                    **expert,
-                    'panel_role': 'member',
-                    'selection_type': 'ai_recommended_fill'
-                })
-                selected_ids.add(expert['expert_id'])
-                break
-        else:
-            break  # No more experts available
+    # Highest-scoring panel satisfying the composition rules
+    solution = solve_panel(ranked_experts, sum(composition.values()), panel_rules, experts)
+    recommended_panel = [
+        {
+            **expert,
+            'panel_role': 'chairperson' if (expert.get('category') or '').lower() == 'chairperson' else 'member',
+            'selection_type': selection_type
+        }
+        for expert, selection_type in solution['panel']
+    ]
     
     # Sort recommended panel by category order
     category_order = {'chairperson': 0, 'departmental': 1, 'external': 2}
@@ -130,6 +157,17 @@ def generate_optimal_panel(
             }
         },
         'panel_size': len(recommended_panel),
+        'rules': panel_rules,
+        'constraints': {
+            'satisfied': solution['feasible'],
+            'issues': check_rules(recommended_panel, panel_rules, experts) if solution['relaxed'] else [],
+            'optimal': solution['optimal'],
+            'eligible_experts': solution['eligible_experts'],
+            'candidates_considered': solution['candidates_considered'],
+            'nodes': solution['nodes'],
+            'solve_seconds': solution['solve_seconds']
+        },
+        'llm_usage': llm_usage_summary(scored_experts, use_llm, llm_batch_size),
         'average_score': round(
             sum(e.get('final_score', 0) for e in recommended_panel) / len(recommended_panel)
             if recommended_panel else 0,
@@ -142,7 +180,11 @@ def get_expert_score_breakdown(
     item: Dict[str, Any],
     expert: Dict[str, Any],
     candidates: List[Dict[str, Any]] = None,
-    use_llm: bool = True
+    use_llm: bool = True,
+    candidate_pool: CandidatePool = None,
+    deadline: Deadline = None,
+    use_surrogate: bool = None,
+    use_cross_encoder: bool = None
 ) -> Dict[str, Any]:
     """
     Get detailed score breakdown for a single expert-item pair.
@@ -152,6 +194,10 @@ def get_expert_score_breakdown(
         expert: Expert document
         candidates: Candidate documents
         use_llm: Whether to use LLM for detailed analysis
+        candidate_pool: Prepared CandidatePool (built from candidates if omitted)
+        deadline: Request deadline for the LLM calls
+        use_surrogate: Whether w2 comes from the distilled model
+        use_cross_encoder: Whether w2 comes from the CrossEncoder
         
     Returns:
         Detailed score breakdown with explanations
@@ -162,7 +208,11 @@ def get_expert_score_breakdown(
         item,
         expert,
         candidates,
-        use_llm=use_llm
+        use_llm=use_llm,
+        candidate_pool=candidate_pool,
+        deadline=deadline,
+        use_surrogate=use_surrogate,
+        use_cross_encoder=use_cross_encoder
     )
     
     return {
@@ -207,16 +257,25 @@ def _interpret_scores(component_scores: Dict[str, float]) -> Dict[str, str]:
     return interpretations
 
 
-def validate_panel(panel: List[Dict[str, Any]], requirements: Dict[str, int] = None) -> Dict[str, Any]:
+def validate_panel(
+    panel: List[Dict[str, Any]],
+    requirements: Any = None,
+    experts: List[Dict[str, Any]] = None
+) -> Dict[str, Any]:
     """
     Validate that a panel meets composition requirements.
     
     Args:
         panel: List of selected experts
-        requirements: Required count per category
+        requirements: Required count per category, or a list of
+            composition rules (see panel_rules.py)
+        experts: Expert documents for profile fields the rules read
         
     Returns:
         Validation result with any issues
+    
+    Raises:
+        ValueError: If a rule is malformed
     """
     if requirements is None:
         requirements = DEFAULT_PANEL_COMPOSITION
@@ -227,6 +286,16 @@ def validate_panel(panel: List[Dict[str, Any]], requirements: Dict[str, int] = N
         category = expert.get('category', 'unknown')
         counts[category] = counts.get(category, 0) + 1
     
+    if isinstance(requirements, list):
+        rules = parse_rules(requirements)
+        issues = check_rules(panel, rules, experts)
+        return {
+            'valid': len(issues) == 0,
+            'issues': issues,
+            'counts': counts,
+            'requirements': rules
+        }
+    
     # Check requirements
     issues = []
     for category, required in requirements.items():
@@ -289,5 +358,6 @@ __all__ = [
     'validate_panel',
     'suggest_replacements',
     'PANEL_SIZES',
+    'PANEL_RULES',
     'DEFAULT_PANEL_COMPOSITION'
 ]
@@ -0,0 +1,557 @@
+"""
+MIRA DRDO - Panel Composition Rules Module
+
+Declarative panel composition rules and the solver that finds the
+highest-scoring panel satisfying all of them. Rules are plain dicts, so
+they can come straight from a request body:
+
+- count: between "min" and "max" members match "where"
+  {"type": "count", "where": {"category": "external",
+                              "organization": {"not": "DRDO"}}, "min": 1}
+- distinct: no two members share a (non-empty) value of "field"
+  {"type": "distinct", "field": "affiliation"}
+- each: every member matching "where" (default: every member) matches "must"
+  {"type": "each", "must": {"experience_years": {"min": 15}}}
+
+A condition maps fields to a value (equal, case-insensitive), a list (any
+of them) or an object with "not", "in", "min" and/or "max". Fields are
+read from the scored expert, then from the expert document;
+"experience_years" is parsed from the expert's experience text ("30 years").
+
+The solver:
+1. Drops experts failing an "each" rule
+2. Ranks the rest within groups of experts matching the same count rules
+   and keeps only the experts that can be in an optimal panel: once a
+   group has enough better experts that conflict with no one else in it,
+   any lower one on a panel can be swapped for one of them
+3. Runs branch and bound over the remaining experts in score order,
+   bounded by the best remaining scores and cut as soon as the unmet
+   minimums no longer fit the open seats, within a node and time budget
+"""
+
+import os
+import re
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+
+# Search nodes per attempt before the best panel found so far is returned
+# as not proven optimal
+PANEL_SOLVER_NODE_LIMIT = int(os.getenv('PANEL_SOLVER_NODE_LIMIT', '200000'))
+
+# Seconds of search over all attempts; past it the remaining attempts are
+# skipped and the best scores fill the panel
+PANEL_SOLVER_TIME_LIMIT = float(os.getenv('PANEL_SOLVER_TIME_LIMIT', '2.0'))
+
+RULE_TYPES = ('count', 'distinct', 'each')
+
+_CONDITION_OPERATORS = ('not', 'in', 'min', 'max')
+_YEARS_PATTERN = re.compile(r'(\d+(?:\.\d+)?)\s*\+?\s*(?:years?|yrs?)', re.IGNORECASE)
+
+
+def category_rules(composition: Dict[str, int]) -> List[Dict[str, Any]]:
+    """Count rules requiring exactly composition[category] members of each category."""
+    return [
+        {'type': 'count', 'where': {'category': category}, 'min': count, 'max': count}
+        for category, count in composition.items()
+    ]
+
+
+def _parse_condition(condition: Any, label: str) -> Dict[str, Any]:
+    if not isinstance(condition, dict):
+        raise ValueError(f"{label} must be an object of field conditions")
+    for field, expected in condition.items():
+        if not isinstance(expected, dict):
+            continue
+        unknown = set(expected) - set(_CONDITION_OPERATORS)
+        if unknown or not expected:
+            raise ValueError(
+                f"{label}.{field}: use {', '.join(_CONDITION_OPERATORS)} (got {', '.join(sorted(unknown)) or 'nothing'})"
+            )
+        for bound in ('min', 'max'):
+            if bound in expected and not isinstance(expected[bound], (int, float)):
+                raise ValueError(f"{label}.{field}.{bound} must be a number")
+    return condition
+
+
+def parse_rules(rules: Any) -> List[Dict[str, Any]]:
+    """
+    Validate composition rules and fill in their defaults.
+
+    Args:
+        rules: List of rule objects (see module docstring), or None
+
+    Returns:
+        Normalized rules
+
+    Raises:
+        ValueError: If a rule is malformed
+    """
+    if rules is None:
+        return []
+    if not isinstance(rules, list):
+        raise ValueError("rules must be a list")
+
+    parsed = []
+    for i, rule in enumerate(rules):
+        label = f"Rule {i + 1}"
+        if not isinstance(rule, dict):
+            raise ValueError(f"{label} must be an object")
+        rule_type = rule.get('type')
+        if rule_type not in RULE_TYPES:
+            raise ValueError(f"{label}: type must be one of {', '.join(RULE_TYPES)}")
+
+        if rule_type == 'distinct':
+            field = rule.get('field')
+            if not isinstance(field, str) or not field:
+                raise ValueError(f"{label}: distinct needs a field")
+            parsed.append({'type': 'distinct', 'field': field})
+            continue
+
+        where = _parse_condition(rule.get('where', {}), f"{label} where")
+        if rule_type == 'each':
+            must = _parse_condition(rule.get('must'), f"{label} must")
+            if not must:
+                raise ValueError(f"{label}: each needs a non-empty must")
+            parsed.append({'type': 'each', 'where': where, 'must': must})
+            continue
+
+        minimum, maximum = rule.get('min', 0), rule.get('max')
+        if not isinstance(minimum, int) or minimum < 0:
+            raise ValueError(f"{label}: min must be a non-negative integer")
+        if maximum is not None and (not isinstance(maximum, int) or maximum < minimum):
+            raise ValueError(f"{label}: max must be an integer of at least min")
+        parsed.append({'type': 'count', 'where': where, 'min': minimum, 'max': maximum})
+
+    return parsed
+
+
+def rule_fields(rules: List[Dict[str, Any]]) -> List[str]:
+    """Expert fields the rules read."""
+    fields = []
+    for rule in rules:
+        names = [rule['field']] if rule['type'] == 'distinct' else \
+            list(rule.get('where', {})) + list(rule.get('must', {}))
+        fields.extend(name for name in names if name not in fields)
+    return fields
+
+
+def _experience_years(value: Any) -> Optional[float]:
+    """Years of experience from a number or a text such as "30 years"."""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    if isinstance(value, str):
+        match = _YEARS_PATTERN.search(value)
+        if match:
+            return float(match.group(1))
+        try:
+            return float(value.strip())
+        except ValueError:
+            return None
+    return None
+
+
+def expert_attributes(
+    scored_expert: Dict[str, Any],
+    expert: Dict[str, Any] = None,
+    fields: List[str] = ()
+) -> Dict[str, Any]:
+    """
+    Values of the rule fields for one expert.
+
+    Args:
+        scored_expert: Scored expert (or panel member)
+        expert: Expert document (for profile fields not in the scores)
+        fields: Fields to read
+
+    Returns:
+        Dictionary of field -> value (None when missing)
+    """
+    expert = expert or {}
+    attributes = {}
+    for field in fields:
+        if field == 'experience_years':
+            attributes[field] = _experience_years(
+                scored_expert.get('experience', expert.get('experience'))
+            )
+        elif scored_expert.get(field) is not None:
+            attributes[field] = scored_expert[field]
+        else:
+            attributes[field] = expert.get(field)
+    return attributes
+
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, str):
+        return value.strip().lower() or None
+    if isinstance(value, list):
+        return tuple(_normalize(v) for v in value)
+    return value
+
+
+def _equals(actual: Any, expected: Any) -> bool:
+    if isinstance(expected, list):
+        return any(_equals(actual, value) for value in expected)
+    if isinstance(actual, (list, tuple)):
+        return any(_equals(value, expected) for value in actual)
+    return actual is not None and _normalize(actual) == _normalize(expected)
+
+
+def _number(value: Any) -> Optional[float]:
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    return _experience_years(value)
+
+
+def matches(attributes: Dict[str, Any], condition: Dict[str, Any]) -> bool:
+    """Whether expert attributes satisfy a condition (all fields must hold)."""
+    for field, expected in condition.items():
+        actual = attributes.get(field)
+        if not isinstance(expected, dict):
+            if not _equals(actual, expected):
+                return False
+            continue
+        if 'not' in expected and _equals(actual, expected['not']):
+            return False
+        if 'in' in expected and not _equals(actual, expected['in']):
+            return False
+        if 'min' in expected or 'max' in expected:
+            number = _number(actual)
+            if number is None:
+                return False
+            if 'min' in expected and number < expected['min']:
+                return False
+            if 'max' in expected and number > expected['max']:
+                return False
+    return True
+
+
+def describe_condition(condition: Dict[str, Any]) -> str:
+    """Readable form of a condition, e.g. "category=external, organization not DRDO"."""
+    parts = []
+    for field, expected in condition.items():
+        if not isinstance(expected, dict):
+            parts.append(f"{field}={'/'.join(map(str, expected)) if isinstance(expected, list) else expected}")
+            continue
+        for operator in _CONDITION_OPERATORS:
+            if operator in expected:
+                value = expected[operator]
+                value = '/'.join(map(str, value)) if isinstance(value, list) else value
+                symbol = {'not': 'not', 'in': 'in', 'min': '>=', 'max': '<='}[operator]
+                parts.append(f"{field} {symbol} {value}")
+    return ', '.join(parts) or 'any expert'
+
+
+def check_rules(
+    panel: List[Dict[str, Any]],
+    rules: List[Dict[str, Any]],
+    experts: List[Dict[str, Any]] = None
+) -> List[str]:
+    """
+    Rule violations of a panel.
+
+    Args:
+        panel: Panel members (scored experts or panelists with expert_id)
+        rules: Parsed composition rules
+        experts: Expert documents for profile fields not on the members
+
+    Returns:
+        One message per violation (empty if the panel satisfies every rule)
+    """
+    experts_by_id = {str(expert.get('_id')): expert for expert in experts or []}
+    fields = rule_fields(rules)
+    members = [
+        (member, expert_attributes(member, experts_by_id.get(str(member.get('expert_id'))), fields))
+        for member in panel
+    ]
+
+    issues = []
+    for rule in rules:
+        if rule['type'] == 'count':
+            count = sum(1 for _, attributes in members if matches(attributes, rule['where']))
+            described = describe_condition(rule['where'])
+            if count < rule['min']:
+                issues.append(f"Needs at least {rule['min']} member(s) with {described}, has {count}")
+            elif rule['max'] is not None and count > rule['max']:
+                issues.append(f"Allows at most {rule['max']} member(s) with {described}, has {count}")
+        elif rule['type'] == 'distinct':
+            seen = {}
+            for member, attributes in members:
+                value = _normalize(attributes[rule['field']])
+                if value is None:
+                    continue
+                if value in seen:
+                    issues.append(
+                        f"{seen[value]} and {member.get('expert_name', member.get('name', ''))} "
+                        f"share {rule['field']} '{attributes[rule['field']]}'"
+                    )
+                else:
+                    seen[value] = member.get('expert_name', member.get('name', ''))
+        else:
+            for member, attributes in members:
+                if matches(attributes, rule['where']) and not matches(attributes, rule['must']):
+                    issues.append(
+                        f"{member.get('expert_name', member.get('name', ''))} does not have "
+                        f"{describe_condition(rule['must'])}"
+                    )
+    return issues
+
+
+class _Candidate:
+    """An eligible expert with what the search needs about it."""
+    __slots__ = ('expert', 'score', 'signature', 'values')
+
+    def __init__(self, expert, score, signature, values):
+        self.expert = expert
+        self.score = score
+        self.signature = signature
+        self.values = values
+
+
+def _prune_candidates(
+    candidates: List[_Candidate],
+    size: int,
+    distinct_count: int
+) -> List[_Candidate]:
+    """
+    Keep only the experts that can be in an optimal panel.
+
+    Experts with the same signature are interchangeable for the count
+    rules. The other members of a panel block at most
+    max(distinct_count, 1) experts each among a set of experts with
+    pairwise different distinct values, so once a signature group has
+    that many times (size - 1), plus one, such better experts, any lower
+    expert of the group can be swapped for one of them without lowering
+    the score or breaking a rule.
+    """
+    needed = max(distinct_count, 1) * (size - 1) + 1
+    groups = {}
+    kept = []
+    for candidate in candidates:  # Best first
+        group = groups.setdefault(candidate.signature, {'independent': 0, 'used': set()})
+        if group['independent'] >= needed:
+            continue
+        kept.append(candidate)
+        values = {(f, v) for f, v in enumerate(candidate.values) if v is not None}
+        if not values & group['used']:
+            group['independent'] += 1
+            group['used'] |= values
+    return kept
+
+
+def _search(
+    candidates: List[_Candidate],
+    size: int,
+    count_rules: List[Dict[str, Any]],
+    node_limit: int,
+    stop_at: float
+) -> Tuple[Optional[List[_Candidate]], int, bool]:
+    """
+    Branch and bound for the best panel of exactly `size` candidates.
+
+    Every candidate looked at counts as a node; the search stops after
+    node_limit nodes or at time.perf_counter() stop_at.
+    """
+    n = len(candidates)
+    prefix = [0.0]
+    for candidate in candidates:
+        prefix.append(prefix[-1] + candidate.score)
+    # remaining[r][i]: candidates from position i on matching count rule r
+    remaining = []
+    for r in range(len(count_rules)):
+        suffix = [0] * (n + 1)
+        for i in range(n - 1, -1, -1):
+            suffix[i] = suffix[i + 1] + candidates[i].signature[r]
+        remaining.append(suffix)
+    minimums = [rule['min'] for rule in count_rules]
+    maximums = [rule['max'] for rule in count_rules]
+
+    counts = [0] * len(count_rules)
+    used = set()
+    chosen = []
+    best = {'score': float('-inf'), 'panel': None}
+    nodes = 0
+
+    def search(start: int, total: float) -> bool:
+        nonlocal nodes
+        slots = size - len(chosen)
+        if slots == 0:
+            if total > best['score'] and all(c >= m for c, m in zip(counts, minimums)):
+                best['score'], best['panel'] = total, list(chosen)
+            return True
+        for i in range(start, n - slots + 1):
+            nodes += 1
+            if nodes > node_limit or (nodes % 1024 == 0 and time.perf_counter() > stop_at):
+                return False
+            # Later positions only have lower scores and fewer matching experts
+            if total + prefix[i + slots] - prefix[i] <= best['score']:
+                break
+            if any(minimums[r] - counts[r] > min(slots, remaining[r][i]) for r in range(len(counts))):
+                break
+            candidate = candidates[i]
+            values = {(f, v) for f, v in enumerate(candidate.values) if v is not None}
+            if values & used:
+                continue
+            if any(match and maximums[r] is not None and counts[r] >= maximums[r]
+                   for r, match in enumerate(candidate.signature)):
+                continue
+            for r, match in enumerate(candidate.signature):
+                counts[r] += match
+            used.update(values)
+            chosen.append(candidate)
+            finished = search(i + 1, total + candidate.score)
+            chosen.pop()
+            used.difference_update(values)
+            for r, match in enumerate(candidate.signature):
+                counts[r] -= match
+            if not finished:
+                return False
+        return True
+
+    optimal = search(0, 0.0)
+    return best['panel'], nodes, optimal
+
+
+def solve_panel(
+    scored_experts: List[Dict[str, Any]],
+    size: int,
+    rules: List[Dict[str, Any]],
+    experts: List[Dict[str, Any]] = None,
+    node_limit: int = None,
+    time_limit: float = None
+) -> Dict[str, Any]:
+    """
+    Find the highest-scoring panel satisfying all rules.
+
+    If no panel of the size satisfies the rules, the minimums that not
+    enough experts can meet are lowered (and the maximums raised by the
+    same number of seats, so the panel is still filled), then the count
+    rules are dropped, and last the distinct rules too, so a panel is
+    always returned. Members beyond an original maximum, or sharing a
+    distinct value with a better member, are marked 'ai_recommended_fill'.
+
+    Args:
+        scored_experts: Scored experts (any order)
+        size: Panel size
+        rules: Parsed composition rules
+        experts: Expert documents for profile fields not in the scores
+        node_limit: Search nodes per attempt before returning the best
+            panel found (default: PANEL_SOLVER_NODE_LIMIT)
+        time_limit: Seconds of search over all attempts
+            (default: PANEL_SOLVER_TIME_LIMIT)
+
+    Returns:
+        Dictionary containing:
+        - panel: (scored expert, selection_type) pairs, best first
+        - feasible: Whether the panel satisfies every rule
+        - optimal: Whether every attempt's search completed (no better
+          panel exists under the rules the panel was found with)
+        - relaxed: Whether rules had to be relaxed
+        - eligible_experts / candidates_considered / nodes / solve_seconds
+    """
+    started = time.perf_counter()
+    node_limit = PANEL_SOLVER_NODE_LIMIT if node_limit is None else node_limit
+    stop_at = started + (PANEL_SOLVER_TIME_LIMIT if time_limit is None else time_limit)
+    experts_by_id = {str(expert.get('_id')): expert for expert in experts or []}
+    fields = rule_fields(rules)
+    count_rules = [rule for rule in rules if rule['type'] == 'count']
+    distinct_fields = [rule['field'] for rule in rules if rule['type'] == 'distinct']
+    each_rules = [rule for rule in rules if rule['type'] == 'each']
+
+    # Eligible experts, best first, with their count rule signature
+    eligible = []
+    seen = set()
+    for expert in sorted(scored_experts, key=lambda x: x.get('final_score', 0), reverse=True):
+        expert_id = expert.get('expert_id')
+        if not expert_id or expert_id in seen:
+            continue
+        seen.add(expert_id)
+        attributes = expert_attributes(expert, experts_by_id.get(str(expert_id)), fields)
+        if not all(matches(attributes, rule['must']) for rule in each_rules
+                   if matches(attributes, rule['where'])):
+            continue
+        eligible.append(_Candidate(
+            expert,
+            float(expert.get('final_score', 0)),
+            tuple(int(matches(attributes, rule['where'])) for rule in count_rules),
+            tuple(_normalize(attributes[field]) for field in distinct_fields)
+        ))
+
+    size = min(size, len(eligible))
+    attempts = [(count_rules, False)]
+    if count_rules:
+        # Lower the minimums too few eligible experts can meet, keeping seats filled
+        available = [sum(c.signature[r] for c in eligible) for r in range(len(count_rules))]
+        deficit = sum(max(0, rule['min'] - available[r]) for r, rule in enumerate(count_rules))
+        if deficit:
+            relaxed = [
+                {**rule, 'min': min(rule['min'], available[r]),
+                 'max': None if rule['max'] is None else rule['max'] + deficit}
+                for r, rule in enumerate(count_rules)
+            ]
+            attempts.append((relaxed, True))
+        attempts.append(([{**rule, 'min': 0, 'max': None} for rule in count_rules], True))
+    # A distinct rule needs size experts with different (or no) values
+    for f in range(len(distinct_fields)):
+        values = [c.values[f] for c in eligible]
+        if len({v for v in values if v is not None}) + values.count(None) < size:
+            attempts = []
+
+    candidates = _prune_candidates(eligible, size, len(distinct_fields))
+    panel, nodes, optimal, relaxed = None, 0, True, False
+    for attempt_rules, relaxed in attempts:
+        if time.perf_counter() > stop_at:
+            optimal = False
+            break
+        panel, attempt_nodes, attempt_optimal = _search(candidates, size, attempt_rules, node_limit, stop_at)
+        nodes += attempt_nodes
+        optimal = optimal and attempt_optimal
+        if panel is not None:
+            break
+
+    if panel is None:
+        # Last attempt: no count or distinct rules, so the best scores
+        panel, relaxed = eligible[:size], True
+
+    fill = set()
+    if relaxed:
+        for r, rule in enumerate(count_rules):
+            matching = [c for c in panel if c.signature[r]]
+            if rule['max'] is not None:
+                fill.update(id(c) for c in matching[rule['max']:])
+        used = set()
+        for c in panel:  # Best first
+            values = {(f, v) for f, v in enumerate(c.values) if v is not None}
+            if values & used:
+                fill.add(id(c))
+            used |= values
+
+    return {
+        'panel': [
+            (c.expert, 'ai_recommended_fill' if id(c) in fill else 'ai_recommended')
+            for c in panel
+        ],
+        'feasible': bool(panel) and not relaxed,
+        'optimal': optimal,
+        'relaxed': relaxed,
+        'eligible_experts': len(eligible),
+        'candidates_considered': len(candidates),
+        'nodes': nodes,
+        'solve_seconds': round(time.perf_counter() - started, 4)
+    }
+
+
+# Export functions
+__all__ = [
+    'PANEL_SOLVER_NODE_LIMIT',
+    'PANEL_SOLVER_TIME_LIMIT',
+    'RULE_TYPES',
+    'category_rules',
+    'parse_rules',
+    'rule_fields',
+    'expert_attributes',
+    'matches',
+    'describe_condition',
+    'check_rules',
+    'solve_panel'
+]
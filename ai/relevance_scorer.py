@@ -3,7 +3,7 @@ MIRA DRDO - Relevance Score Calculator
 
 This module calculates the final relevance score for each expert using:
 - w1: Item-Expert Cosine Similarity
-- w2: Item-Expert LLM Similarity  
+- w2: Item-Expert LLM Similarity (or a cross-encoder / distilled estimate)
 - w3: Expert-Candidates Avg Cosine Similarity
 - w4: Expert-Candidates Avg LLM Similarity
 
@@ -12,19 +12,43 @@ Final Score = weighted_avg(w1, w2, w3, w4)
 The weights can be customized based on requirements.
 """
 
-from typing import List, Dict, Any, Optional
+import os
+import heapq
+import threading
+from typing import List, Dict, Any, Callable, Iterator, Optional, Tuple, Union
+import numpy as np
 from .embedding_generator import (
     generate_item_embedding,
     generate_expert_embedding,
-    generate_candidate_embedding,
     generate_item_text,
     generate_expert_text,
-    generate_candidate_text
+    resolve_embeddings
 )
+from .candidate_pool import CandidatePool
+from .ollama_client import get_ollama_client, Deadline
+from .embedding_codec import (
+    decode_embedding,
+    QUANTIZATION_MODE,
+    QUANTIZED_RESCORE_TOP
+)
+from .expert_index import get_expert_index
 from .similarity_calculator import (
     calculate_expert_item_similarity,
-    calculate_expert_candidates_similarity,
-    llm_generate_reason
+    embeddings_to_matrix,
+    cosine_similarity_matrix,
+    llm_similarity,
+    llm_batch_similarity,
+    llm_generate_reason,
+    llm_generate_reason_stream,
+    cached_llm_score,
+    cross_encoder_similarity,
+    LLM_SCORE_BATCH_SIZE
+)
+from .score_distiller import (
+    surrogate_w2,
+    log_w2_examples,
+    is_logging_enabled,
+    SURROGATE_UNCERTAINTY
 )
 
 
@@ -36,6 +60,23 @@ DEFAULT_WEIGHTS = {
     'w4_expert_candidates_llm': 0.15     # Expert-Candidates LLM
 }
 
+# Experts per category that get LLM scoring in rerank mode (0 = every expert).
+# The largest panel (7) needs 3 per category; the rest is headroom.
+LLM_RERANK_TOP = int(os.getenv('LLM_RERANK_TOP', '5'))
+
+# Whether w2 comes from the distilled surrogate by default (see score_distiller.py)
+USE_W2_SURROGATE = os.getenv('W2_SURROGATE', 'false').lower() == 'true'
+
+# Whether w2 comes from the CPU cross-encoder by default (where not LLM-scored)
+USE_CROSS_ENCODER = os.getenv('W2_CROSS_ENCODER', 'false').lower() == 'true'
+
+# Upper bound of any w2 score (used by branch_and_bound_w2)
+W2_MAX = 100.0
+
+# LLM calls per expert when scored on its own (the w2 score; explanations
+# are generated on demand, see explain_relevance)
+_LLM_CALLS_PER_EXPERT = 1
+
 
 def calculate_relevance_score(
     item: Dict[str, Any],
@@ -43,11 +84,25 @@ def calculate_relevance_score(
     candidates: List[Dict[str, Any]] = None,
     weights: Dict[str, float] = None,
     use_llm: bool = True,
-    use_cached_embeddings: bool = True
+    use_cached_embeddings: bool = True,
+    candidate_pool: CandidatePool = None,
+    deadline: Deadline = None,
+    generate_reason: bool = True,
+    use_surrogate: bool = None,
+    use_cross_encoder: bool = None
 ) -> Dict[str, Any]:
     """
     Calculate the comprehensive relevance score for an expert-item pair.
     
+    With a deadline, the LLM score and reason are each given what is left
+    of it; if the score misses it w2 falls back to the cosine score
+    (w2_method 'deadline'), if the reason misses it the stored reason is used.
+    
+    With use_surrogate, w2 comes from the distilled model (w2_method
+    'distilled') and the LLM is only asked when its band is too wide.
+    With use_cross_encoder, w2 comes from the CrossEncoder when not
+    LLM-scored (w2_method 'cross_encoder').
+    
     Args:
         item: Item document from MongoDB
         expert: Expert document from MongoDB
@@ -55,25 +110,284 @@ def calculate_relevance_score(
         weights: Custom weights for each component (default: DEFAULT_WEIGHTS)
         use_llm: Whether to use LLM for semantic similarity
         use_cached_embeddings: Whether to use pre-computed embeddings from DB
+        candidate_pool: Prepared CandidatePool (built from candidates if omitted)
+        deadline: Request deadline for the LLM calls (default: none)
+        generate_reason: Whether to generate the LLM explanation now
+            (otherwise use reason_handle to generate it later)
+        use_surrogate: Whether to use the distilled w2 model
+            (default: W2_SURROGATE setting)
+        use_cross_encoder: Whether to use the CrossEncoder w2
+            (default: W2_CROSS_ENCODER setting)
         
     Returns:
         Dictionary containing:
         - final_score: Weighted average score (0-100)
         - component_scores: Individual w1, w2, w3, w4 scores
         - reason: AI-generated explanation
+        - reason_handle: Reference for explain_relevance
+        - w2_method: 'llm', 'distilled', 'cross_encoder', 'cosine' or 'deadline'
     """
     if weights is None:
         weights = DEFAULT_WEIGHTS
+    if use_surrogate is None:
+        use_surrogate = USE_W2_SURROGATE
+    if use_cross_encoder is None:
+        use_cross_encoder = USE_CROSS_ENCODER
+    
+    pair = _score_pair(
+        item, expert, candidates, weights, use_llm, use_cached_embeddings, candidate_pool, deadline,
+        use_surrogate, use_cross_encoder
+    )
+    if pair['w2_method'] == 'llm':
+        _log_llm_examples(pair['item_text'], [(pair['expert_text'], pair['cosine'])])
+    w1, w2, w3, w4 = (pair['component_scores'][key] for key in DEFAULT_WEIGHTS)
+    final_score = pair['final_score']
+    
+    # Generate AI reason - pure LLM evaluation without appending score breakdown
+    # (Score breakdown is already displayed separately in the UI)
+    reason = None
+    if pair['use_llm'] and generate_reason:
+        reason = get_ollama_client().map(
+            lambda texts: llm_generate_reason(
+                *texts,
+                expert_name=expert.get('name'),
+                component_scores=pair['component_scores'],
+                final_score=final_score
+            ),
+            [(pair['item_text'], pair['expert_text'])],
+            deadline
+        )[0]
+    if reason is None:
+        reason = expert.get('reason', 'Expert has relevant skills and domain expertise.')
+    
+    # Return pure LLM reason without appending score breakdown
+    # The UI already displays component scores separately
+    return {
+        'final_score': round(final_score, 2),
+        'component_scores': {
+            'w1_item_expert_cosine': round(w1, 2),
+            'w2_item_expert_llm': round(w2, 2),
+            'w3_expert_candidates_cosine': round(w3, 2),
+            'w4_expert_candidates_llm': round(w4, 2)
+        },
+        'reason': reason,  # Pure LLM explanation
+        'reason_handle': reason_handle(
+            item, expert, pair['w2_method'] == 'llm',
+            pair['w2_source'] == 'distilled', pair['w2_source'] == 'cross_encoder'
+        ),
+        'weights_used': weights,
+        'w2_method': pair['w2_method']
+    }
+
+
+def reason_handle(
+    item: Dict[str, Any],
+    expert: Dict[str, Any],
+    llm_w2: bool,
+    distilled_w2: bool = False,
+    cross_encoder_w2: bool = False
+) -> Dict[str, Any]:
+    """
+    Reference from which the explanation of a scored pair is generated later.
+    
+    Args:
+        item: Item document
+        expert: Expert document
+        llm_w2: Whether the score being explained used the LLM w2
+        distilled_w2: Whether it used the distilled w2 instead
+        cross_encoder_w2: Whether it used the CrossEncoder w2 instead
+    """
+    return {
+        'item_id': str(item.get('_id', '')),
+        'expert_id': str(expert.get('_id', '')),
+        'llm_w2': llm_w2,
+        'distilled_w2': distilled_w2,
+        'cross_encoder_w2': cross_encoder_w2
+    }
+
+
+def _log_llm_examples(item_text: str, pairs: List[Any]) -> None:
+    """Log (expert_text, cosine) pairs whose w2 is a genuine LLM score as surrogate examples."""
+    if not is_logging_enabled() or not item_text:
+        return
+    examples = []
+    for expert_text, cosine in pairs:
+        score = cached_llm_score(item_text, expert_text)
+        if score is not None:
+            examples.append((expert_text, cosine, score))
+    if examples:
+        log_w2_examples(item_text, *(list(column) for column in zip(*examples)))
+
+
+def _reason_inputs(
+    item: Dict[str, Any],
+    expert: Dict[str, Any],
+    candidates: List[Dict[str, Any]],
+    weights: Dict[str, float],
+    candidate_pool: CandidatePool,
+    llm_w2: bool,
+    deadline: Deadline,
+    distilled_w2: bool = False,
+    cross_encoder_w2: bool = False
+) -> Optional[Dict[str, Any]]:
+    """Arguments of llm_generate_reason for a pair, or None without texts."""
+    weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+    pair = _score_pair(
+        item, expert, candidates, weights, llm_w2, True, candidate_pool, deadline,
+        distilled_w2, cross_encoder_w2
+    )
+    if not (pair['item_text'] and pair['expert_text']):
+        return None
+    return {
+        'item_text': pair['item_text'],
+        'expert_text': pair['expert_text'],
+        'expert_name': expert.get('name'),
+        'component_scores': pair['component_scores'],
+        'final_score': pair['final_score']
+    }
+
+
+def explain_relevance(
+    item: Dict[str, Any],
+    expert: Dict[str, Any],
+    candidates: List[Dict[str, Any]] = None,
+    weights: Dict[str, float] = None,
+    candidate_pool: CandidatePool = None,
+    llm_w2: bool = True,
+    deadline: Deadline = None,
+    distilled_w2: bool = False,
+    cross_encoder_w2: bool = False
+) -> str:
+    """
+    Generate (or fetch from the LLM cache) the explanation of one scored pair.
+    
+    The scores in the prompt are recomputed exactly as scoring computed
+    them (the LLM w2 is a cache hit after LLM scoring), so the first call
+    pays for the explanation and every later call for the same scores is
+    served from the cache.
+    
+    Args:
+        item: Item document
+        expert: Expert document
+        candidates: Candidate documents for this item
+        weights: Weights used for scoring
+        candidate_pool: Prepared CandidatePool (built from candidates if omitted)
+        llm_w2: Whether the explained score used the LLM w2 (see reason_handle)
+        deadline: Request deadline for the LLM w2 lookup
+        distilled_w2: Whether it used the distilled w2 (see reason_handle)
+        cross_encoder_w2: Whether it used the CrossEncoder w2 (see reason_handle)
+        
+    Returns:
+        Explanation string
+    """
+    inputs = _reason_inputs(
+        item, expert, candidates, weights, candidate_pool, llm_w2, deadline,
+        distilled_w2, cross_encoder_w2
+    )
+    if inputs is None:
+        return expert.get('reason', 'Expert has relevant skills and domain expertise.')
+    return llm_generate_reason(**inputs)
+
+
+def stream_relevance_reason(
+    item: Dict[str, Any],
+    expert: Dict[str, Any],
+    candidates: List[Dict[str, Any]] = None,
+    weights: Dict[str, float] = None,
+    candidate_pool: CandidatePool = None,
+    llm_w2: bool = True,
+    deadline: Deadline = None,
+    distilled_w2: bool = False,
+    cross_encoder_w2: bool = False
+) -> Iterator[str]:
+    """
+    Streaming variant of explain_relevance, shares its cache entries.
     
+    Yields:
+        Chunks of the explanation text (a ReasonRestart chunk replaces
+        the ones before it, see llm_generate_reason_stream)
+    """
+    inputs = _reason_inputs(
+        item, expert, candidates, weights, candidate_pool, llm_w2, deadline,
+        distilled_w2, cross_encoder_w2
+    )
+    if inputs is None:
+        yield expert.get('reason', 'Expert has relevant skills and domain expertise.')
+        return
+    yield from llm_generate_reason_stream(**inputs)
+
+
+def prefetch_reasons(
+    item: Dict[str, Any],
+    experts: List[Dict[str, Any]],
+    scored_experts: List[Dict[str, Any]],
+    weights: Dict[str, float] = None,
+    candidate_pool: CandidatePool = None
+) -> int:
+    """
+    Generate the explanations of a few scored experts in the background.
+    
+    Meant for the recommended panel, so the reasons a user is most likely
+    to open are already cached. Returns at once; the work runs on a daemon
+    thread through the shared Ollama client.
+    
+    Args:
+        item: Item document
+        experts: Expert documents (looked up by the scored experts' ids)
+        scored_experts: Scored results to explain (e.g. the recommended panel)
+        weights: Weights used for scoring
+        candidate_pool: CandidatePool used for scoring
+        
+    Returns:
+        Number of explanations queued
+    """
+    by_id = {str(expert.get('_id', '')): expert for expert in experts}
+    jobs = [
+        (by_id[scored['expert_id']], scored['reason_handle'])
+        for scored in scored_experts
+        if scored.get('expert_id') in by_id and scored.get('reason_handle')
+    ]
+    
+    def explain(job):
+        try:
+            explain_relevance(
+                item, job[0], weights=weights, candidate_pool=candidate_pool,
+                llm_w2=job[1]['llm_w2'], distilled_w2=job[1].get('distilled_w2', False),
+                cross_encoder_w2=job[1].get('cross_encoder_w2', False)
+            )
+        except Exception as e:
+            print(f"Error prefetching reason for {job[0].get('name')}: {e}")
+    
+    if jobs:
+        threading.Thread(
+            target=get_ollama_client().map,
+            args=(explain, jobs),
+            name='reason-prefetch',
+            daemon=True
+        ).start()
+    return len(jobs)
+
+
+def _score_pair(
+    item: Dict[str, Any],
+    expert: Dict[str, Any],
+    candidates: List[Dict[str, Any]],
+    weights: Dict[str, float],
+    use_llm: bool,
+    use_cached_embeddings: bool,
+    candidate_pool: CandidatePool,
+    deadline: Deadline,
+    use_surrogate: bool = False,
+    use_cross_encoder: bool = False
+) -> Dict[str, Any]:
+    """Unrounded w1-w4 and final score of one expert-item pair (no reason)."""
     # Generate or retrieve embeddings
-    if use_cached_embeddings and expert.get('skillEmbedding'):
-        expert_embedding = expert['skillEmbedding']
-    else:
+    expert_embedding = decode_embedding(expert.get('skillEmbedding')) if use_cached_embeddings else None
+    if expert_embedding is None:
         expert_embedding = generate_expert_embedding(expert)
     
-    if use_cached_embeddings and item.get('embedding'):
-        item_embedding = item['embedding']
-    else:
+    item_embedding = decode_embedding(item.get('embedding')) if use_cached_embeddings else None
+    if item_embedding is None:
         item_embedding = generate_item_embedding(item)
     
     # Generate text representations
@@ -81,46 +395,50 @@ def calculate_relevance_score(
     expert_text = generate_expert_text(expert)
     
     # Calculate Item-Expert similarity (w1, w2)
+    use_llm = use_llm and bool(item_text) and bool(expert_text)
     item_expert_sim = calculate_expert_item_similarity(
         item_embedding,
         expert_embedding,
         item_text,
         expert_text,
-        use_llm=use_llm
+        use_llm=False,
+        use_surrogate=use_surrogate,
+        use_cross_encoder=use_cross_encoder
     )
     
     w1 = item_expert_sim['cosine_score'] * 100  # Scale to 0-100
     w2 = item_expert_sim['llm_score']
+    w2_method = item_expert_sim['w2_method']
+    
+    # A confident distilled w2 stands in for the LLM call
+    llm_w2 = use_llm and not (
+        w2_method == 'distilled' and item_expert_sim['w2_uncertainty'] <= SURROGATE_UNCERTAINTY
+    )
+    if llm_w2:
+        llm_score = get_ollama_client().map(
+            lambda texts: llm_similarity(*texts), [(item_text, expert_text)], deadline
+        )[0]
+        if llm_score is not None:
+            w2 = llm_score
+            w2_method = 'llm'
+        else:
+            w2_method = 'deadline'
     
     # Calculate Expert-Candidates similarity (w3, w4)
     w3 = 0.0
     w4 = 0.0
     
-    if candidates and len(candidates) > 0:
-        # Get candidate embeddings
-        candidate_embeddings = []
-        candidate_texts = []
-        
-        for cand in candidates:
-            if use_cached_embeddings and cand.get('skillEmbedding'):
-                candidate_embeddings.append(cand['skillEmbedding'])
-            else:
-                emb = generate_candidate_embedding(cand)
-                if emb:
-                    candidate_embeddings.append(emb)
-            candidate_texts.append(generate_candidate_text(cand))
-        
-        if candidate_embeddings:
-            expert_cand_sim = calculate_expert_candidates_similarity(
-                expert_embedding,
-                candidate_embeddings,
-                expert_text,
-                candidate_texts,
-                use_llm=False  # Disable LLM for performance with many candidates
+    if candidate_pool is None and candidates:
+        candidate_pool = CandidatePool(candidates, use_cached_embeddings)
+    
+    if candidate_pool is not None:
+        if len(candidate_pool) > 0 and expert_embedding is not None:
+            expert_matrix, _ = embeddings_to_matrix(
+                [expert_embedding], candidate_pool.matrix.shape[1]
             )
-            
-            w3 = expert_cand_sim['avg_cosine_score'] * 100
-            w4 = expert_cand_sim['avg_llm_score']
+            pool_scores = candidate_pool.score_experts(expert_matrix)
+            w3 = float(pool_scores['avg_cosine_scores'][0]) * 100
+            w4 = w3  # LLM disabled for candidates, cosine-based estimate
     else:
         # No candidates: use item-expert scores as proxy
         w3 = w1
@@ -134,36 +452,20 @@ def calculate_relevance_score(
         weights['w4_expert_candidates_llm'] * w4
     )
     
-    # Generate AI reason - pure LLM evaluation without appending score breakdown
-    # (Score breakdown is already displayed separately in the UI)
-    if use_llm and item_text and expert_text:
-        reason = llm_generate_reason(
-            item_text, 
-            expert_text,
-            expert_name=expert.get('name'),
-            component_scores={
-                'w1_item_expert_cosine': w1,
-                'w2_item_expert_llm': w2,
-                'w3_expert_candidates_cosine': w3,
-                'w4_expert_candidates_llm': w4
-            },
-            final_score=final_score
-        )
-    else:
-        reason = expert.get('reason', 'Expert has relevant skills and domain expertise.')
-    
-    # Return pure LLM reason without appending score breakdown
-    # The UI already displays component scores separately
     return {
-        'final_score': round(final_score, 2),
+        'item_text': item_text,
+        'expert_text': expert_text,
+        'use_llm': use_llm,
+        'cosine': item_expert_sim['cosine_score'],
+        'w2_method': w2_method,
+        'w2_source': w2_method if w2_method == 'llm' else item_expert_sim['w2_method'],
+        'final_score': final_score,
         'component_scores': {
-            'w1_item_expert_cosine': round(w1, 2),
-            'w2_item_expert_llm': round(w2, 2),
-            'w3_expert_candidates_cosine': round(w3, 2),
-            'w4_expert_candidates_llm': round(w4, 2)
-        },
-        'reason': reason,  # Pure LLM explanation
-        'weights_used': weights
+            'w1_item_expert_cosine': w1,
+            'w2_item_expert_llm': w2,
+            'w3_expert_candidates_cosine': w3,
+            'w4_expert_candidates_llm': w4
+        }
     }
 
 
@@ -172,53 +474,818 @@ def batch_calculate_relevance_scores(
     experts: List[Dict[str, Any]],
     candidates: List[Dict[str, Any]] = None,
     weights: Dict[str, float] = None,
-    use_llm: bool = False  # Disable LLM by default for batch (performance)
+    use_llm: bool = False,  # Disable LLM by default for batch (performance)
+    use_cached_embeddings: bool = True,
+    candidate_pool: CandidatePool = None,
+    top_candidates: int = 0,
+    quantization: str = None,
+    rescore_top: int = None,
+    llm_rerank_top: int = None,
+    llm_batch_size: int = None,
+    deadline: Deadline = None,
+    on_result: Callable[[Dict[str, Any]], None] = None,
+    use_surrogate: bool = None,
+    use_cross_encoder: bool = None,
+    prune_top_k: Union[int, Dict[str, int]] = None
 ) -> List[Dict[str, Any]]:
     """
     Calculate relevance scores for multiple experts at once.
     
+    The item embedding, item text and candidate pool are prepared once,
+    all expert vectors are stacked into one float32 matrix, and w1/w3/w4 are
+    computed for every expert with a few matrix products. Only the LLM w2
+    (when use_llm is on) is still per expert. Results match
+    calculate_relevance_score for each expert.
+    
+    No explanations are generated here: each result carries a
+    'reason_handle' from which explain_relevance (or the reason endpoints)
+    generates and caches the explanation of that one expert when asked.
+    
+    In 'int8' quantization mode the experts are first ranked by item-expert
+    cosine on the expert index's stored int8 codes (see expert_index.py),
+    and only the top rescore_top per category (plus experts not in the
+    index) are scored in full precision. The others stay in the results
+    with their first-pass w1 and w3/w4, a cosine-based w2 and no LLM calls,
+    flagged 'approximate'. The codes only exist when the index is built
+    with EMBEDDING_QUANTIZATION=int8; otherwise 'int8' is ignored and
+    every expert is scored in full precision.
+    
+    With use_llm, experts are first ranked on cosine scores alone and the
+    LLM w2 is only spent on the top llm_rerank_top per category. The rest
+    keep their cosine-derived w2. Each result's 'w2_method' says which was
+    used. Their w2 scores are requested llm_batch_size profiles per prompt,
+    run concurrently through the shared Ollama client (see ollama_client.py);
+    result order does not depend on it.
+    
+    With a deadline, LLM work is queued best cheap score first and whatever
+    has not finished when it expires is dropped: those experts keep their
+    cosine-derived w2 (w2_method 'deadline'), so the call returns within
+    the budget.
+    
+    With use_surrogate (and a trained surrogate, see score_distiller.py),
+    every expert gets a distilled w2 from one batched prediction
+    (w2_method 'distilled'), the rerank ranks on it, and of the rerank top
+    only the experts whose surrogate band is wider than
+    W2_SURROGATE_UNCERTAINTY still get LLM calls. Genuine LLM scores are
+    logged as training examples for the surrogate.
+    
+    With use_cross_encoder, every expert not given a distilled w2 is
+    scored by the CPU CrossEncoder in a few batched forward passes
+    (w2_method 'cross_encoder'), and the rerank ranks on that instead.
+    
+    With use_llm and prune_top_k, the rerank is replaced by an exact
+    branch and bound (see branch_and_bound_w2): experts get LLM calls in
+    order of their upper bound until no remaining bound can enter the top
+    prune_top_k of its category. The others keep their cheap w2 and are
+    flagged 'pruned'; the top-k per category is the same as with LLM
+    scores for everyone.
+    
     Args:
         item: Item document
         experts: List of expert documents
         candidates: List of candidate documents for this item
         weights: Custom weights
         use_llm: Whether to use LLM (disabled by default for performance)
+        use_cached_embeddings: Whether to use pre-computed embeddings from DB
+        candidate_pool: Prepared CandidatePool (built from candidates if omitted)
+        top_candidates: Number of best matching candidates to attach per expert
+        quantization: 'int8' or 'none' (default: EMBEDDING_QUANTIZATION setting);
+            'int8' only takes effect when the expert index holds int8 codes
+        rescore_top: Experts per category rescored after the int8 first pass
+        llm_rerank_top: Experts per category scored by the LLM
+            (default: LLM_RERANK_TOP; 0 = every expert)
+        llm_batch_size: Expert profiles per w2 scoring prompt
+            (default: LLM_SCORE_BATCH_SIZE; 1 = one prompt per expert)
+        deadline: Request deadline for the LLM work (default: none)
+        on_result: Called with each LLM-scored expert's result as soon as
+            it is ready (from worker threads), e.g. to stream progress
+        use_surrogate: Whether to use the distilled w2 model
+            (default: W2_SURROGATE setting)
+        use_cross_encoder: Whether to use the CrossEncoder w2
+            (default: W2_CROSS_ENCODER setting)
+        prune_top_k: With use_llm, experts needed per category (an int for
+            every category, or category -> count; missing categories need
+            none); enables the branch and bound instead of llm_rerank_top
         
     Returns:
         List of score results, each containing expert_id and scores
     """
-    results = []
+    return ScoringBatch(
+        item,
+        experts,
+        candidates,
+        weights,
+        use_cached_embeddings=use_cached_embeddings,
+        candidate_pool=candidate_pool,
+        top_candidates=top_candidates,
+        quantization=quantization,
+        rescore_top=rescore_top,
+        use_surrogate=use_surrogate,
+        use_cross_encoder=use_cross_encoder
+    ).score(
+        use_llm=use_llm,
+        llm_rerank_top=llm_rerank_top,
+        llm_batch_size=llm_batch_size,
+        deadline=deadline,
+        on_result=on_result,
+        prune_top_k=prune_top_k
+    )
+
+
+class ScoringBatch:
+    """
+    One item's experts after the cheap first pass of batch scoring.
     
-    for expert in experts:
-        try:
-            score_data = calculate_relevance_score(
-                item,
-                expert,
-                candidates,
-                weights,
-                use_llm=use_llm
+    Built once per item: the item embedding and text, the stacked expert
+    matrix, w1 and w3/w4 of every expert, and the w2 that needs no LLM
+    call (distilled, CrossEncoder or cosine-based). score() turns it into
+    results, with or without LLM calls for the best experts, so a ranking
+    and a later LLM pass share the same matrices.
+    """
+    
+    def __init__(
+        self,
+        item: Dict[str, Any],
+        experts: List[Dict[str, Any]],
+        candidates: List[Dict[str, Any]] = None,
+        weights: Dict[str, float] = None,
+        use_cached_embeddings: bool = True,
+        candidate_pool: CandidatePool = None,
+        top_candidates: int = 0,
+        quantization: str = None,
+        rescore_top: int = None,
+        use_surrogate: bool = None,
+        use_cross_encoder: bool = None
+    ):
+        """
+        Run the first pass (arguments as in batch_calculate_relevance_scores).
+        """
+        self.item = item
+        self.experts = experts or []
+        self.weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+        self.item_text = ''
+        self.cheap = {}      # index -> (w2, w2_method)
+        self.distilled = {}  # index -> surrogate band width
+        self.top_matches = None
+        self.rescored = np.zeros(0, dtype=int)  # Experts with full-precision vectors
+        self.approximate = np.zeros(len(self.experts), dtype=bool)
+        self._expert_texts = None
+        if not self.experts:
+            return
+        
+        self._embed(
+            use_cached_embeddings,
+            quantization or QUANTIZATION_MODE,
+            QUANTIZED_RESCORE_TOP if rescore_top is None else rescore_top
+        )
+        self._score_candidates(candidates, candidate_pool, use_cached_embeddings, top_candidates)
+        self._cheap_w2(
+            USE_W2_SURROGATE if use_surrogate is None else use_surrogate,
+            USE_CROSS_ENCODER if use_cross_encoder is None else use_cross_encoder
+        )
+    
+    def __len__(self) -> int:
+        return len(self.experts)
+    
+    @property
+    def expert_texts(self) -> List[str]:
+        """
+        Expert texts, '' for experts whose text cannot be built and for
+        approximate experts (so they get no w2 model or LLM calls).
+        """
+        if self._expert_texts is None:
+            self._expert_texts = [''] * len(self.experts)
+            texts = _safe_expert_texts([self.experts[i] for i in self.rescored])
+            for i, text in zip(self.rescored.tolist(), texts):
+                self._expert_texts[i] = text
+        return self._expert_texts
+    
+    def _embed(self, use_cached_embeddings: bool, quantization: str, rescore_top: int) -> None:
+        """Item vector and text, the expert matrix and w1 (item-expert cosine)."""
+        item_embedding = decode_embedding(self.item.get('embedding')) if use_cached_embeddings else None
+        if item_embedding is None:
+            item_embedding = generate_item_embedding(self.item)
+        self.item_text = generate_item_text(self.item)
+        
+        # Optional int8 first pass on the index's codes: only the shortlist
+        # is resolved and stacked in float32, the rest keep the first pass.
+        # Without int8 codes there is nothing cheaper than the exact pass.
+        self.w1 = np.zeros(len(self.experts))
+        rescored = list(range(len(self.experts)))
+        if (quantization == 'int8' and get_expert_index().quantized
+                and item_embedding is not None and len(self.experts) > rescore_top):
+            approx = get_expert_index().approximate_scores(
+                item_embedding, [expert.get('_id') for expert in self.experts]
+            )
+            rescored = int8_shortlist(self.experts, approx, rescore_top)
+            self.approximate[:] = True
+            self.approximate[rescored] = False
+            self.w1[self.approximate] = np.clip(approx[self.approximate], 0.0, 1.0) * 100
+        self.rescored = np.asarray(rescored, dtype=int)
+        
+        expert_embeddings = resolve_embeddings(
+            [self.experts[i] for i in rescored], 'skillEmbedding', generate_expert_text, use_cached_embeddings
+        )
+        dim = len(item_embedding) if item_embedding is not None else None
+        self.expert_matrix, _ = embeddings_to_matrix(expert_embeddings, dim)
+        
+        # w1 for every rescored expert in one product
+        if item_embedding is not None:
+            item_matrix, _ = embeddings_to_matrix([item_embedding], dim)
+            self.w1[self.rescored] = cosine_similarity_matrix(item_matrix[0], self.expert_matrix) * 100
+    
+    def _score_candidates(
+        self,
+        candidates: List[Dict[str, Any]],
+        candidate_pool: CandidatePool,
+        use_cached_embeddings: bool,
+        top_candidates: int
+    ) -> None:
+        """w3/w4 (expert-candidates average cosine) from one expert x candidate matrix."""
+        if candidate_pool is None and candidates:
+            candidate_pool = CandidatePool(candidates, use_cached_embeddings, self.expert_matrix.shape[1])
+        
+        if candidate_pool is not None:
+            pool_scores = candidate_pool.score_experts(self.expert_matrix, top_candidates)
+            self.w3 = np.zeros(len(self.experts))
+            self.w3[self.rescored] = pool_scores['avg_cosine_scores'] * 100
+            if self.approximate.any():
+                self.w3[self.approximate] = self._approximate_w3(candidate_pool)
+            self.w4 = self.w3.copy()  # LLM disabled for candidates, cosine-based estimate
+            if pool_scores['top_candidates'] is not None:
+                self.top_matches = [[] for _ in self.experts]
+                for i, matches in zip(self.rescored.tolist(), pool_scores['top_candidates']):
+                    self.top_matches[i] = matches
+        else:
+            self.w3 = None  # No candidates: use item-expert scores as proxy
+            self.w4 = None
+    
+    def _approximate_w3(self, candidate_pool: CandidatePool) -> np.ndarray:
+        """w3 of the approximate experts from the index vectors and the pool's mean vector."""
+        mean = candidate_pool.mean_vector()
+        if mean is None:
+            return np.zeros(int(self.approximate.sum()))
+        ids = [self.experts[i].get('_id') for i in np.flatnonzero(self.approximate)]
+        cosines = get_expert_index().approximate_scores(mean, ids)
+        return np.clip(np.nan_to_num(cosines) * np.linalg.norm(mean), 0.0, 1.0) * 100
+    
+    def _cheap_w2(self, use_surrogate: bool, use_cross_encoder: bool) -> None:
+        """
+        w2 without LLM calls: distilled (one surrogate prediction) or
+        CrossEncoder (batched forward passes), cosine-based otherwise, and
+        the final scores it gives.
+        """
+        self.cheap_w2 = self.w1.copy()
+        if (use_surrogate or use_cross_encoder) and self.item_text:
+            self.cheap, self.distilled = cheap_w2_scores(
+                self.item_text, self.expert_texts, self.w1, use_surrogate, use_cross_encoder
+            )
+            for i, (score, _) in self.cheap.items():
+                self.cheap_w2[i] = score
+        
+        weights = self.weights
+        cheap_w3 = self.w3 if self.w3 is not None else self.w1
+        self.cheap_final = (
+            weights['w1_item_expert_cosine'] * self.w1 +
+            weights['w2_item_expert_llm'] * self.cheap_w2 +
+            (weights['w3_expert_candidates_cosine'] + weights['w4_expert_candidates_llm']) * cheap_w3
+        )
+        # Confident distilled scores stand in for the LLM
+        self.confident = {i for i, width in self.distilled.items() if width <= SURROGATE_UNCERTAINTY}
+    
+    def _branch_and_bound(
+        self,
+        prune_top_k: Union[int, Dict[str, int]],
+        llm_batch_size: int,
+        deadline: Deadline
+    ) -> Dict[str, Any]:
+        """LLM w2 only where it can change a category's top-k (see branch_and_bound_w2)."""
+        weights = self.weights
+        # w3/w4 are cosine-based, so only w2 is unknown (and w4 too when
+        # there are no candidates, as it then stands in for w2)
+        if self.w3 is None:
+            base = (weights['w1_item_expert_cosine'] + weights['w3_expert_candidates_cosine']) * self.w1
+            w2_weight = weights['w2_item_expert_llm'] + weights['w4_expert_candidates_llm']
+        else:
+            base = (
+                weights['w1_item_expert_cosine'] * self.w1 +
+                (weights['w3_expert_candidates_cosine'] + weights['w4_expert_candidates_llm']) * self.w3
             )
+            w2_weight = weights['w2_item_expert_llm']
+        texts = self.expert_texts
+        return branch_and_bound_w2(
+            [(expert.get('category') or '').lower() for expert in self.experts],
+            base,
+            w2_weight,
+            prune_top_k,
+            lambda indices: _llm_w2_round(
+                self.item_text, [texts[i] for i in indices], llm_batch_size, deadline
+            ),
+            known_w2={i: self.cheap[i][0] for i in self.confident},
+            eligible=[i for i, text in enumerate(texts) if text]
+        )
+    
+    def _batched_llm_w2(
+        self,
+        llm_indices: List[int],
+        llm_batch_size: int,
+        deadline: Deadline,
+        on_score: Callable[[int, float], None] = None
+    ) -> Dict[int, Optional[float]]:
+        """
+        LLM w2 of the given experts, several profiles per prompt; on_score
+        gets (expert index, w2) as each batch's response arrives.
+        """
+        indices = [i for i in llm_indices if self.expert_texts[i]]
+        scores = llm_batch_similarity(
+            self.item_text, [self.expert_texts[i] for i in indices],
+            batch_size=llm_batch_size, deadline=deadline,
+            on_score=(lambda n, score: on_score(indices[n], score)) if on_score else None
+        )
+        return dict(zip(indices, scores))
+    
+    def _result(
+        self,
+        i: int,
+        use_llm: bool,
+        llm_w2: Dict[int, Optional[float]],
+        llm_calls: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Final result of expert i.
+        
+        With use_llm, w2 comes from llm_w2 (None there = missed the
+        deadline) or, when the expert has no entry and llm_calls is on,
+        from its own LLM call.
+        """
+        expert = self.experts[i]
+        try:
+            expert_text = generate_expert_text(expert)
+            use_llm = use_llm and bool(expert_text)
+            
+            # w2: Item-Expert LLM (batched or per expert), distilled,
+            # CrossEncoder or cosine-based otherwise
+            if use_llm and llm_w2.get(i) is not None:
+                w2_i = float(llm_w2[i])
+                w2_method = 'llm'
+            elif use_llm and i not in llm_w2 and llm_calls:
+                w2_i = float(llm_similarity(self.item_text, expert_text))
+                w2_method = 'llm'
+            elif i in self.cheap:
+                w2_i, source = self.cheap[i]
+                w2_method = 'deadline' if use_llm else source
+            else:
+                w2_i = float(self.w1[i])
+                w2_method = 'deadline' if use_llm else 'cosine'
             
-            results.append({
+            w1_i = float(self.w1[i])
+            w3_i = float(self.w3[i]) if self.w3 is not None else w1_i
+            w4_i = float(self.w4[i]) if self.w4 is not None else w2_i
+            
+            component_scores = {
+                'w1_item_expert_cosine': w1_i,
+                'w2_item_expert_llm': w2_i,
+                'w3_expert_candidates_cosine': w3_i,
+                'w4_expert_candidates_llm': w4_i
+            }
+            final_score = sum(self.weights[key] * component_scores[key] for key in component_scores)
+            
+            result = {
                 'expert_id': str(expert.get('_id', '')),
                 'expert_name': expert.get('name', ''),
                 'category': expert.get('category', ''),
-                **score_data
-            })
+                'final_score': round(final_score, 2),
+                'component_scores': {
+                    key: round(value, 2) for key, value in component_scores.items()
+                },
+                'reason': expert.get('reason', 'Expert has relevant skills and domain expertise.'),
+                'reason_handle': reason_handle(
+                    self.item, expert, w2_method == 'llm',
+                    w2_method != 'llm' and i in self.distilled,
+                    w2_method != 'llm' and i in self.cheap and i not in self.distilled
+                ),
+                'weights_used': self.weights,
+                'w2_method': w2_method
+            }
+            if self.top_matches is not None:
+                result['top_candidates'] = self.top_matches[i]
+            if self.approximate[i]:
+                result['approximate'] = True
+            return result
         except Exception as e:
             print(f"Error calculating score for expert {expert.get('name')}: {e}")
-            results.append({
+            return {
                 'expert_id': str(expert.get('_id', '')),
                 'expert_name': expert.get('name', ''),
                 'category': expert.get('category', ''),
                 'final_score': 0,
                 'error': str(e)
-            })
+            }
+    
+    def score(
+        self,
+        use_llm: bool = False,
+        llm_rerank_top: int = None,
+        llm_batch_size: int = None,
+        deadline: Deadline = None,
+        on_result: Callable[[Dict[str, Any]], None] = None,
+        prune_top_k: Union[int, Dict[str, int]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Results of every expert, best first (arguments as in
+        batch_calculate_relevance_scores). Without use_llm no LLM call is made.
+        """
+        if not self.experts:
+            return []
+        llm_rerank_top = LLM_RERANK_TOP if llm_rerank_top is None else llm_rerank_top
+        use_llm = use_llm and bool(self.item_text)
+        
+        # Which experts get LLM calls: the branch and bound's, or the rerank's
+        # top per category on cheap scores
+        llm_mask = np.zeros(len(self.experts), dtype=bool)
+        llm_w2 = {}  # w2 of the LLM experts (None = missed the deadline)
+        pruned = None
+        if use_llm and prune_top_k is not None:
+            search = self._branch_and_bound(prune_top_k, llm_batch_size, deadline)
+            llm_w2 = search['w2']
+            pruned = set(search['pruned'])
+            llm_mask[list(llm_w2)] = True
+        elif use_llm:
+            if llm_rerank_top > 0:
+                llm_mask[top_per_category(self.experts, self.cheap_final, llm_rerank_top)] = True
+            else:
+                llm_mask[:] = True
+            llm_mask[list(self.confident)] = False
+            llm_mask[self.approximate] = False
+        
+        # on_result gets each LLM expert once, and nothing after score()
+        # returns (batches in flight at the deadline finish in the background)
+        reported = set()
+        report_lock = threading.Lock()
+        finished = threading.Event()
+        
+        def report(i: int, result: Dict[str, Any]) -> None:
+            if on_result is None:
+                return
+            with report_lock:
+                if finished.is_set() or i in reported:
+                    return
+                reported.add(i)
+            on_result(result)
+        
+        # LLM work is queued best-first, so a deadline cuts off the weakest experts
+        llm_indices = [int(i) for i in np.flatnonzero(llm_mask)]
+        llm_indices.sort(key=lambda i: -self.cheap_final[i])
+        if pruned is None and llm_indices and (llm_batch_size or LLM_SCORE_BATCH_SIZE) > 1:
+            # Each expert is reported as soon as its batch is scored
+            llm_w2 = self._batched_llm_w2(
+                llm_indices, llm_batch_size, deadline,
+                on_score=(lambda i, w2: report(i, self._result(i, True, {i: w2}))) if on_result else None
+            )
+        
+        def score_expert(i: int, llm_calls: bool = True) -> Dict[str, Any]:
+            result = self._result(i, bool(llm_mask[i]), llm_w2, llm_calls)
+            if pruned is not None and 'error' not in result:
+                result['pruned'] = i in pruned
+            return result
+        
+        def score_llm_expert(i: int, llm_calls: bool = True) -> Dict[str, Any]:
+            result = score_expert(i, llm_calls)
+            report(i, result)
+            return result
+        
+        # Experts needing per-expert LLM w2 calls fan out over the Ollama
+        # client's pool; those not finished by the deadline are scored again
+        # without LLM calls
+        llm_results = dict(zip(llm_indices, get_ollama_client().map(
+            score_llm_expert,
+            llm_indices,
+            deadline,
+            fallback=lambda i: score_llm_expert(i, llm_calls=False)
+        )))
+        results = [
+            llm_results[i] if i in llm_results else score_expert(i)
+            for i in range(len(self.experts))
+        ]
+        _log_llm_examples(self.item_text, [
+            (self.expert_texts[i], float(self.w1[i]) / 100)
+            for i, result in llm_results.items() if result.get('w2_method') == 'llm'
+        ])
+        finished.set()
+        
+        # Sort by final score descending
+        results.sort(key=lambda x: x.get('final_score', 0), reverse=True)
+        return results
+
+
+def _safe_expert_texts(experts: List[Dict[str, Any]]) -> List[str]:
+    """Expert texts, '' for experts whose text cannot be built."""
+    texts = []
+    for expert in experts:
+        try:
+            texts.append(generate_expert_text(expert))
+        except Exception:
+            texts.append('')  # Reported by score_expert
+    return texts
+
+
+def cheap_w2_scores(
+    item_text: str,
+    expert_texts: List[str],
+    w1: np.ndarray,
+    use_surrogate: bool = None,
+    use_cross_encoder: bool = None
+) -> Tuple[Dict[int, Tuple[float, str]], Dict[int, float]]:
+    """
+    w2 without LLM calls: distilled (one surrogate prediction) or
+    CrossEncoder (batched forward passes). Experts not returned keep the
+    cosine-based w2.
+    
+    Args:
+        item_text: Item text
+        expert_texts: Expert texts ('' = not scored)
+        w1: Item-expert cosine scores (0-100), in the order of expert_texts
+        use_surrogate: Use the distilled model (default: W2_SURROGATE setting)
+        use_cross_encoder: Use the CrossEncoder (default: W2_CROSS_ENCODER setting)
+    
+    Returns:
+        Tuple of (index -> (w2, w2_method), index -> surrogate band width)
+    """
+    use_surrogate = USE_W2_SURROGATE if use_surrogate is None else use_surrogate
+    use_cross_encoder = USE_CROSS_ENCODER if use_cross_encoder is None else use_cross_encoder
+    cheap, distilled = {}, {}
+    if not (use_surrogate or use_cross_encoder) or not item_text:
+        return cheap, distilled
+    
+    indices = [i for i, text in enumerate(expert_texts) if text]
+    texts = [expert_texts[i] for i in indices]
+    prediction = None
+    if use_surrogate:
+        prediction = surrogate_w2(item_text, texts, np.asarray(w1)[indices] / 100)
+    if prediction is not None:
+        for i, score, width in zip(indices, *prediction):
+            cheap[i] = (float(score), 'distilled')
+            distilled[i] = float(width)
+    elif use_cross_encoder:
+        scores = cross_encoder_similarity(item_text, texts)
+        for i, score in zip(indices, scores or []):
+            cheap[i] = (score, 'cross_encoder')
+    return cheap, distilled
+
+
+def _llm_w2_round(
+    item_text: str,
+    expert_texts: List[str],
+    llm_batch_size: int,
+    deadline: Deadline
+) -> List[Optional[float]]:
+    """LLM w2 of several experts at once (None = missed the deadline)."""
+    if (llm_batch_size or LLM_SCORE_BATCH_SIZE) > 1:
+        return llm_batch_similarity(item_text, expert_texts, batch_size=llm_batch_size, deadline=deadline)
+    return get_ollama_client().map(
+        lambda text: float(llm_similarity(item_text, text)), expert_texts, deadline
+    )
+
+
+def branch_and_bound_w2(
+    categories: List[str],
+    base_scores: np.ndarray,
+    w2_weight: float,
+    top_k: Union[int, Dict[str, int]],
+    evaluate: Callable[[List[int]], List[Optional[float]]],
+    known_w2: Dict[int, float] = None,
+    eligible: List[int] = None
+) -> Dict[str, Any]:
+    """
+    Exact top-k per category when w2 is expensive, by branch and bound.
+    
+    Each expert's final score is base_score + w2_weight * w2 with w2 in
+    [0, W2_MAX], so base_score + w2_weight * W2_MAX bounds it from above.
+    Within each category experts are evaluated in order of that bound, up
+    to k per round (one evaluate call per round covers every category),
+    until the next bound is no higher than the category's k-th exact
+    score. Everyone left cannot enter the top-k and is pruned.
+    
+    Args:
+        categories: Category key of each expert
+        base_scores: Weighted sum of the cheap components of each expert
+        w2_weight: Weight of w2 in the final score
+        top_k: Experts needed per category (int, or category -> count;
+            missing categories need none)
+        evaluate: Returns the w2 scores of a list of indices (None for
+            scores not obtained, e.g. past the deadline)
+        known_w2: Exact w2 scores already available for free
+        eligible: Indices that can be evaluated (default: all)
+        
+    Returns:
+        Dictionary with w2 (index -> evaluated score or None), pruned
+        (indices never evaluated because their bound could not enter the
+        top-k) and rounds (evaluate calls)
+    """
+    known_w2 = known_w2 or {}
+    eligible = range(len(categories)) if eligible is None else eligible
+    upper = base_scores + w2_weight * W2_MAX
+    
+    def needed(category: str) -> int:
+        return top_k.get(category, 0) if isinstance(top_k, dict) else top_k
+    
+    # Exact final scores so far, and the unevaluated experts best bound first
+    exact = {}
+    for i, w2 in known_w2.items():
+        exact.setdefault(categories[i], []).append(base_scores[i] + w2_weight * w2)
+    queues = {}
+    for i in eligible:
+        if i not in known_w2:
+            queues.setdefault(categories[i], []).append(i)
+    for queue in queues.values():
+        queue.sort(key=lambda i: -upper[i])
+    positions = {category: 0 for category in queues}
+    
+    def threshold(category: str) -> float:
+        k = needed(category)
+        scores = exact.get(category, [])
+        if k <= 0:
+            return float('inf')
+        if len(scores) < k:
+            return float('-inf')
+        return heapq.nlargest(k, scores)[-1]
+    
+    w2 = {}
+    rounds = 0
+    while True:
+        batch = []
+        for category, queue in queues.items():
+            bar = threshold(category)
+            position = positions[category]
+            taken = 0
+            while position < len(queue) and taken < needed(category) and upper[queue[position]] > bar:
+                batch.append(queue[position])
+                position += 1
+                taken += 1
+            positions[category] = position
+        if not batch:
+            break
+        
+        rounds += 1
+        missed = False
+        for i, score in zip(batch, evaluate(batch)):
+            w2[i] = score
+            if score is None:
+                missed = True
+            else:
+                exact.setdefault(categories[i], []).append(base_scores[i] + w2_weight * float(score))
+        if missed:
+            # Out of time: experts that could still enter the top-k are
+            # reported as missed, not pruned
+            for category, queue in queues.items():
+                bar = threshold(category)
+                for i in queue[positions[category]:]:
+                    if upper[i] > bar:
+                        w2[i] = None
+            break
+    
+    pruned = [i for queue in queues.values() for i in queue if i not in w2]
+    return {'w2': w2, 'pruned': pruned, 'rounds': rounds}
+
+
+def top_per_category(
+    experts: List[Dict[str, Any]],
+    scores: np.ndarray,
+    per_category: int
+) -> List[int]:
+    """
+    Indices of the best-scoring experts of each category.
+    
+    Args:
+        experts: Expert documents
+        scores: Scores aligned with experts (higher is better)
+        per_category: Number of experts kept per category
+        
+    Returns:
+        Selected indices, in their original order
+    """
+    by_category = {}
+    for i, expert in enumerate(experts):
+        by_category.setdefault((expert.get('category') or '').lower(), []).append(i)
+    
+    keep = []
+    for indices in by_category.values():
+        indices = np.asarray(indices)
+        if len(indices) > per_category:
+            top = np.argpartition(-scores[indices], per_category - 1)[:per_category]
+            indices = indices[top]
+        keep.extend(indices.tolist())
+    return sorted(keep)
+
+
+def llm_usage_summary(
+    scored_experts: List[Dict[str, Any]],
+    use_llm: bool,
+    llm_batch_size: int = None
+) -> Dict[str, int]:
+    """
+    Count the LLM work done and skipped for a batch of scored experts.
+    
+    Cache hits are counted as calls, so these are upper bounds.
+    
+    Args:
+        scored_experts: Results of batch_calculate_relevance_scores
+        use_llm: Whether LLM scoring was requested
+        llm_batch_size: Profiles per w2 prompt used for the batch
+        
+    Returns:
+        Dictionary with llm_scored_experts, llm_calls_made, llm_calls_avoided,
+        deadline_missed_experts (LLM experts left on cosine by the deadline)
+        distilled_experts (w2 from the surrogate), cross_encoder_experts,
+        and pruned_experts / pruning_ratio (share of the experts considered
+        by the branch and bound that it skipped)
+    """
+    batch_size = max(1, llm_batch_size or LLM_SCORE_BATCH_SIZE)
+    llm_scored = sum(1 for r in scored_experts if r.get('w2_method') == 'llm')
+    missed = sum(1 for r in scored_experts if r.get('w2_method') == 'deadline')
+    skipped = len(scored_experts) - llm_scored - missed if use_llm else 0
+    pruned = sum(1 for r in scored_experts if r.get('pruned'))
+    considered = sum(1 for r in scored_experts if 'pruned' in r)
+    # One w2 call per batch of profiles
+    score_calls = -(-llm_scored // batch_size)
+    return {
+        'llm_scored_experts': llm_scored,
+        'llm_calls_made': score_calls,
+        'llm_calls_avoided': skipped * _LLM_CALLS_PER_EXPERT,
+        'deadline_missed_experts': missed,
+        'distilled_experts': sum(1 for r in scored_experts if r.get('w2_method') == 'distilled'),
+        'cross_encoder_experts': sum(1 for r in scored_experts if r.get('w2_method') == 'cross_encoder'),
+        'pruned_experts': pruned,
+        'pruning_ratio': round(pruned / considered, 4) if considered else 0.0
+    }
+
+
+def int8_shortlist(
+    experts: List[Dict[str, Any]],
+    approx_scores: np.ndarray,
+    per_category: int
+) -> List[int]:
+    """
+    Experts to rescore in full precision after the int8 first pass.
+    
+    Args:
+        experts: Expert documents
+        approx_scores: First-pass cosines aligned with experts (NaN for
+            experts without stored codes, which are always rescored)
+        per_category: Number of experts kept per category
+        
+    Returns:
+        Indices of the shortlisted experts, in their original order
+    """
+    approx_scores = np.asarray(approx_scores, dtype=np.float64)
+    missing = np.isnan(approx_scores)
+    keep = set(top_per_category(experts, np.where(missing, -np.inf, approx_scores), per_category))
+    keep.update(np.flatnonzero(missing).tolist())
+    return sorted(keep)
+
+
+def reblend_scores(
+    scored_experts: List[Dict[str, Any]],
+    weight_sets: List[Dict[str, float]]
+) -> List[List[Dict[str, Any]]]:
+    """
+    Re-rank scored experts under other weights without rescoring them.
+    
+    The final score is a linear blend of the four component scores, so
+    new weights cost one matrix product over the stored components: no
+    embeddings, cosines or LLM calls.
+    
+    Args:
+        scored_experts: Results with component_scores (from
+            batch_calculate_relevance_scores or the score store)
+        weight_sets: Weight dictionaries (missing keys take DEFAULT_WEIGHTS)
+        
+    Returns:
+        One ranked copy of scored_experts per weight set, with final_score,
+        weights_used and rank recomputed
+    """
+    keys = list(DEFAULT_WEIGHTS)
+    weight_sets = [
+        {key: float(value) for key, value in {**DEFAULT_WEIGHTS, **(weights or {})}.items() if key in DEFAULT_WEIGHTS}
+        for weights in weight_sets
+    ]
+    scored_experts = [expert for expert in scored_experts if expert.get('component_scores')]
     
-    # Sort by final score descending
-    results.sort(key=lambda x: x.get('final_score', 0), reverse=True)
+    # (experts x components) @ (components x weight sets)
+    components = np.array(
+        [[float(expert['component_scores'].get(key, 0)) for key in keys] for expert in scored_experts],
+        dtype=np.float64
+    ).reshape(len(scored_experts), len(keys))
+    blend = np.array([[weights[key] for key in keys] for weights in weight_sets], dtype=np.float64)
+    final_scores = components @ blend.reshape(len(weight_sets), len(keys)).T
     
-    return results
+    return [
+        rank_experts([
+            {**expert, 'final_score': round(float(final_scores[i, j]), 2), 'weights_used': weights}
+            for i, expert in enumerate(scored_experts)
+        ])
+        for j, weights in enumerate(weight_sets)
+    ]
 
 
 def rank_experts(scored_experts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
@@ -247,6 +1314,20 @@ def rank_experts(scored_experts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
 __all__ = [
     'calculate_relevance_score',
     'batch_calculate_relevance_scores',
+    'ScoringBatch',
+    'explain_relevance',
+    'stream_relevance_reason',
+    'prefetch_reasons',
+    'reason_handle',
     'rank_experts',
-    'DEFAULT_WEIGHTS'
+    'reblend_scores',
+    'int8_shortlist',
+    'top_per_category',
+    'branch_and_bound_w2',
+    'llm_usage_summary',
+    'cheap_w2_scores',
+    'DEFAULT_WEIGHTS',
+    'LLM_RERANK_TOP',
+    'USE_W2_SURROGATE',
+    'USE_CROSS_ENCODER'
 ]
@@ -0,0 +1,403 @@
+"""
+MIRA DRDO - W2 Score Distillation Module
+
+Small regression model approximating the Ollama w2 (item-expert LLM)
+score from cheap pair features, so most experts get an LLM-like w2 without
+a prompt:
+- Every genuine LLM w2 score is logged with the texts the prompt saw and
+  the pair's cosine (w2_examples collection)
+- train_w2_surrogate fits a gradient-boosted regressor on those examples,
+  plus two quantile models (10th/90th percentile) as an uncertainty band,
+  and reports its error on held-out LLM scores
+- The trained surrogate serves w2_method 'distilled' in a few
+  microseconds per pair; pairs whose band is wider than
+  W2_SURROGATE_UNCERTAINTY points still go to the LLM
+
+The model is pickled to W2_SURROGATE_PATH and only serves the Ollama model
+it was trained on (changing OLLAMA_MODEL disables it until retrained).
+"""
+
+import os
+import pickle
+import re
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from .cache import content_hash
+from .similarity_calculator import STOP_WORDS, TECH_KEYWORDS, _current_model
+
+
+# Where the trained surrogate is stored
+SURROGATE_PATH = os.getenv('W2_SURROGATE_PATH', os.path.join('models', 'w2_surrogate.pkl'))
+
+# Width (score points) of the 10-90% band above which a pair still goes to the LLM
+SURROGATE_UNCERTAINTY = float(os.getenv('W2_SURROGATE_UNCERTAINTY', '20'))
+
+# Logged LLM scores needed before a surrogate is trained
+SURROGATE_MIN_EXAMPLES = int(os.getenv('W2_SURROGATE_MIN_EXAMPLES', '50'))
+
+# Characters of each text seen by the scoring prompts (see llm_similarity)
+_PROMPT_CHARS = 500
+
+FEATURE_NAMES = [
+    'cosine',
+    'word_jaccard',
+    'item_word_coverage',
+    'expert_word_coverage',
+    'shared_tech_terms',
+    'item_tech_coverage',
+    'log_item_words',
+    'log_expert_words'
+]
+
+
+def _words(text: str) -> set:
+    return set(re.findall(r'[a-z0-9]+', text.lower())) - STOP_WORDS
+
+
+def pair_features(item_text: str, expert_text: str, cosine: float) -> np.ndarray:
+    """
+    Feature vector of one item-expert pair (see FEATURE_NAMES).
+
+    Args:
+        item_text: Item text representation
+        expert_text: Expert text representation
+        cosine: Item-expert embedding cosine (0-1)
+
+    Returns:
+        float64 array of len(FEATURE_NAMES)
+    """
+    item_words = _words(item_text[:_PROMPT_CHARS])
+    expert_words = _words(expert_text[:_PROMPT_CHARS])
+    common = item_words & expert_words
+    union = item_words | expert_words
+    item_tech = item_words & TECH_KEYWORDS
+    return np.array([
+        cosine,
+        len(common) / len(union) if union else 0.0,
+        len(common) / len(item_words) if item_words else 0.0,
+        len(common) / len(expert_words) if expert_words else 0.0,
+        len(common & TECH_KEYWORDS),
+        len(item_tech & expert_words) / len(item_tech) if item_tech else 0.0,
+        np.log1p(len(item_words)),
+        np.log1p(len(expert_words))
+    ], dtype=np.float64)
+
+
+def _feature_matrix(item_text: str, expert_texts: List[str], cosines) -> np.ndarray:
+    return np.stack([
+        pair_features(item_text, text, float(cosine))
+        for text, cosine in zip(expert_texts, cosines)
+    ]) if len(expert_texts) else np.zeros((0, len(FEATURE_NAMES)))
+
+
+class W2Surrogate:
+    """Trained w2 regressor with a quantile uncertainty band."""
+
+    def __init__(self, mean_model, low_model, high_model, llm_model: str, report: Dict[str, Any]):
+        """
+        Args:
+            mean_model: Regressor of the LLM score
+            low_model: 10th percentile quantile regressor
+            high_model: 90th percentile quantile regressor
+            llm_model: Ollama model whose scores were distilled
+            report: Held-out evaluation (see train_w2_surrogate)
+        """
+        self.mean_model = mean_model
+        self.low_model = low_model
+        self.high_model = high_model
+        self.llm_model = llm_model
+        self.report = report
+
+    def predict_features(self, features: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Predicted scores (0-100) and band widths for a feature matrix."""
+        if len(features) == 0:
+            return np.zeros(0), np.zeros(0)
+        scores = np.clip(self.mean_model.predict(features), 0, 100)
+        widths = np.abs(self.high_model.predict(features) - self.low_model.predict(features))
+        return scores, widths
+
+    def predict(self, item_text: str, expert_texts: List[str], cosines) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Distilled w2 for several experts against one item.
+
+        Args:
+            item_text: Item text representation
+            expert_texts: Expert text representations
+            cosines: Item-expert cosines (0-1), aligned with expert_texts
+
+        Returns:
+            (scores, widths) arrays aligned with expert_texts
+        """
+        return self.predict_features(_feature_matrix(item_text, expert_texts, cosines))
+
+    def save(self, path: str) -> None:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(self, f)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def load(path: str) -> Optional['W2Surrogate']:
+        """Load a surrogate saved by train_w2_surrogate (None if absent or unreadable)."""
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'rb') as f:
+                return pickle.load(f)
+        except Exception as e:
+            print(f"⚠️ Could not load w2 surrogate from {path}: {e}")
+            return None
+
+
+# Module-level state shared by the scorers and routes
+_examples_collection = None
+_surrogate = None
+_surrogate_loaded = False
+_lock = threading.Lock()
+
+
+def init_score_distiller(collection) -> None:
+    """Attach the collection LLM w2 examples are logged to (called once at startup)."""
+    global _examples_collection
+    _examples_collection = collection
+    try:
+        collection.create_index('model')
+    except Exception as e:
+        print(f"⚠️ Could not create w2 examples index: {e}")
+
+
+def is_logging_enabled() -> bool:
+    return _examples_collection is not None
+
+
+def log_w2_examples(
+    item_text: str,
+    expert_texts: List[str],
+    cosines: List[float],
+    scores: List[float]
+) -> int:
+    """
+    Record genuine LLM w2 scores as training examples (one bulk upsert).
+
+    Pairs are keyed by the truncated texts the prompt saw, so rescoring
+    the same pair overwrites its example instead of duplicating it.
+
+    Args:
+        item_text: Item text representation
+        expert_texts: Expert text representations
+        cosines: Item-expert cosines (0-1)
+        scores: LLM w2 scores (0-100)
+
+    Returns:
+        Number of examples written
+    """
+    if _examples_collection is None or not expert_texts:
+        return 0
+    from pymongo import UpdateOne
+
+    model = _current_model()
+    requirements = item_text[:_PROMPT_CHARS]
+    now = datetime.now()
+    operations = []
+    for text, cosine, score in zip(expert_texts, cosines, scores):
+        profile = text[:_PROMPT_CHARS]
+        operations.append(UpdateOne(
+            {'_id': content_hash(model, requirements, profile)},
+            {'$set': {
+                'model': model,
+                'itemText': requirements,
+                'expertText': profile,
+                'cosine': float(cosine),
+                'score': float(score),
+                'updatedAt': now
+            }},
+            upsert=True
+        ))
+    try:
+        _examples_collection.bulk_write(operations, ordered=False)
+        return len(operations)
+    except Exception as e:
+        print(f"⚠️ Could not log w2 examples: {e}")
+        return 0
+
+
+def count_w2_examples(model: str = None) -> int:
+    if _examples_collection is None:
+        return 0
+    return _examples_collection.count_documents({'model': model or _current_model()})
+
+
+def _mean_absolute_error(truth: np.ndarray, predicted: np.ndarray) -> float:
+    return float(np.mean(np.abs(truth - predicted)))
+
+
+def train_w2_surrogate(
+    test_size: float = 0.2,
+    min_examples: int = None,
+    max_examples: int = 50000,
+    seed: int = 0,
+    path: str = None
+) -> Dict[str, Any]:
+    """
+    Fit the w2 surrogate on the logged LLM scores of the current model.
+
+    A held-out split is kept aside for the report; the saved model is the
+    one evaluated (it is not refitted on the held-out rows).
+
+    Args:
+        test_size: Fraction of examples held out for evaluation
+        min_examples: Examples required (default: SURROGATE_MIN_EXAMPLES)
+        max_examples: Most recent examples used
+        seed: Random seed of the split and the models
+        path: Where to save the model (default: SURROGATE_PATH)
+
+    Returns:
+        Report with held-out MAE/RMSE/R², baselines, band coverage and
+        prediction time per pair
+
+    Raises:
+        ValueError: Too few examples logged
+    """
+    global _surrogate, _surrogate_loaded
+    from sklearn.ensemble import GradientBoostingRegressor
+    from sklearn.model_selection import train_test_split
+
+    min_examples = SURROGATE_MIN_EXAMPLES if min_examples is None else min_examples
+    model = _current_model()
+    docs = []
+    if _examples_collection is not None:
+        docs = list(
+            _examples_collection.find(
+                {'model': model}, {'itemText': 1, 'expertText': 1, 'cosine': 1, 'score': 1}
+            ).sort('updatedAt', -1).limit(max_examples)
+        )
+    if len(docs) < max(min_examples, 10):
+        raise ValueError(
+            f"Need at least {max(min_examples, 10)} logged LLM scores for {model}, have {len(docs)}"
+        )
+
+    # Features are recomputed from the stored texts, so feature changes
+    # never invalidate the logged examples
+    X = np.stack([pair_features(d['itemText'], d['expertText'], d['cosine']) for d in docs])
+    y = np.array([d['score'] for d in docs], dtype=np.float64)
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=test_size, random_state=seed)
+
+    params = {'n_estimators': 150, 'max_depth': 3, 'learning_rate': 0.05,
+              'subsample': 0.8, 'random_state': seed}
+    start = time.perf_counter()
+    mean_model = GradientBoostingRegressor(**params).fit(X_train, y_train)
+    low_model = GradientBoostingRegressor(loss='quantile', alpha=0.1, **params).fit(X_train, y_train)
+    high_model = GradientBoostingRegressor(loss='quantile', alpha=0.9, **params).fit(X_train, y_train)
+    train_seconds = time.perf_counter() - start
+
+    surrogate = W2Surrogate(mean_model, low_model, high_model, model, {})
+    start = time.perf_counter()
+    predicted, widths = surrogate.predict_features(X_test)
+    predict_seconds = time.perf_counter() - start
+    low = low_model.predict(X_test)
+    high = high_model.predict(X_test)
+
+    residual = y_test - predicted
+    variance = float(np.var(y_test))
+    report = {
+        'model': model,
+        'trained_at': datetime.now().isoformat(),
+        'examples': len(docs),
+        'train_examples': len(y_train),
+        'test_examples': len(y_test),
+        'features': FEATURE_NAMES,
+        'mae': round(_mean_absolute_error(y_test, predicted), 3),
+        'rmse': round(float(np.sqrt(np.mean(residual ** 2))), 3),
+        'r2': round(1 - float(np.mean(residual ** 2)) / variance, 4) if variance > 0 else None,
+        'baseline_mae': {
+            'cosine': round(_mean_absolute_error(y_test, X_test[:, 0] * 100), 3),
+            'train_mean': round(_mean_absolute_error(y_test, np.full(len(y_test), y_train.mean())), 3)
+        },
+        'band_coverage': round(float(np.mean((y_test >= np.minimum(low, high)) &
+                                              (y_test <= np.maximum(low, high)))), 4),
+        'mean_band_width': round(float(np.mean(widths)), 3),
+        'uncertainty_threshold': SURROGATE_UNCERTAINTY,
+        'uncertain_fraction': round(float(np.mean(widths > SURROGATE_UNCERTAINTY)), 4),
+        'train_seconds': round(train_seconds, 3),
+        'predict_us_per_pair': round(1e6 * predict_seconds / max(1, len(y_test)), 2)
+    }
+    surrogate.report = report
+    surrogate.save(path or SURROGATE_PATH)
+
+    with _lock:
+        _surrogate = surrogate
+        _surrogate_loaded = True
+    print(f"🎓 w2 surrogate trained on {len(y_train)} examples: held-out MAE {report['mae']} "
+          f"(cosine baseline {report['baseline_mae']['cosine']})")
+    return report
+
+
+def get_w2_surrogate() -> Optional[W2Surrogate]:
+    """The trained surrogate for the current Ollama model, or None."""
+    global _surrogate, _surrogate_loaded
+    if not _surrogate_loaded:
+        with _lock:
+            if not _surrogate_loaded:
+                _surrogate = W2Surrogate.load(SURROGATE_PATH)
+                _surrogate_loaded = True
+    surrogate = _surrogate
+    if surrogate is None or surrogate.llm_model != _current_model():
+        return None
+    return surrogate
+
+
+def surrogate_w2(
+    item_text: str,
+    expert_texts: List[str],
+    cosines
+) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Distilled w2 scores and band widths, or None without a usable surrogate.
+
+    Args:
+        item_text: Item text representation
+        expert_texts: Expert text representations
+        cosines: Item-expert cosines (0-1), aligned with expert_texts
+    """
+    surrogate = get_w2_surrogate()
+    if surrogate is None:
+        return None
+    return surrogate.predict(item_text, expert_texts, cosines)
+
+
+def get_surrogate_status() -> Dict[str, Any]:
+    """Whether a surrogate is served, its last report and the examples logged."""
+    surrogate = get_w2_surrogate()
+    stored = _surrogate
+    return {
+        'available': surrogate is not None,
+        'trained_for': stored.llm_model if stored is not None else None,
+        'current_model': _current_model(),
+        'path': SURROGATE_PATH,
+        'uncertainty_threshold': SURROGATE_UNCERTAINTY,
+        'logging_enabled': is_logging_enabled(),
+        'examples_logged': count_w2_examples(),
+        'report': stored.report if stored is not None else None
+    }
+
+
+# Export functions
+__all__ = [
+    'W2Surrogate',
+    'FEATURE_NAMES',
+    'SURROGATE_PATH',
+    'SURROGATE_UNCERTAINTY',
+    'pair_features',
+    'init_score_distiller',
+    'log_w2_examples',
+    'train_w2_surrogate',
+    'get_w2_surrogate',
+    'surrogate_w2',
+    'get_surrogate_status'
+]
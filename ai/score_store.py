@@ -0,0 +1,349 @@
+"""
+MIRA DRDO - Score Store Module
+
+Materialized relevance scores, one row per (item, expert), so scoring one
+item never overwrites another item's results and ranked views are served
+by a single indexed query instead of a recompute.
+
+Each row holds the final and component scores, the weights and w2 method
+they were computed with, and stamps of what they were computed from:
+- itemVersion / candidatesVersion: the item's embedding fingerprint and
+  candidate pool state (count and last update)
+- expertVersion: the expert's embedding fingerprint
+- embeddingModel / w2Model / scorerVersion: models and scoring code
+
+Invalidation is targeted: an expert profile change marks only that
+expert's rows stale, an item or candidate pool change only that item's
+rows. Rows whose item stamps no longer match the item are found with one
+query when the item is read, and only stale rows are recomputed.
+
+Recomputing never makes LLM calls, as it runs inside read requests: a
+stale LLM-scored row gets a cheap w2 and is flagged llmPending until an
+explicit /calculate with use_llm scores it again.
+"""
+
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+from pymongo import ASCENDING, DESCENDING, UpdateOne
+from .similarity_calculator import _current_model, get_cross_encoder_model_name
+from .relevance_scorer import reason_handle
+
+
+# Bump when a scoring change makes stored scores incomparable with new ones
+SCORER_VERSION = 'v1'
+
+# Options that recompute a row with the w2 method it was stored with
+# ('llm', 'deadline' and 'cosine' rows are recomputed without LLM calls,
+# with the default cheap w2)
+RESCORE_OPTIONS = {
+    'distilled': {'use_surrogate': True},
+    'cross_encoder': {'use_cross_encoder': True}
+}
+
+_scores_collection = None
+
+
+def init_score_store(collection) -> None:
+    """Attach the scores collection and create its indexes (called once at startup)."""
+    global _scores_collection
+    _scores_collection = collection
+    try:
+        collection.create_index(
+            [('itemId', ASCENDING), ('category', ASCENDING), ('finalScore', DESCENDING)]
+        )
+        collection.create_index('expertId')
+    except Exception as e:
+        print(f"⚠️ Could not create score store indexes: {e}")
+
+
+def is_score_store_enabled() -> bool:
+    return _scores_collection is not None
+
+
+def _ids(values) -> List[str]:
+    """One id or several, as the strings rows are keyed by."""
+    if values is None:
+        return []
+    if isinstance(values, (str, bytes)) or not isinstance(values, Iterable):
+        values = [values]
+    return [str(value) for value in values]
+
+
+def item_versions(item: Dict[str, Any]) -> Dict[str, Any]:
+    """Stamps of the item-side inputs of its scores."""
+    pool_updated = item.get('candidatePoolUpdatedAt')
+    return {
+        'itemVersion': item.get('embeddingFingerprint'),
+        'candidatesVersion': f"{item.get('candidateCount', 0)}:"
+                             f"{pool_updated.isoformat() if pool_updated else ''}"
+    }
+
+
+def _w2_model(w2_method: str) -> Optional[str]:
+    """Model behind a w2 method (None for cosine-based w2)."""
+    if w2_method in ('llm', 'distilled'):
+        return _current_model()
+    if w2_method == 'cross_encoder':
+        return get_cross_encoder_model_name()
+    return None
+
+
+def _score_operations(
+    item: Dict[str, Any],
+    experts_by_id: Dict[str, Dict[str, Any]],
+    scored_experts: List[Dict[str, Any]],
+    now: datetime,
+    llm_pending: bool = False
+) -> List[UpdateOne]:
+    """Upserts storing one item's scoring results."""
+    item_id = str(item.get('_id', ''))
+    versions = item_versions(item)
+    operations = []
+    for scored in scored_experts:
+        if 'error' in scored or not scored.get('expert_id'):
+            continue
+        expert_id = scored['expert_id']
+        expert = experts_by_id.get(expert_id, {})
+        w2_method = scored.get('w2_method', 'cosine')
+        operations.append(UpdateOne(
+            {'_id': f"{item_id}:{expert_id}"},
+            {'$set': {
+                'itemId': item_id,
+                'expertId': expert_id,
+                'expertName': scored.get('expert_name', ''),
+                'category': (scored.get('category') or '').lower(),
+                'finalScore': scored.get('final_score', 0),
+                'componentScores': scored.get('component_scores', {}),
+                'weights': scored.get('weights_used'),
+                'w2Method': w2_method,
+                **versions,
+                'expertVersion': expert.get('embeddingFingerprint'),
+                'embeddingModel': expert.get('embeddingModel'),
+                'w2Model': _w2_model(w2_method),
+                'scorerVersion': SCORER_VERSION,
+                'stale': False,
+                'llmPending': llm_pending and w2_method != 'llm',
+                'computedAt': now
+            }},
+            upsert=True
+        ))
+    return operations
+
+
+def _write(operations: List[UpdateOne], label: str) -> int:
+    if not operations:
+        return 0
+    try:
+        _scores_collection.bulk_write(operations, ordered=False)
+        return len(operations)
+    except Exception as e:
+        print(f"⚠️ Could not store scores for {label}: {e}")
+        return 0
+
+
+def save_scores(
+    item: Dict[str, Any],
+    experts: List[Dict[str, Any]],
+    scored_experts: List[Dict[str, Any]],
+    llm_pending: bool = False
+) -> int:
+    """
+    Store scoring results for an item (one bulk upsert).
+
+    Args:
+        item: Item document the experts were scored for
+        experts: Expert documents that were scored (for their stamps)
+        scored_experts: Results of batch_calculate_relevance_scores
+        llm_pending: Whether the rows stand in for LLM scores until the
+            next /calculate with use_llm (rows with LLM w2 never are)
+
+    Returns:
+        Number of rows written
+    """
+    if _scores_collection is None:
+        return 0
+    experts_by_id = {str(expert.get('_id')): expert for expert in experts}
+    operations = _score_operations(item, experts_by_id, scored_experts, datetime.now(), llm_pending)
+    return _write(operations, f"item {item.get('_id')}")
+
+
+def save_item_scores(
+    items: List[Dict[str, Any]],
+    experts: List[Dict[str, Any]],
+    results: Dict[str, List[Dict[str, Any]]]
+) -> int:
+    """
+    Store the scoring results of several items in one bulk upsert.
+
+    Args:
+        items: Item documents
+        experts: Expert documents that were scored (for their stamps)
+        results: Item _id (string) -> results (see batch_scorer.score_items)
+
+    Returns:
+        Number of rows written
+    """
+    if _scores_collection is None:
+        return 0
+    experts_by_id = {str(expert.get('_id')): expert for expert in experts}
+    now = datetime.now()
+    operations = []
+    for item in items:
+        operations.extend(_score_operations(
+            item, experts_by_id, results.get(str(item.get('_id', '')), []), now
+        ))
+    return _write(operations, f"{len(items)} items")
+
+
+def get_ranked_scores(item_id, category: str = None, limit: int = 0) -> List[Dict[str, Any]]:
+    """
+    Stored scores of an item, best first within each category.
+
+    Served by the (itemId, category, finalScore) index.
+    """
+    if _scores_collection is None:
+        return []
+    query = {'itemId': str(item_id)}
+    if category:
+        query['category'] = category.lower()
+        sort = [('finalScore', DESCENDING)]
+    else:
+        sort = [('category', ASCENDING), ('finalScore', DESCENDING)]
+    return list(_scores_collection.find(query).sort(sort).limit(max(0, limit or 0)))
+
+
+def load_scored_experts(item_id) -> List[Dict[str, Any]]:
+    """
+    Stored scores of an item in the shape batch_calculate_relevance_scores
+    returns them (for re-blending and panel building without rescoring).
+    """
+    scored_experts = []
+    for row in get_ranked_scores(item_id):
+        w2_method = row.get('w2Method', 'cosine')
+        scored_experts.append({
+            'expert_id': row['expertId'],
+            'expert_name': row.get('expertName', ''),
+            'category': row.get('category', ''),
+            'final_score': row.get('finalScore', 0),
+            'component_scores': row.get('componentScores', {}),
+            'reason_handle': reason_handle(
+                {'_id': row['itemId']}, {'_id': row['expertId']}, w2_method == 'llm',
+                w2_method == 'distilled', w2_method == 'cross_encoder'
+            ),
+            'weights_used': row.get('weights'),
+            'w2_method': w2_method,
+            'stale': row.get('stale', False),
+            'llm_pending': row.get('llmPending', False)
+        })
+    return scored_experts
+
+
+def invalidate_scores(expert_ids=None, item_ids=None) -> int:
+    """
+    Mark the stored scores of some experts and/or items for recomputation.
+
+    Returns:
+        Number of rows marked stale
+    """
+    if _scores_collection is None:
+        return 0
+    conditions = []
+    if _ids(expert_ids):
+        conditions.append({'expertId': {'$in': _ids(expert_ids)}})
+    if _ids(item_ids):
+        conditions.append({'itemId': {'$in': _ids(item_ids)}})
+    if not conditions:
+        return 0
+    try:
+        result = _scores_collection.update_many(
+            {'$or': conditions, 'stale': False},
+            {'$set': {'stale': True}}
+        )
+        return result.modified_count
+    except Exception as e:
+        print(f"⚠️ Could not invalidate stored scores: {e}")
+        return 0
+
+
+def invalidate_outdated_scores(item: Dict[str, Any]) -> int:
+    """Mark an item's rows stale whose item or candidate stamps no longer match."""
+    if _scores_collection is None:
+        return 0
+    versions = item_versions(item)
+    try:
+        result = _scores_collection.update_many(
+            {
+                'itemId': str(item.get('_id', '')),
+                'stale': False,
+                '$or': [
+                    {'itemVersion': {'$ne': versions['itemVersion']}},
+                    {'candidatesVersion': {'$ne': versions['candidatesVersion']}},
+                    {'scorerVersion': {'$ne': SCORER_VERSION}}
+                ]
+            },
+            {'$set': {'stale': True}}
+        )
+        return result.modified_count
+    except Exception as e:
+        print(f"⚠️ Could not check stored scores: {e}")
+        return 0
+
+
+def get_stale_scores(item_id) -> List[Dict[str, Any]]:
+    """Stale rows of an item, with what is needed to recompute them."""
+    if _scores_collection is None:
+        return []
+    return list(_scores_collection.find(
+        {'itemId': str(item_id), 'stale': True},
+        {'expertId': 1, 'weights': 1, 'w2Method': 1, 'llmPending': 1}
+    ))
+
+
+def rescore_options(w2_method: str) -> Dict[str, Any]:
+    """
+    batch_calculate_relevance_scores options reproducing a row's w2
+    method without LLM calls (see needs_llm for LLM-scored rows).
+    """
+    return dict(RESCORE_OPTIONS.get(w2_method, {}))
+
+
+def needs_llm(row: Dict[str, Any]) -> bool:
+    """Whether a row was LLM-scored, or stands in for LLM scores, so a rescore leaves it llmPending."""
+    return row.get('w2Method') == 'llm' or bool(row.get('llmPending'))
+
+
+def delete_scores(expert_ids=None, item_ids=None) -> int:
+    """Drop the stored scores of deleted experts and/or items."""
+    if _scores_collection is None:
+        return 0
+    conditions = []
+    if _ids(expert_ids):
+        conditions.append({'expertId': {'$in': _ids(expert_ids)}})
+    if _ids(item_ids):
+        conditions.append({'itemId': {'$in': _ids(item_ids)}})
+    if not conditions:
+        return 0
+    try:
+        return _scores_collection.delete_many({'$or': conditions}).deleted_count
+    except Exception as e:
+        print(f"⚠️ Could not delete stored scores: {e}")
+        return 0
+
+
+# Export functions
+__all__ = [
+    'SCORER_VERSION',
+    'init_score_store',
+    'is_score_store_enabled',
+    'item_versions',
+    'save_scores',
+    'save_item_scores',
+    'get_ranked_scores',
+    'load_scored_experts',
+    'invalidate_scores',
+    'invalidate_outdated_scores',
+    'get_stale_scores',
+    'rescore_options',
+    'needs_llm',
+    'delete_scores'
+]
@@ -4,61 +4,63 @@ MIRA DRDO - Similarity Calculator Module
 This module calculates similarity scores using:
 1. Cosine similarity (fast, mathematical comparison of embeddings)
 2. LLM similarity (semantic comparison using LOCAL Ollama models)
+3. Cross-encoder similarity (a small sentence-transformers CrossEncoder
+   on CPU, hundreds of pairs per forward pass - between the two in cost)
 
 The combination provides both speed and accuracy for expert matching.
 Works completely OFFLINE with no external API dependencies.
+
+LLM scores and reasons are cached by prompt fingerprint (see llm_cache.py).
 """
 
 import os
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Callable, Iterator, Optional, Tuple
 import numpy as np
 from scipy.spatial.distance import cosine
 import re
+import json
+from .llm_cache import get_llm_cache
+from .ollama_client import get_ollama_client, Deadline, OllamaUnavailableError
 
 # Ollama setup - lazy loading
-_ollama_client = None
-_ollama_available = None
 _default_model = 'llama3.2'  # Can be changed to mistral, phi, etc.
 
 
 def _check_ollama_available():
-    """Check if Ollama is running and available."""
-    global _ollama_available
-    if _ollama_available is not None:
-        return _ollama_available
-    
-    try:
-        import ollama
-        # Try to list models to verify connection
-        ollama.list()
-        _ollama_available = True
-        print("✅ Ollama is available for local LLM inference")
-        return True
-    except Exception as e:
-        print(f"⚠️ Ollama not available: {e}")
-        print("   Install Ollama from https://ollama.ai and run: ollama pull llama3.2")
-        _ollama_available = False
-        return False
+    """Check if Ollama is running and available (cached probe + circuit breaker)."""
+    return get_ollama_client().is_available()
+
+
+def _current_model() -> str:
+    """Ollama model used for scoring and reasons."""
+    return os.getenv('OLLAMA_MODEL', _default_model)
 
 
-def _get_ollama_response(prompt: str, model: str = None) -> Optional[str]:
+def _get_ollama_response(
+    prompt: str,
+    model: str = None,
+    num_predict: int = 50,
+    format: str = None
+) -> Optional[str]:
     """Get response from Ollama."""
     if not _check_ollama_available():
         return None
     
     try:
-        import ollama
-        model = model or os.getenv('OLLAMA_MODEL', _default_model)
+        model = model or _current_model()
         
-        response = ollama.generate(
-            model=model,
-            prompt=prompt,
+        response = get_ollama_client().generate(
+            prompt,
+            model,
             options={
                 'temperature': 0.1,  # Low temperature for consistent scoring
-                'num_predict': 50,  # Increased to allow complete explanations (was 50)
-            }
+                'num_predict': num_predict,
+            },
+            format=format
         )
-        return response.get('response', '').strip()
+        return response.strip()
+    except OllamaUnavailableError:
+        return None
     except Exception as e:
         print(f"Ollama error: {e}")
         return None
@@ -75,13 +77,13 @@ def cosine_similarity(embedding1: List[float], embedding2: List[float]) -> float
     Returns:
         Similarity score between 0 and 1 (1 = identical)
     """
-    if not embedding1 or not embedding2:
+    if embedding1 is None or embedding2 is None or len(embedding1) == 0 or len(embedding2) == 0:
         return 0.0
     
     try:
         # Convert to numpy arrays
-        vec1 = np.array(embedding1)
-        vec2 = np.array(embedding2)
+        vec1 = np.asarray(embedding1, dtype=np.float64)
+        vec2 = np.asarray(embedding2, dtype=np.float64)
         
         # Handle dimension mismatch
         if len(vec1) != len(vec2):
@@ -114,6 +116,58 @@ def batch_cosine_similarity(target_embedding: List[float],
     return [cosine_similarity(target_embedding, emb) for emb in embeddings]
 
 
+def embeddings_to_matrix(
+    embeddings: List[Optional[List[float]]],
+    dim: int = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Stack embeddings into a float32 matrix of L2-normalised rows.
+    
+    Rows are truncated or zero-padded to `dim` (default: length of the
+    first available embedding). Missing or zero-norm embeddings become
+    zero rows so they score 0.0 against everything, like cosine_similarity.
+    
+    Args:
+        embeddings: List of embedding vectors (None allowed)
+        dim: Target dimension
+        
+    Returns:
+        Tuple of (matrix of shape (n, dim), boolean mask of valid rows)
+    """
+    if dim is None:
+        dim = next((len(e) for e in embeddings if e is not None and len(e) > 0), 0)
+    
+    matrix = np.zeros((len(embeddings), dim), dtype=np.float32)
+    for i, emb in enumerate(embeddings):
+        if emb is None or len(emb) == 0:
+            continue
+        vec = np.asarray(emb, dtype=np.float32)[:dim]
+        matrix[i, :len(vec)] = vec
+    
+    norms = np.linalg.norm(matrix, axis=1)
+    valid = norms > 0
+    matrix[valid] /= norms[valid, None]
+    return matrix, valid
+
+
+def cosine_similarity_matrix(queries: np.ndarray, matrix: np.ndarray) -> np.ndarray:
+    """
+    Cosine similarity between every query row and every matrix row.
+    
+    Both inputs must already be L2-normalised (see embeddings_to_matrix),
+    so the whole computation is a single matrix product.
+    
+    Args:
+        queries: Array of shape (q, dim) or (dim,)
+        matrix: Array of shape (n, dim)
+        
+    Returns:
+        Similarity scores clamped to [0, 1], shape (q, n) or (n,)
+    """
+    scores = matrix @ queries.T if queries.ndim == 1 else queries @ matrix.T
+    return np.clip(scores, 0.0, 1.0)
+
+
 def llm_similarity(text1: str, text2: str, context: str = "job matching") -> float:
     """
     Calculate semantic similarity using local Ollama LLM.
@@ -137,25 +191,37 @@ def llm_similarity(text1: str, text2: str, context: str = "job matching") -> flo
         return _fallback_text_similarity(text1, text2)
     
     try:
+        model = _current_model()
+        requirements, profile = text1[:500], text2[:500]
+        cache = get_llm_cache()
+        cache_key = cache.make_key('similarity', model, requirements, profile, context)
+        cached = cache.get(cache_key)
+        if cached is None:
+            # A score from a batched prompt for the same pair is reused as well
+            cached = cache.get(cache.make_key('batch_similarity', model, requirements, profile, context))
+        if cached is not None:
+            return cached
+        
         prompt = f"""Rate the relevance match between these two profiles for {context} on a scale of 0-100.
 
 **Job Requirements:**
-{text1[:500]}
+{requirements}
 
 **Expert Profile:**
-{text2[:500]}
+{profile}
 
 Consider: technical skill match, domain expertise, qualification relevance.
 Respond with ONLY a number between 0 and 100. Nothing else."""
 
-        response = _get_ollama_response(prompt)
+        response = _get_ollama_response(prompt, model)
         
         if response:
             # Extract number from response
             numbers = re.findall(r'\d+', response)
             if numbers:
-                score = int(numbers[0])
-                return max(0, min(100, score))
+                score = max(0, min(100, int(numbers[0])))
+                cache.put(cache_key, score)
+                return score
         
         return _fallback_text_similarity(text1, text2)
         
@@ -164,6 +230,184 @@ Respond with ONLY a number between 0 and 100. Nothing else."""
         return _fallback_text_similarity(text1, text2)
 
 
+def cached_llm_score(text1: str, text2: str, context: str = "job matching") -> Optional[float]:
+    """
+    LLM score of a pair held in the in-memory cache tier, or None.
+    
+    Fallback heuristic scores are never cached, so this tells a genuine
+    LLM score (e.g. one just returned by llm_similarity) from a fallback.
+    """
+    cache = get_llm_cache()
+    model = _current_model()
+    requirements, profile = text1[:500], text2[:500]
+    for kind in ('similarity', 'batch_similarity'):
+        score = cache.peek(cache.make_key(kind, model, requirements, profile, context))
+        if score is not None:
+            return float(score)
+    return None
+
+
+# Expert profiles packed into one batched scoring prompt
+LLM_SCORE_BATCH_SIZE = int(os.getenv('LLM_SCORE_BATCH_SIZE', '8'))
+
+
+def _parse_batch_scores(response: Optional[str], labels: List[str]) -> Dict[str, int]:
+    """
+    Validate a batched scoring response.
+    
+    Accepts {"scores": [{"expert_id": ..., "score": ...}]} or a bare list.
+    Entries with unknown ids or scores outside 0-100 are dropped.
+    
+    Returns:
+        Dictionary of label -> score for the valid entries
+    """
+    if not response:
+        return {}
+    try:
+        data = json.loads(response)
+    except ValueError:
+        return {}
+    
+    entries = data.get('scores', []) if isinstance(data, dict) else data
+    if not isinstance(entries, list):
+        return {}
+    
+    scores = {}
+    wanted = set(labels)
+    for entry in entries:
+        if not isinstance(entry, dict):
+            continue
+        label = str(entry.get('expert_id', '')).strip()
+        try:
+            score = float(entry.get('score'))
+        except (TypeError, ValueError):
+            continue
+        if label in wanted and 0 <= score <= 100:
+            scores[label] = int(round(score))
+    return scores
+
+
+def llm_batch_similarity(
+    text1: str,
+    texts: List[str],
+    context: str = "job matching",
+    batch_size: int = None,
+    deadline: Deadline = None,
+    on_score: Callable[[int, float], None] = None
+) -> List[Optional[float]]:
+    """
+    Score several expert profiles against one job description.
+    
+    Profiles are packed batch_size at a time into one JSON-format prompt,
+    so the job requirements are sent once per batch instead of once per
+    expert. Entries missing from (or invalid in) a batch response are
+    scored with llm_similarity one at a time.
+    
+    Args:
+        text1: Job requirements text
+        texts: Expert profile texts
+        context: Context for the comparison
+        batch_size: Profiles per prompt (default: LLM_SCORE_BATCH_SIZE)
+        deadline: Request deadline; profiles not scored by then get None
+        on_score: Called with (index in texts, score) as each score is
+            ready: cached ones first, then each batch as its response
+            arrives (from worker threads; calls in flight at the deadline
+            may report after the function returns)
+        
+    Returns:
+        Scores between 0 and 100 (or None past the deadline), aligned with texts
+    """
+    batch_size = max(1, batch_size or LLM_SCORE_BATCH_SIZE)
+    notify = on_score or (lambda i, score: None)
+    
+    if os.getenv('USE_MOCK_LLM', 'false').lower() == 'true' or not _check_ollama_available():
+        scores = []
+        for i, text in enumerate(texts):
+            scores.append(llm_similarity(text1, text, context))
+            notify(i, float(scores[i]))
+        return scores
+    
+    model = _current_model()
+    requirements = text1[:500]
+    profiles = [text[:500] for text in texts]
+    cache = get_llm_cache()
+    keys = [
+        cache.make_key('batch_similarity', model, requirements, profile, context)
+        for profile in profiles
+    ]
+    
+    scores = []
+    for key, profile in zip(keys, profiles):
+        score = cache.get(key)
+        if score is None:
+            # A score from a single-expert prompt for the same pair is reused as well
+            score = cache.get(cache.make_key('similarity', model, requirements, profile, context))
+        scores.append(score)
+        if score is not None:
+            notify(len(scores) - 1, float(score))
+    pending = [i for i, score in enumerate(scores) if score is None]
+    batches = [pending[start:start + batch_size] for start in range(0, len(pending), batch_size)]
+    
+    def score_batch(batch: List[int]) -> Dict[int, int]:
+        labels = [f"E{n + 1}" for n in range(len(batch))]
+        listing = "\n\n".join(
+            f"[{label}]\n{profiles[i]}" for label, i in zip(labels, batch)
+        )
+        prompt = f"""Rate the relevance match between the job requirements and EACH expert profile below for {context}, on a scale of 0-100.
+
+**Job Requirements:**
+{requirements}
+
+**Expert Profiles:**
+{listing}
+
+Consider: technical skill match, domain expertise, qualification relevance.
+Respond with JSON only, in this exact shape, one entry per expert:
+{{"scores": [{{"expert_id": "E1", "score": 0}}]}}"""
+        
+        response = _get_ollama_response(
+            prompt, model, num_predict=24 * len(batch) + 32, format='json'
+        )
+        parsed = _parse_batch_scores(response, labels)
+        batch_scores = {i: parsed[label] for label, i in zip(labels, batch) if label in parsed}
+        for i, score in batch_scores.items():
+            cache.put(keys[i], score)
+            notify(i, float(score))
+        return batch_scores
+    
+    client = get_ollama_client()
+    for batch_scores in client.map(score_batch, batches, deadline, fallback=lambda batch: {}):
+        for i, score in batch_scores.items():
+            scores[i] = score
+    
+    def retry(i: int) -> int:
+        score = llm_similarity(text1, texts[i], context)
+        notify(i, float(score))
+        return score
+    
+    # Per-expert calls only for entries the batch responses did not cover
+    missing = [i for i, score in enumerate(scores) if score is None]
+    retried = client.map(retry, missing, deadline)
+    for i, score in zip(missing, retried):
+        scores[i] = score
+    return [float(score) if score is not None else None for score in scores]
+
+
+# Words ignored by the keyword-overlap heuristics
+STOP_WORDS = {'the', 'a', 'an', 'in', 'on', 'at', 'to', 'for', 'of', 'and', 
+              'or', 'is', 'are', 'was', 'were', 'with', 'by', 'as', 'this'}
+
+# Technical keywords, weighted higher by the keyword-overlap heuristics
+TECH_KEYWORDS = {
+    'engineering', 'electronics', 'communication', 'signal', 'processing',
+    'radar', 'embedded', 'vlsi', 'fpga', 'microwave', 'antenna', 'rf',
+    'digital', 'analog', 'control', 'systems', 'software', 'hardware',
+    'machine', 'learning', 'ai', 'ml', 'deep', 'neural', 'computer',
+    'science', 'mechanical', 'aerospace', 'propulsion', 'physics',
+    'chemistry', 'materials', 'design', 'research', 'development'
+}
+
+
 def _fallback_text_similarity(text1: str, text2: str) -> float:
     """
     Fallback text similarity when LLM is unavailable.
@@ -177,27 +421,15 @@ def _fallback_text_similarity(text1: str, text2: str) -> float:
     words2 = set(text2.lower().split())
     
     # Remove common stop words
-    stop_words = {'the', 'a', 'an', 'in', 'on', 'at', 'to', 'for', 'of', 'and', 
-                  'or', 'is', 'are', 'was', 'were', 'with', 'by', 'as', 'this'}
-    words1 = words1 - stop_words
-    words2 = words2 - stop_words
+    words1 = words1 - STOP_WORDS
+    words2 = words2 - STOP_WORDS
     
     if not words1 or not words2:
         return 50.0
     
-    # Technical keywords get higher weight
-    tech_keywords = {
-        'engineering', 'electronics', 'communication', 'signal', 'processing',
-        'radar', 'embedded', 'vlsi', 'fpga', 'microwave', 'antenna', 'rf',
-        'digital', 'analog', 'control', 'systems', 'software', 'hardware',
-        'machine', 'learning', 'ai', 'ml', 'deep', 'neural', 'computer',
-        'science', 'mechanical', 'aerospace', 'propulsion', 'physics',
-        'chemistry', 'materials', 'design', 'research', 'development'
-    }
-    
-    # Calculate weighted overlap
+    # Calculate weighted overlap (technical keywords get higher weight)
     common_words = words1 & words2
-    common_tech = common_words & tech_keywords
+    common_tech = common_words & TECH_KEYWORDS
     
     # Base Jaccard similarity
     jaccard = len(common_words) / len(words1 | words2)
@@ -211,44 +443,28 @@ def _fallback_text_similarity(text1: str, text2: str) -> float:
     return min(100.0, round(score, 2))
 
 
-def llm_generate_reason(
-    item_text: str, 
+def _reason_prompt(
+    item_text: str,
     expert_text: str,
     expert_name: str = None,
     component_scores: Dict[str, float] = None,
     final_score: float = None
-) -> str:
+) -> Tuple[str, str, str]:
     """
-    Generate a human-readable reason for why an expert matches an item.
-    Uses local Ollama with score context for specific explanations.
+    Build the reason prompt shared by llm_generate_reason and its streaming variant.
     
-    Args:
-        item_text: Text representation of the item
-        expert_text: Text representation of the expert
-        expert_name: Expert's name for personalized explanation
-        component_scores: Dictionary with w1, w2, w3, w4 scores
-        final_score: Final weighted relevance score (0-100)
-        
     Returns:
-        Explanation string
+        Tuple of (model, cache key, prompt)
     """
-    # MOCK MODE check
-    if os.getenv('USE_MOCK_LLM', 'false').lower() == 'true':
-        return f"DEMO EXPLAIN: {expert_name} matches the requirements based on keyword analysis. (Mock Mode)"
-
-    if not _check_ollama_available():
-        return _generate_fallback_reason(item_text, expert_text)
-    
-    try:
-        # Build score context for the prompt
-        score_context = ""
-        if component_scores and final_score is not None:
-            w1 = component_scores.get('w1_item_expert_cosine', 0)
-            w2 = component_scores.get('w2_item_expert_llm', 0)
-            w3 = component_scores.get('w3_expert_candidates_cosine', 0)
-            w4 = component_scores.get('w4_expert_candidates_llm', 0)
-            
-            score_context = f"""
+    # Build score context for the prompt
+    score_context = ""
+    if component_scores and final_score is not None:
+        w1 = component_scores.get('w1_item_expert_cosine', 0)
+        w2 = component_scores.get('w2_item_expert_llm', 0)
+        w3 = component_scores.get('w3_expert_candidates_cosine', 0)
+        w4 = component_scores.get('w4_expert_candidates_llm', 0)
+        
+        score_context = f"""
 **CALCULATED SCORES (Explain each):**
 - JD-Expert Cosine Match: {w1:.1f}% (How well do embeddings match?)
 - JD-Expert Semantic Match: {w2:.1f}% (How well does meaning align?)
@@ -256,16 +472,21 @@ def llm_generate_reason(
 - Expert-Candidates Semantic: {w4:.1f}% (Domain fit for evaluation?)
 - **Final Weighted Score: {final_score:.1f}%**
 """
-        
-        expert_ref = expert_name if expert_name else "this expert"
-        
-        prompt = f"""Analyze why {expert_ref} received a {final_score:.1f}% relevance score for evaluating candidates for this position.
+    
+    expert_ref = expert_name if expert_name else "this expert"
+    
+    model = _current_model()
+    requirements, profile = item_text[:800], expert_text[:800]
+    cache_key = get_llm_cache().make_key(
+        'reason', model, requirements, profile, expert_ref, score_context, f"{final_score:.1f}"
+    )
+    prompt = f"""Analyze why {expert_ref} received a {final_score:.1f}% relevance score for evaluating candidates for this position.
 
 **JOB REQUIREMENTS:**
-{item_text[:800]}
+{requirements}
 
 **EXPERT PROFILE:**
-{expert_text[:800]}
+{profile}
 {score_context}
 
 Provide your analysis in this EXACT format:
@@ -289,11 +510,52 @@ Explain why this exact percentage:
 - Final verdict on suitability
 
 Be specific and detailed. This is your professional evaluation."""
+    
+    return model, cache_key, prompt
 
-        response = _get_ollama_response(prompt)
+
+def llm_generate_reason(
+    item_text: str, 
+    expert_text: str,
+    expert_name: str = None,
+    component_scores: Dict[str, float] = None,
+    final_score: float = None
+) -> str:
+    """
+    Generate a human-readable reason for why an expert matches an item.
+    Uses local Ollama with score context for specific explanations.
+    
+    Args:
+        item_text: Text representation of the item
+        expert_text: Text representation of the expert
+        expert_name: Expert's name for personalized explanation
+        component_scores: Dictionary with w1, w2, w3, w4 scores
+        final_score: Final weighted relevance score (0-100)
+        
+    Returns:
+        Explanation string
+    """
+    # MOCK MODE check
+    if os.getenv('USE_MOCK_LLM', 'false').lower() == 'true':
+        return f"DEMO EXPLAIN: {expert_name} matches the requirements based on keyword analysis. (Mock Mode)"
+
+    if not _check_ollama_available():
+        return _generate_fallback_reason(item_text, expert_text)
+    
+    try:
+        model, cache_key, prompt = _reason_prompt(
+            item_text, expert_text, expert_name, component_scores, final_score
+        )
+        cache = get_llm_cache()
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        response = _get_ollama_response(prompt, model)
         
         if response and len(response) > 30:
             # Don't truncate - return full response to avoid mid-sentence cuts
+            cache.put(cache_key, response.strip())
             return response.strip()  # Full detailed explanation
         
         return _generate_fallback_reason(item_text, expert_text)
@@ -303,6 +565,76 @@ Be specific and detailed. This is your professional evaluation."""
         return _generate_fallback_reason(item_text, expert_text)
 
 
+class ReasonRestart(str):
+    """
+    Chunk of llm_generate_reason_stream that replaces every chunk yielded
+    before it (the stream broke off and the reason was generated again).
+    """
+
+
+def llm_generate_reason_stream(
+    item_text: str,
+    expert_text: str,
+    expert_name: str = None,
+    component_scores: Dict[str, float] = None,
+    final_score: float = None
+) -> Iterator[str]:
+    """
+    Streaming variant of llm_generate_reason, yielding the text as it is generated.
+    
+    Cached reasons, mock mode and the fallback reason are yielded in one
+    piece. A completed stream is cached like llm_generate_reason, so both
+    return the same text afterwards. If the stream breaks off partway,
+    the partial text is not cached: the reason is generated again without
+    streaming (or the fallback reason is used) and yielded as a
+    ReasonRestart.
+    
+    Yields:
+        Chunks of the explanation; concatenated (from the last
+        ReasonRestart on) they form the full reason
+    """
+    if os.getenv('USE_MOCK_LLM', 'false').lower() == 'true' or not _check_ollama_available():
+        yield llm_generate_reason(item_text, expert_text, expert_name, component_scores, final_score)
+        return
+    
+    parts = []
+    completed = False
+    try:
+        model, cache_key, prompt = _reason_prompt(
+            item_text, expert_text, expert_name, component_scores, final_score
+        )
+        cache = get_llm_cache()
+        cached = cache.get(cache_key)
+        if cached is not None:
+            yield cached
+            return
+        
+        stream = get_ollama_client().generate_stream(
+            prompt, model, options={'temperature': 0.1, 'num_predict': 50}
+        )
+        for text in stream:
+            parts.append(text)
+            yield text
+        completed = True
+    except OllamaUnavailableError:
+        pass
+    except Exception as e:
+        print(f"Error streaming reason: {e}")
+    
+    response = ''.join(parts).strip()
+    if completed and len(response) > 30:
+        cache.put(cache_key, response)
+    elif not parts:
+        yield _generate_fallback_reason(item_text, expert_text)
+    elif completed:
+        # Too short to use, as in llm_generate_reason
+        yield ReasonRestart(_generate_fallback_reason(item_text, expert_text))
+    else:
+        yield ReasonRestart(
+            llm_generate_reason(item_text, expert_text, expert_name, component_scores, final_score)
+        )
+
+
 def _generate_fallback_reason(item_text: str, expert_text: str) -> str:
     """Generate a reason without LLM using keyword extraction."""
     # Extract key terms
@@ -324,41 +656,154 @@ def _generate_fallback_reason(item_text: str, expert_text: str) -> str:
     return "Expert has relevant domain expertise and experience for evaluating candidates in this field."
 
 
+# CrossEncoder for the mid-cost w2 method - lazy loading
+_cross_encoder = None
+_cross_encoder_name = os.getenv('CROSS_ENCODER_MODEL', 'cross-encoder/ms-marco-MiniLM-L-6-v2')
+_cross_encoder_failed = False
+
+# Pairs per CrossEncoder forward pass
+CROSS_ENCODER_BATCH_SIZE = int(os.getenv('CROSS_ENCODER_BATCH_SIZE', '256'))
+
+# Tokens per (item, expert) pair; longer pairs are truncated
+CROSS_ENCODER_MAX_LENGTH = int(os.getenv('CROSS_ENCODER_MAX_LENGTH', '256'))
+
+
+def _get_cross_encoder():
+    """Lazy load the CrossEncoder model on CPU (one failed load is not retried)."""
+    global _cross_encoder, _cross_encoder_failed
+    if _cross_encoder is None and not _cross_encoder_failed:
+        try:
+            from sentence_transformers import CrossEncoder
+            _cross_encoder = CrossEncoder(
+                _cross_encoder_name, max_length=CROSS_ENCODER_MAX_LENGTH, device='cpu'
+            )
+            print(f"✅ Loaded cross-encoder model: {_cross_encoder_name}")
+        except Exception as e:
+            print(f"⚠️ Could not load cross-encoder model: {e}")
+            _cross_encoder_failed = True
+    return _cross_encoder
+
+
+def get_cross_encoder_model_name() -> str:
+    """Name of the CrossEncoder model used for the cross-encoder w2."""
+    return _cross_encoder_name
+
+
+def is_cross_encoder_loaded() -> bool:
+    """Whether the CrossEncoder is available (otherwise w2 stays cosine-based)."""
+    return _get_cross_encoder() is not None
+
+
+def cross_encoder_similarity(
+    text1: str,
+    texts: List[str],
+    batch_size: int = None
+) -> Optional[List[float]]:
+    """
+    Score expert profiles against one job description with the CrossEncoder.
+    
+    Every (requirements, profile) pair is read jointly by the model, so
+    unlike cosine it sees which requirement each skill matches; all pairs
+    go through model.predict in batches of batch_size.
+    
+    Args:
+        text1: Job requirements text
+        texts: Expert profile texts
+        batch_size: Pairs per forward pass (default: CROSS_ENCODER_BATCH_SIZE)
+        
+    Returns:
+        Scores between 0 and 100 aligned with texts, or None if the model
+        is not available
+    """
+    model = _get_cross_encoder()
+    if model is None:
+        return None
+    if not texts:
+        return []
+    
+    try:
+        # Same truncation as the LLM prompts
+        pairs = [(text1[:500], text[:500]) for text in texts]
+        raw = np.asarray(model.predict(
+            pairs,
+            batch_size=batch_size or CROSS_ENCODER_BATCH_SIZE,
+            show_progress_bar=False,
+            convert_to_numpy=True
+        ), dtype=np.float64)
+        if raw.ndim > 1:
+            raw = raw[:, -1]  # Multi-label heads: last label is "relevant"
+        # Single-label models apply a sigmoid, so raw scores are in 0-1
+        return [float(score) for score in np.clip(raw * 100, 0, 100)]
+    except Exception as e:
+        print(f"Error in cross-encoder similarity: {e}")
+        return None
+
+
 def calculate_expert_item_similarity(
     item_embedding: List[float],
     expert_embedding: List[float],
     item_text: str,
     expert_text: str,
-    use_llm: bool = True
-) -> Dict[str, float]:
+    use_llm: bool = True,
+    use_surrogate: bool = False,
+    use_cross_encoder: bool = False
+) -> Dict[str, Any]:
     """
     Calculate comprehensive similarity between an item and expert.
     
+    With use_cross_encoder, llm_score comes from the CrossEncoder when it
+    is available. With use_surrogate, it comes from the distilled w2 model
+    (see score_distiller.py) when one is trained, which takes precedence;
+    with use_llm as well, the LLM is only asked when the surrogate's
+    uncertainty band is too wide.
+    
     Args:
         item_embedding: Item embedding vector
         expert_embedding: Expert embedding vector
         item_text: Item text representation
         expert_text: Expert text representation
         use_llm: Whether to use LLM for semantic similarity
+        use_surrogate: Whether to use the distilled w2 model
+        use_cross_encoder: Whether to use the CrossEncoder
         
     Returns:
-        Dictionary with cosine_score and llm_score
+        Dictionary with cosine_score, llm_score, w2_method ('llm',
+        'distilled', 'cross_encoder' or 'cosine') and, when distilled,
+        w2_uncertainty
+        (width of the surrogate's 10-90% band)
     """
     result = {
         'cosine_score': 0.0,
-        'llm_score': 0.0
+        'llm_score': 0.0,
+        'w2_method': 'cosine'
     }
     
     # Calculate cosine similarity
-    if item_embedding and expert_embedding:
+    if item_embedding is not None and expert_embedding is not None:
         result['cosine_score'] = cosine_similarity(item_embedding, expert_embedding)
     
+    # Fallback LLM score based on cosine
+    result['llm_score'] = result['cosine_score'] * 100
+    
+    if use_surrogate and item_text and expert_text:
+        from .score_distiller import surrogate_w2, SURROGATE_UNCERTAINTY
+        distilled = surrogate_w2(item_text, [expert_text], [result['cosine_score']])
+        if distilled is not None:
+            result['llm_score'] = float(distilled[0][0])
+            result['w2_method'] = 'distilled'
+            result['w2_uncertainty'] = float(distilled[1][0])
+            use_llm = use_llm and result['w2_uncertainty'] > SURROGATE_UNCERTAINTY
+    
+    if use_cross_encoder and result['w2_method'] == 'cosine' and item_text and expert_text:
+        scores = cross_encoder_similarity(item_text, [expert_text])
+        if scores is not None:
+            result['llm_score'] = scores[0]
+            result['w2_method'] = 'cross_encoder'
+    
     # Calculate LLM similarity (only if requested and texts available)
     if use_llm and item_text and expert_text:
         result['llm_score'] = llm_similarity(item_text, expert_text)
-    else:
-        # Fallback LLM score based on cosine
-        result['llm_score'] = result['cosine_score'] * 100
+        result['w2_method'] = 'llm'
     
     return result
 
@@ -390,12 +835,16 @@ def calculate_expert_candidates_similarity(
         'avg_llm_score': 0.0
     }
     
-    if not candidate_embeddings:
+    if candidate_embeddings is None or len(candidate_embeddings) == 0:
         return result
     
-    # Calculate cosine similarities
-    cosine_scores = batch_cosine_similarity(expert_embedding, candidate_embeddings)
-    result['avg_cosine_score'] = np.mean(cosine_scores) if cosine_scores else 0.0
+    # Calculate cosine similarities against the whole candidate matrix at once
+    if expert_embedding is not None and len(expert_embedding) > 0:
+        candidate_matrix, _ = embeddings_to_matrix(candidate_embeddings)
+        expert_matrix, _ = embeddings_to_matrix([expert_embedding], candidate_matrix.shape[1])
+        # Averaged before clamping, as CandidatePool scores w3
+        raw_scores = candidate_matrix @ expert_matrix[0]
+        result['avg_cosine_score'] = float(np.clip(raw_scores.astype(np.float64).mean(), 0.0, 1.0))
     
     # Calculate LLM similarities if requested
     if use_llm and expert_text and candidate_texts:
@@ -412,22 +861,14 @@ def calculate_expert_candidates_similarity(
 
 
 def get_ollama_status() -> Dict[str, Any]:
-    """Get the status of Ollama connection."""
-    available = _check_ollama_available()
-    
-    result = {
-        'available': available,
-        'model': os.getenv('OLLAMA_MODEL', _default_model)
-    }
-    
-    if available:
-        try:
-            import ollama
-            models = ollama.list()
-            result['installed_models'] = [m['name'] for m in models.get('models', [])]
-        except:
-            result['installed_models'] = []
-    
+    """
+    Get the status of Ollama connection.
+
+    Served from the client's cached health probe (at most one list() call
+    per OLLAMA_STATUS_TTL), so polling it is cheap even when Ollama is down.
+    """
+    result = get_ollama_client().status()
+    result['model'] = _current_model()
     return result
 
 
@@ -435,9 +876,21 @@ def get_ollama_status() -> Dict[str, Any]:
 __all__ = [
     'cosine_similarity',
     'batch_cosine_similarity',
+    'embeddings_to_matrix',
+    'cosine_similarity_matrix',
     'llm_similarity',
+    'llm_batch_similarity',
+    'cached_llm_score',
+    'cross_encoder_similarity',
+    'get_cross_encoder_model_name',
+    'is_cross_encoder_loaded',
     'llm_generate_reason',
+    'llm_generate_reason_stream',
+    'ReasonRestart',
     'calculate_expert_item_similarity',
     'calculate_expert_candidates_similarity',
-    'get_ollama_status'
+    'get_ollama_status',
+    'STOP_WORDS',
+    'TECH_KEYWORDS',
+    'CROSS_ENCODER_BATCH_SIZE'
 ]
@@ -8,6 +8,7 @@ from flask import Flask, request, jsonify, session, send_from_directory
 from flask_cors import CORS
 from pymongo import MongoClient
 import os
+import base64
 import random
 import string
 from dotenv import load_dotenv
@@ -21,6 +22,7 @@ from routes.panel_routes import panel_bp, init_panel_routes
 from routes.admin_routes import admin_bp, init_admin_routes
 from routes.pdf_routes import pdf_bp, init_pdf_routes
 from routes.matching_routes import matching_bp, init_matching_routes
+from routes.candidate_routes import candidate_bp, init_candidate_routes
 
 load_dotenv()
 
@@ -72,6 +74,8 @@ def serialize_doc(doc):
                 result[key] = serialize_doc(value)
             elif isinstance(value, list):
                 result[key] = [serialize_doc(item) for item in value]
+            elif isinstance(value, bytes):
+                result[key] = base64.b64encode(value).decode('ascii')
             else:
                 result[key] = value
         return result
@@ -149,7 +153,19 @@ init_admin_routes(
     serialize_doc
 )
 init_pdf_routes(advertisements_collection, items_collection, serialize_doc)
-init_matching_routes(items_collection, experts_collection, candidates_collection, serialize_doc)
+init_matching_routes(
+    items_collection,
+    experts_collection,
+    candidates_collection,
+    serialize_doc,
+    embedding_cache_col=db['embedding_cache'],
+    llm_cache_col=db['llm_cache'],
+    w2_examples_col=db['w2_examples'],
+    scores_col=db['relevance_scores'],
+    adv_col=advertisements_collection,
+    panels_col=panels_collection
+)
+init_candidate_routes(candidates_collection, items_collection, serialize_doc)
 
 # Register Blueprints
 app.register_blueprint(auth_bp)
@@ -160,6 +176,7 @@ app.register_blueprint(panel_bp)
 app.register_blueprint(admin_bp)
 app.register_blueprint(pdf_bp)
 app.register_blueprint(matching_bp)
+app.register_blueprint(candidate_bp)
 
 
 # ==================== MAIN ====================
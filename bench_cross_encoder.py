@@ -0,0 +1,128 @@
+"""
+MIRA DRDO - Cross-Encoder W2 Benchmark
+
+Measures the CPU CrossEncoder w2 method (W2_CROSS_ENCODER) on two axes:
+- Throughput: pairs per second through cross_encoder_similarity at
+  several batch sizes, on synthetic item/expert texts of realistic length
+- Agreement with the LLM: Pearson and Spearman correlation with the LLM
+  w2 scores logged in the w2_examples collection (see score_distiller.py),
+  overall and within each item (the ranking the panel is built from),
+  next to the same figures for the cosine w2 (cosine * 100)
+
+The agreement part needs MONGODB_URI (or --mongodb-uri) and logged
+examples; without them only throughput is measured.
+
+Usage:
+    python bench_cross_encoder.py
+    python bench_cross_encoder.py --pairs 2000 --batch-sizes 64 256 512 --examples 3000
+"""
+
+import argparse
+import os
+import random
+import time
+import numpy as np
+from scipy.stats import pearsonr, spearmanr
+from ai.similarity_calculator import (
+    cross_encoder_similarity,
+    get_cross_encoder_model_name,
+    is_cross_encoder_loaded
+)
+
+
+VOCABULARY = (
+    'radar signal processing vlsi fpga embedded antenna microwave rf digital analog '
+    'control systems software hardware machine learning neural aerospace propulsion '
+    'materials chemistry physics communication design electronics metallurgy sonar '
+    'cryptography networks optics thermal structures guidance navigation'
+).split()
+
+
+def make_texts(rng, pairs):
+    """One job description and `pairs` expert profiles built from VOCABULARY."""
+    item = (f"Post: Scientist 'C'. Discipline: {' '.join(rng.sample(VOCABULARY, 3))}. "
+            f"Requirements: {', '.join(rng.sample(VOCABULARY, 8))}")
+    experts = [
+        f"Expert: Dr {i}. Designation: Scientist 'F'. Skills: {', '.join(rng.sample(VOCABULARY, rng.randint(3, 10)))}. "
+        f"Qualifications: PhD. Experience: {rng.randint(3, 30)} years"
+        for i in range(pairs)
+    ]
+    return item, experts
+
+
+def bench_throughput(pairs, batch_sizes, seed):
+    item, experts = make_texts(random.Random(seed), pairs)
+    cross_encoder_similarity(item, experts[:8])  # Warm-up
+    print(f"{'batch':>7} {'seconds':>8} {'pairs/s':>9}")
+    for batch_size in batch_sizes:
+        start = time.perf_counter()
+        cross_encoder_similarity(item, experts, batch_size=batch_size)
+        elapsed = time.perf_counter() - start
+        print(f"{batch_size:>7} {elapsed:>8.2f} {pairs / elapsed:>9.1f}")
+
+
+def _within_item_spearman(groups, predicted, truth):
+    """Mean Spearman correlation inside items with at least 3 examples."""
+    values = []
+    for rows in groups.values():
+        if len(rows) >= 3 and np.ptp(truth[rows]) > 0 and np.ptp(predicted[rows]) > 0:
+            values.append(spearmanr(predicted[rows], truth[rows])[0])
+    return float(np.mean(values)) if values else float('nan')
+
+
+def bench_agreement(mongodb_uri, database, limit):
+    from pymongo import MongoClient
+    collection = MongoClient(mongodb_uri)[database]['w2_examples']
+    docs = list(collection.find({}, {'itemText': 1, 'expertText': 1, 'cosine': 1, 'score': 1}).limit(limit))
+    if len(docs) < 3:
+        print(f"⚠️ Only {len(docs)} logged LLM scores; score some items with use_llm first")
+        return
+
+    truth = np.array([d['score'] for d in docs], dtype=np.float64)
+    cosine = np.array([d['cosine'] for d in docs], dtype=np.float64) * 100
+    groups = {}
+    for row, doc in enumerate(docs):
+        groups.setdefault(doc['itemText'], []).append(row)
+
+    # Score each item's experts together, as the batch scorer does
+    cross = np.zeros(len(docs))
+    start = time.perf_counter()
+    for item_text, rows in groups.items():
+        cross[rows] = cross_encoder_similarity(item_text, [docs[r]['expertText'] for r in rows])
+    elapsed = time.perf_counter() - start
+
+    print(f"📊 Agreement with {len(docs)} LLM scores over {len(groups)} items "
+          f"({len(docs) / elapsed:.1f} pairs/s)")
+    print(f"{'w2 method':>14} {'pearson':>8} {'spearman':>9} {'per-item':>9} {'MAE':>7}")
+    for name, predicted in (('cross_encoder', cross), ('cosine', cosine)):
+        print(f"{name:>14} {pearsonr(predicted, truth)[0]:>8.3f} "
+              f"{spearmanr(predicted, truth)[0]:>9.3f} "
+              f"{_within_item_spearman(groups, predicted, truth):>9.3f} "
+              f"{np.mean(np.abs(predicted - truth)):>7.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the cross-encoder w2 method')
+    parser.add_argument('--pairs', type=int, default=1024)
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[32, 128, 256, 512])
+    parser.add_argument('--examples', type=int, default=5000, help='Logged LLM scores compared')
+    parser.add_argument('--mongodb-uri', default=os.getenv('MONGODB_URI'))
+    parser.add_argument('--database', default='mira_drdo')
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    if not is_cross_encoder_loaded():
+        print("❌ Cross-encoder model not available (check sentence-transformers and CROSS_ENCODER_MODEL)")
+        return
+
+    print(f"📊 {get_cross_encoder_model_name()} on CPU, {args.pairs} pairs")
+    bench_throughput(args.pairs, args.batch_sizes, args.seed)
+
+    if args.mongodb_uri:
+        bench_agreement(args.mongodb_uri, args.database, args.examples)
+    else:
+        print("ℹ️ Set MONGODB_URI to compare against logged LLM scores")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""
+MIRA DRDO - Ollama Client Concurrency Benchmark
+
+Starts a local stand-in for the Ollama HTTP API (POST /api/generate) with
+a configurable per-request latency and server-side parallelism (like
+OLLAMA_NUM_PARALLEL), then times the same batch of prompts through
+OllamaClient at several concurrency limits.
+
+It also checks that results come back in input order at every limit.
+
+Usage:
+    python bench_ollama_client.py
+    python bench_ollama_client.py --prompts 40 --latency 0.25 --server-parallel 4 --concurrency 1 2 4 8
+"""
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from ai.ollama_client import OllamaClient
+
+
+def make_handler(latency: float, parallel: int):
+    """Request handler imitating /api/generate with a bounded number of busy slots."""
+    slots = threading.BoundedSemaphore(parallel)
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'  # keep-alive, like the real server
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+            if self.path != '/api/generate':
+                self.send_error(404)
+                return
+            with slots:
+                time.sleep(latency)
+            # Echo the prompt so the benchmark can verify result order
+            payload = json.dumps({
+                'model': body.get('model', ''),
+                'created_at': '2024-01-01T00:00:00Z',
+                'response': body.get('prompt', ''),
+                'done': True
+            }).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark bounded-concurrency Ollama calls')
+    parser.add_argument('--prompts', type=int, default=32)
+    parser.add_argument('--latency', type=float, default=0.2, help='Seconds per generate call')
+    parser.add_argument('--server-parallel', type=int, default=4, help='Requests the server runs at once')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), make_handler(args.latency, args.server_parallel))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host = f"http://127.0.0.1:{server.server_address[1]}"
+
+    prompts = [f"prompt {i}" for i in range(args.prompts)]
+    print(f"📊 {args.prompts} prompts, {args.latency:.2f}s each, "
+          f"server parallelism {args.server_parallel}")
+    print(f"{'concurrency':>11} {'seconds':>8} {'calls/s':>8} {'speedup':>8} {'ordered':>8}")
+
+    baseline = None
+    for concurrency in args.concurrency:
+        client = OllamaClient(host=host, max_concurrency=concurrency, timeout=30)
+        start = time.perf_counter()
+        results = client.map(lambda prompt: client.generate(prompt, 'stand-in'), prompts)
+        elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        print(f"{concurrency:>11} {elapsed:>8.2f} {len(prompts) / elapsed:>8.1f} "
+              f"{baseline / elapsed:>7.1f}x {str(results == prompts):>8}")
+
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+"""
+MIRA DRDO - Int8 Quantization Benchmark
+
+Measures what the int8 first pass (EMBEDDING_QUANTIZATION=int8) costs in
+ranking quality against exact float32 cosine, and what it saves in memory.
+
+For each pool size it reports:
+- Matrix memory (float32 vs int8 codes + scales)
+- Quantization time (paid once when the expert index is built, not per
+  request)
+- First-pass scoring time (the int8 scan decodes blocks to float32, so it
+  is not faster than a float32 product; the gain is memory)
+- Max absolute cosine error of the int8 scores
+- Recall@k of the int8 ranking alone
+- Recall@k after rescoring the int8 top-R in float32 (what the scorer does)
+
+Vectors are synthetic: clustered around topic centres, like embeddings of
+experts from a handful of disciplines.
+
+Usage:
+    python bench_quantization.py
+    python bench_quantization.py --sizes 10000 200000 --rescore 300 --k 10
+"""
+
+import argparse
+import time
+import numpy as np
+from ai.embedding_codec import quantize_int8, int8_cosine_scores
+
+
+def make_vectors(rng, n, dim, clusters):
+    """Unit vectors scattered around random cluster centres."""
+    centres = rng.normal(size=(clusters, dim)).astype(np.float32)
+    labels = rng.integers(0, clusters, size=n)
+    vectors = centres[labels] + 0.6 * rng.normal(size=(n, dim)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors, centres
+
+
+def top_k(scores, k):
+    """Indices of the k largest scores."""
+    k = min(k, len(scores))
+    return set(np.argpartition(-scores, k - 1)[:k].tolist())
+
+
+def run(n, dim, queries, k, rescore, clusters, seed):
+    rng = np.random.default_rng(seed)
+    matrix, centres = make_vectors(rng, n, dim, clusters)
+    query_vectors = centres[rng.integers(0, clusters, size=queries)]
+    query_vectors = query_vectors + 0.8 * rng.normal(size=query_vectors.shape).astype(np.float32)
+
+    start = time.perf_counter()
+    codes, scales = quantize_int8(matrix, dim)
+    quantize_time = time.perf_counter() - start
+
+    float_time = 0.0
+    int8_time = 0.0
+    max_error = 0.0
+    recall_first = []
+    recall_rescored = []
+
+    for q in query_vectors:
+        q = q / np.linalg.norm(q)
+
+        start = time.perf_counter()
+        exact = matrix @ q
+        float_time += time.perf_counter() - start
+
+        start = time.perf_counter()
+        approx = int8_cosine_scores(q, codes, scales)
+        int8_time += time.perf_counter() - start
+
+        max_error = max(max_error, float(np.abs(approx - exact).max()))
+        truth = top_k(exact, k)
+        recall_first.append(len(truth & top_k(approx, k)) / k)
+
+        shortlist = np.fromiter(top_k(approx, rescore), dtype=np.int64)
+        rescored = shortlist[np.argsort(-(matrix[shortlist] @ q))[:k]]
+        recall_rescored.append(len(truth & set(rescored.tolist())) / k)
+
+    return {
+        'n': n,
+        'float32_mb': matrix.nbytes / 1e6,
+        'int8_mb': (codes.nbytes + scales.nbytes) / 1e6,
+        'quantize_s': quantize_time,
+        'float32_ms': 1000 * float_time / queries,
+        'int8_ms': 1000 * int8_time / queries,
+        'max_error': max_error,
+        'recall_first': float(np.mean(recall_first)),
+        'recall_rescored': float(np.mean(recall_rescored))
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark int8 first-pass ranking')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000])
+    parser.add_argument('--dim', type=int, default=384)
+    parser.add_argument('--queries', type=int, default=50)
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--rescore', type=int, default=300)
+    parser.add_argument('--clusters', type=int, default=50)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    print(f"📊 int8 vs float32, dim={args.dim}, k={args.k}, rescore top {args.rescore}, "
+          f"{args.queries} queries")
+    print(f"{'experts':>9} {'f32 MB':>8} {'int8 MB':>8} {'quant s':>8} {'f32 ms':>8} {'int8 ms':>8} "
+          f"{'max err':>8} {'recall@k':>9} {'rescored':>9}")
+    for n in args.sizes:
+        r = run(n, args.dim, args.queries, args.k, args.rescore, args.clusters, args.seed)
+        print(f"{r['n']:>9} {r['float32_mb']:>8.1f} {r['int8_mb']:>8.1f} {r['quantize_s']:>8.3f} "
+              f"{r['float32_ms']:>8.2f} {r['int8_ms']:>8.2f} {r['max_error']:>8.4f} "
+              f"{r['recall_first']:>9.3f} {r['recall_rescored']:>9.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -29,6 +29,47 @@ const api = {
         }
     },
 
+    // Read an NDJSON streaming response, calling onEvent for every line
+    async stream(endpoint, options = {}, onEvent) {
+        const response = await fetch(`${API_BASE_URL}${endpoint}`, {
+            headers: {
+                'Content-Type': 'application/json',
+                'Accept': 'application/x-ndjson'
+            },
+            credentials: 'include',
+            ...options
+        });
+
+        if (!response.ok) {
+            const data = await response.json().catch(() => ({}));
+            throw new Error(data.error || 'API request failed');
+        }
+
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        let lastEvent = null;
+
+        while (true) {
+            const { done, value } = await reader.read();
+            buffer += decoder.decode(value || new Uint8Array(), { stream: !done });
+
+            let newline;
+            while ((newline = buffer.indexOf('\n')) >= 0) {
+                const line = buffer.slice(0, newline).trim();
+                buffer = buffer.slice(newline + 1);
+                if (!line) continue;
+                lastEvent = JSON.parse(line);
+                if (lastEvent.event === 'error') {
+                    throw new Error(lastEvent.error || 'Stream failed');
+                }
+                onEvent(lastEvent);
+            }
+            if (done) break;
+        }
+        return lastEvent;
+    },
+
     // Auth endpoints
     auth: {
         async getCaptcha() {
@@ -209,8 +250,59 @@ const api = {
             return api.request('/matching/update-embeddings', { method: 'POST' });
         },
 
+        // Re-rank stored scores under new weights (a weights object or a list of them)
+        async rerank(itemId, weights, options = {}) {
+            return api.request(`/matching/rerank/${itemId}`, {
+                method: 'POST',
+                body: JSON.stringify({ weights, ...options })
+            });
+        },
+
         async getExpertsWithScores(itemId) {
             return api.request(`/matching/experts-with-scores/${itemId}`);
+        },
+
+        // Streaming scoring: onEvent receives each NDJSON event
+        // ({event: 'ranking' | 'expert' | 'done' | 'error', ...}) as it arrives
+        async calculateScoresStream(itemId, options = {}, onEvent) {
+            return api.stream(`/matching/calculate/${itemId}/stream`, {
+                method: 'POST',
+                body: JSON.stringify(options)
+            }, onEvent);
+        },
+
+        // Explanation of one scored expert, generated on first request.
+        // handle is the expert's reason_handle, weights its weights_used.
+        async getReason(itemId, expertId, handle = null, weights = null) {
+            return api.request(`/matching/reason/${itemId}/${expertId}?${api.matching.reasonQuery(handle, weights)}`);
+        },
+
+        reasonQuery(handle, weights) {
+            const params = new URLSearchParams();
+            if (handle) params.set('llm_w2', handle.llm_w2 ? 'true' : 'false');
+            if (handle && handle.distilled_w2) params.set('distilled_w2', 'true');
+            if (handle && handle.cross_encoder_w2) params.set('cross_encoder_w2', 'true');
+            if (weights) params.set('weights', JSON.stringify(weights));
+            return params.toString();
+        },
+
+        // Streaming reason: onToken receives each chunk of the explanation text
+        async streamReason(itemId, expertId, onToken, handle = null, weights = null) {
+            let reason = '';
+            const query = api.matching.reasonQuery(handle, weights);
+            await api.stream(`/matching/reason/${itemId}/${expertId}/stream?${query}`, {}, (event) => {
+                if (event.event === 'token') {
+                    reason += event.text;
+                    onToken(event.text, reason);
+                } else if (event.event === 'reset') {
+                    // The stream broke off; the text sent so far is replaced
+                    reason = event.text;
+                    onToken(event.text, reason);
+                } else if (event.event === 'done') {
+                    reason = event.reason;
+                }
+            });
+            return reason;
         }
     },
 
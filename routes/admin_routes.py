@@ -420,6 +420,14 @@ def seed_data():
         except Exception as e:
             print(f"❌ ERROR Creating Expert/User {username}: {e}")
     
+    # Seeded experts replace the old ones; every worker rebuilds its expert
+    # index on next use
+    try:
+        from ai.expert_index import get_expert_index
+        get_expert_index().mark_stale()
+    except Exception as e:
+        print(f"⚠️ Could not reset expert index: {e}")
+    
     # Create sample candidates for testing AI matching
     candidates_data = [
         # Candidates for Item 1 (Electronics & Communication)
@@ -514,6 +522,15 @@ def seed_data():
                 'status': 'applied',
                 'createdAt': datetime.now()
             })
+        
+        # Every item gets a candidate centroid, so later candidate changes
+        # fold into it (it is rebuilt when /update-embeddings embeds them)
+        try:
+            from ai.candidate_pool import rebuild_item_centroid
+            for item in inserted_items:
+                rebuild_item_centroid(items_collection, candidates_collection, item['id'])
+        except Exception as e:
+            print(f"⚠️ Could not build candidate centroids: {e}")
     
     return jsonify({
         'message': 'Database seeded successfully!',
@@ -0,0 +1,184 @@
+"""Candidate routes Blueprint."""
+from flask import Blueprint, request, jsonify
+from bson import ObjectId
+from datetime import datetime
+import os
+import sys
+
+# Add parent directory to path for ai module imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+candidate_bp = Blueprint('candidates', __name__, url_prefix='/api/candidates')
+
+# Will be injected from main app
+candidates_collection = None
+items_collection = None
+serialize_doc = None
+
+# Fields that feed generate_candidate_text (a change requires a new embedding)
+PROFILE_FIELDS = ['name', 'skills', 'qualifications', 'gateScore', 'gatePaper', 'experience', 'education']
+
+
+def init_candidate_routes(candidates_col, items_col, serializer):
+    """Initialize the blueprint with database collections."""
+    global candidates_collection, items_collection, serialize_doc
+    candidates_collection = candidates_col
+    items_collection = items_col
+    serialize_doc = serializer
+
+
+def _generate_embedding(candidate):
+    """
+    Generate a candidate embedding with its fingerprint stamp.
+    
+    Returns:
+        Tuple of (embedding or None, stamp fields to store with it)
+    """
+    try:
+        from ai import generate_candidate_text, generate_embedding
+        from ai.embedding_refresh import embedding_stamp
+        text = generate_candidate_text(candidate)
+        return generate_embedding(text), embedding_stamp(text)
+    except Exception as e:
+        print(f"⚠️ Could not embed candidate {candidate.get('name')}: {e}")
+        return None, {}
+
+
+def _encode_embedding(embedding):
+    """Encode an embedding in the compact binary storage format."""
+    from ai.embedding_codec import encode_embedding
+    return encode_embedding(embedding)
+
+
+def _apply_pool_change(item_id, add_embedding=None, remove_embedding=None):
+    """Keep the item's candidate centroid and stored scores in step with candidate changes."""
+    try:
+        from ai.candidate_pool import apply_candidate_change
+        from ai.score_store import invalidate_scores
+        apply_candidate_change(
+            items_collection, item_id, add_embedding, remove_embedding, candidates_collection
+        )
+        if item_id is not None and (add_embedding is not None or remove_embedding is not None):
+            invalidate_scores(item_ids=item_id)
+    except Exception as e:
+        print(f"⚠️ Could not update candidate pool for item {item_id}: {e}")
+
+
+@candidate_bp.route('', methods=['GET'])
+def get_candidates():
+    item_id = request.args.get('itemId')
+    
+    query = {}
+    if item_id:
+        try:
+            query['appliedItemId'] = ObjectId(item_id)
+        except:
+            return jsonify({'error': 'Invalid item ID'}), 400
+    
+    candidates = list(candidates_collection.find(query, {'skillEmbedding': 0}))
+    return jsonify(serialize_doc(candidates))
+
+
+@candidate_bp.route('/<candidate_id>', methods=['GET'])
+def get_candidate(candidate_id):
+    try:
+        candidate = candidates_collection.find_one(
+            {'_id': ObjectId(candidate_id)},
+            {'skillEmbedding': 0}
+        )
+    except:
+        return jsonify({'error': 'Invalid candidate ID'}), 400
+    
+    if not candidate:
+        return jsonify({'error': 'Candidate not found'}), 404
+    return jsonify(serialize_doc(candidate))
+
+
+@candidate_bp.route('', methods=['POST'])
+def create_candidate():
+    data = request.json
+    
+    try:
+        candidate = {
+            'name': data['name'],
+            'appliedItemId': ObjectId(data['appliedItemId']),
+            'status': data.get('status', 'applied'),
+            'createdAt': datetime.now()
+        }
+    except Exception as e:
+        return jsonify({'error': str(e)}), 400
+    
+    for field in PROFILE_FIELDS:
+        if field in data and field != 'name':
+            candidate[field] = data[field]
+    
+    embedding, stamp = _generate_embedding(candidate)
+    if embedding:
+        candidate['skillEmbedding'] = _encode_embedding(embedding)
+        candidate.update(stamp)
+    
+    result = candidates_collection.insert_one(candidate)
+    _apply_pool_change(candidate['appliedItemId'], add_embedding=embedding)
+    
+    return jsonify({
+        '_id': str(result.inserted_id),
+        'name': candidate['name'],
+        'appliedItemId': str(candidate['appliedItemId']),
+        'status': candidate['status']
+    }), 201
+
+
+@candidate_bp.route('/<candidate_id>', methods=['PUT'])
+def update_candidate(candidate_id):
+    data = request.json
+    try:
+        existing = candidates_collection.find_one({'_id': ObjectId(candidate_id)})
+        if not existing:
+            return jsonify({'error': 'Candidate not found'}), 404
+        
+        update_data = {}
+        for field in PROFILE_FIELDS + ['status']:
+            if field in data:
+                update_data[field] = data[field]
+        if 'appliedItemId' in data:
+            update_data['appliedItemId'] = ObjectId(data['appliedItemId'])
+        
+        old_item_id = existing.get('appliedItemId')
+        new_item_id = update_data.get('appliedItemId', old_item_id)
+        old_embedding = existing.get('skillEmbedding')
+        new_embedding = old_embedding
+        
+        if any(field in update_data for field in PROFILE_FIELDS):
+            generated, stamp = _generate_embedding({**existing, **update_data})
+            if generated:
+                new_embedding = generated
+                update_data['skillEmbedding'] = _encode_embedding(new_embedding)
+                update_data.update(stamp)
+        
+        candidates_collection.update_one(
+            {'_id': existing['_id']},
+            {'$set': update_data}
+        )
+        
+        if old_item_id != new_item_id:
+            _apply_pool_change(old_item_id, remove_embedding=old_embedding)
+            _apply_pool_change(new_item_id, add_embedding=new_embedding)
+        elif new_embedding is not old_embedding:
+            _apply_pool_change(new_item_id, add_embedding=new_embedding, remove_embedding=old_embedding)
+        
+        return jsonify({'message': 'Candidate updated successfully'})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 400
+
+
+@candidate_bp.route('/<candidate_id>', methods=['DELETE'])
+def delete_candidate(candidate_id):
+    try:
+        existing = candidates_collection.find_one_and_delete({'_id': ObjectId(candidate_id)})
+        if not existing:
+            return jsonify({'error': 'Candidate not found'}), 404
+        
+        _apply_pool_change(existing.get('appliedItemId'), remove_embedding=existing.get('skillEmbedding'))
+        return jsonify({'message': 'Candidate deleted successfully'})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 400
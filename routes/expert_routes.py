@@ -11,6 +11,12 @@ panels_collection = None
 items_collection = None
 serialize_doc = None
 
+# Embedding vectors are internal to matching and never sent to the client
+EMBEDDING_PROJECTION = {'skillEmbedding': 0}
+
+# Fields that feed generate_expert_text (a change requires a new embedding)
+PROFILE_FIELDS = ['name', 'role', 'category', 'affiliation', 'reason']
+
 def init_expert_routes(experts_col, serializer, panels_col=None, items_col=None):
     """Initialize the blueprint with database collection."""
     global experts_collection, serialize_doc, panels_collection, items_collection
@@ -20,6 +26,47 @@ def init_expert_routes(experts_col, serializer, panels_col=None, items_col=None)
     items_collection = items_col
 
 
+def _embed_expert(expert):
+    """
+    Generate an expert embedding in storage format with its fingerprint stamp.
+    
+    Returns:
+        Fields to $set on the expert (empty if embedding failed)
+    """
+    try:
+        from ai import generate_expert_text, generate_embedding
+        from ai.embedding_codec import encode_embedding
+        from ai.embedding_refresh import embedding_stamp
+        text = generate_expert_text(expert)
+        embedding = generate_embedding(text)
+        if embedding:
+            return {'skillEmbedding': encode_embedding(embedding), **embedding_stamp(text)}
+    except Exception as e:
+        print(f"⚠️ Could not embed expert {expert.get('name')}: {e}")
+    return {}
+
+
+def _sync_expert_index(expert_id):
+    """Re-read one expert into the in-process expert index (or drop it)."""
+    try:
+        from ai.expert_index import get_expert_index
+        get_expert_index().sync([expert_id])
+    except Exception as e:
+        print(f"⚠️ Could not update expert index: {e}")
+
+
+def _invalidate_scores(expert_id, deleted=False):
+    """Mark the expert's stored scores for recomputation (or drop them)."""
+    try:
+        from ai.score_store import invalidate_scores, delete_scores
+        if deleted:
+            delete_scores(expert_ids=expert_id)
+        else:
+            invalidate_scores(expert_ids=expert_id)
+    except Exception as e:
+        print(f"⚠️ Could not invalidate stored scores: {e}")
+
+
 @expert_bp.route('', methods=['GET'])
 def get_experts():
     category = request.args.get('category')
@@ -28,14 +75,14 @@ def get_experts():
     if category:
         query['category'] = category
     
-    experts = list(experts_collection.find(query).sort('relevanceScore', -1))
+    experts = list(experts_collection.find(query, EMBEDDING_PROJECTION).sort('relevanceScore', -1))
     return jsonify(serialize_doc(experts))
 
 
 @expert_bp.route('/<expert_id>', methods=['GET'])
 def get_expert(expert_id):
     try:
-        expert = experts_collection.find_one({'_id': ObjectId(expert_id)})
+        expert = experts_collection.find_one({'_id': ObjectId(expert_id)}, EMBEDDING_PROJECTION)
     except:
         return jsonify({'error': 'Invalid expert ID'}), 400
     
@@ -58,9 +105,12 @@ def create_expert():
         'email': data.get('email', ''),
         'createdAt': datetime.now()
     }
+    expert.update(_embed_expert(expert))
     
     result = experts_collection.insert_one(expert)
+    _sync_expert_index(result.inserted_id)
     expert['_id'] = str(result.inserted_id)
+    expert.pop('skillEmbedding', None)
     
     return jsonify(expert), 201
 
@@ -74,17 +124,34 @@ def update_expert(expert_id):
             if field in data:
                 update_data[field] = data[field]
         
+        if any(field in update_data for field in PROFILE_FIELDS):
+            existing = experts_collection.find_one({'_id': ObjectId(expert_id)}, EMBEDDING_PROJECTION)
+            if not existing:
+                return jsonify({'error': 'Expert not found'}), 404
+            update_data.update(_embed_expert({**existing, **update_data}))
+        
         result = experts_collection.update_one(
             {'_id': ObjectId(expert_id)},
             {'$set': update_data}
         )
         if result.matched_count == 0:
             return jsonify({'error': 'Expert not found'}), 404
+        _sync_expert_index(ObjectId(expert_id))
+        if any(field in update_data for field in PROFILE_FIELDS):
+            _invalidate_scores(expert_id)
         return jsonify({'message': 'Expert updated successfully'})
     except Exception as e:
         return jsonify({'error': str(e)}), 400
 
 
+@expert_bp.route('/<expert_id>', methods=['DELETE'])
+def delete_expert(expert_id):
+    try:
+        result = experts_collection.delete_one({'_id': ObjectId(expert_id)})
+        if result.deleted_count == 0:
+            return jsonify({'error': 'Expert not found'}), 404
+        _sync_expert_index(ObjectId(expert_id))
+        _invalidate_scores(expert_id, deleted=True)
         return jsonify({'message': 'Expert deleted successfully'})
     except Exception as e:
         return jsonify({'error': str(e)}), 400
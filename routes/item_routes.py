@@ -19,6 +19,12 @@ panels_collection = None
 experts_collection = None
 serialize_doc = None
 
+# Embedding vectors are internal to matching and never sent to the client
+EMBEDDING_PROJECTION = {'embedding': 0, 'candidateCentroid': 0}
+
+# Fields that feed generate_item_text (a change makes stored scores stale)
+PROFILE_FIELDS = ['itemNo', 'title', 'description']
+
 def init_item_routes(items_col, serializer, adv_col=None, panels_col=None, experts_col=None):
     """Initialize the blueprint with database collection."""
     global items_collection, serialize_doc, advertisements_collection, panels_collection, experts_collection
@@ -29,6 +35,18 @@ def init_item_routes(items_col, serializer, adv_col=None, panels_col=None, exper
     experts_collection = experts_col
 
 
+def _invalidate_scores(item_id, deleted=False):
+    """Mark the item's stored scores for recomputation (or drop them)."""
+    try:
+        from ai.score_store import invalidate_scores, delete_scores
+        if deleted:
+            delete_scores(item_ids=item_id)
+        else:
+            invalidate_scores(item_ids=item_id)
+    except Exception as e:
+        print(f"⚠️ Could not invalidate stored scores: {e}")
+
+
 @item_bp.route('', methods=['GET'])
 def get_all_items():
     """Get all items, optionally filtered by status."""
@@ -38,7 +56,7 @@ def get_all_items():
     if status:
         query['boardStatus'] = status
     
-    items = list(items_collection.find(query).sort('itemNo', 1))
+    items = list(items_collection.find(query, EMBEDDING_PROJECTION).sort('itemNo', 1))
     
     # Enrich items with advertisement info
     for item in items:
@@ -56,9 +74,9 @@ def get_all_items():
 @item_bp.route('/<item_id>', methods=['GET'])
 def get_item(item_id):
     try:
-        item = items_collection.find_one({'_id': ObjectId(item_id)})
+        item = items_collection.find_one({'_id': ObjectId(item_id)}, EMBEDDING_PROJECTION)
     except:
-        item = items_collection.find_one({'itemNo': int(item_id)})
+        item = items_collection.find_one({'itemNo': int(item_id)}, EMBEDDING_PROJECTION)
     
     if not item:
         return jsonify({'error': 'Item not found'}), 404
@@ -108,6 +126,8 @@ def update_item(item_id):
         )
         if result.matched_count == 0:
             return jsonify({'error': 'Item not found'}), 404
+        if any(field in update_data for field in PROFILE_FIELDS):
+            _invalidate_scores(item_id)
         return jsonify({'message': 'Item updated successfully'})
     except Exception as e:
         return jsonify({'error': str(e)}), 400
@@ -346,6 +366,7 @@ def delete_item(item_id):
         result = items_collection.delete_one({'_id': ObjectId(item_id)})
         if result.deleted_count == 0:
             return jsonify({'error': 'Item not found'}), 404
+        _invalidate_scores(item_id, deleted=True)
         return jsonify({'message': 'Item deleted successfully'})
     except Exception as e:
         return jsonify({'error': str(e)}), 400
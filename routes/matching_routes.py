@@ -3,14 +3,27 @@ MIRA DRDO - Matching Routes Blueprint
 
 API endpoints for AI-powered expert matching:
 - POST /api/matching/calculate/{itemId} - Calculate scores for all experts
+- POST /api/matching/calculate/{itemId}/stream - Same, streamed as NDJSON/SSE
 - POST /api/matching/generate-panel/{itemId} - Auto-generate optimal panel
 - GET /api/matching/score/{itemId}/{expertId} - Get score breakdown
+- GET /api/matching/reason/{itemId}/{expertId} - Generate (or fetch) one expert's explanation
+- GET /api/matching/reason/{itemId}/{expertId}/stream - Stream the LLM reason text
 - POST /api/matching/update-embeddings - Update embeddings for all entities
+- GET /api/matching/embedding-cache - Embedding cache hit/miss counters
+- POST /api/matching/migrate-embeddings - Convert list embeddings to binary storage
+- GET /api/matching/expert-index - Expert vector index statistics
+- GET /api/matching/llm-cache - LLM score/reason cache hit/miss counters
+- POST /api/matching/expert-index/rebuild - Rebuild the expert vector index
+- GET /api/matching/w2-surrogate - Distilled w2 model status and evaluation
+- POST /api/matching/w2-surrogate/train - Train the distilled w2 model on logged LLM scores
 """
 
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, Response, stream_with_context
 from bson import ObjectId
 from datetime import datetime
+import json
+import queue
+import threading
 import traceback
 
 matching_bp = Blueprint('matching', __name__, url_prefix='/api/matching')
@@ -19,19 +32,50 @@ matching_bp = Blueprint('matching', __name__, url_prefix='/api/matching')
 items_collection = None
 experts_collection = None
 candidates_collection = None
+advertisements_collection = None
+panels_collection = None
 serialize_doc = None
 
 # AI module imports (lazy loaded)
 _ai_modules_loaded = False
 
 
-def init_matching_routes(items_col, experts_col, candidates_col, serializer):
+def init_matching_routes(items_col, experts_col, candidates_col, serializer,
+                         embedding_cache_col=None, llm_cache_col=None, w2_examples_col=None,
+                         scores_col=None, adv_col=None, panels_col=None):
     """Initialize the blueprint with database collections."""
     global items_collection, experts_collection, candidates_collection, serialize_doc
+    global advertisements_collection, panels_collection
     items_collection = items_col
     experts_collection = experts_col
     candidates_collection = candidates_col
     serialize_doc = serializer
+    advertisements_collection = adv_col
+    panels_collection = panels_col
+    
+    # Persistent tier of the embedding cache (shared by every embedding call)
+    if embedding_cache_col is not None:
+        from ai.embedding_cache import init_embedding_cache
+        init_embedding_cache(embedding_cache_col)
+    
+    # Persistent tier of the LLM score/reason cache
+    if llm_cache_col is not None:
+        from ai.llm_cache import init_llm_cache
+        init_llm_cache(llm_cache_col)
+    
+    # LLM w2 scores logged as training examples for the distilled w2 model
+    if w2_examples_col is not None:
+        from ai.score_distiller import init_score_distiller
+        init_score_distiller(w2_examples_col)
+    
+    # Materialized per-(item, expert) scores
+    if scores_col is not None:
+        from ai.score_store import init_score_store
+        init_score_store(scores_col)
+    
+    # In-process expert vector index (built on first retrieval)
+    from ai.expert_index import init_expert_index
+    init_expert_index(experts_col)
 
 
 def _load_ai_modules():
@@ -56,6 +100,217 @@ def _load_ai_modules():
     return True
 
 
+def _load_experts(item, retrieve_top=0):
+    """
+    Load the experts to score for an item.
+    
+    With retrieve_top > 0 only the top experts per category from the expert
+    index are read; otherwise (or if the index returns nothing) all experts.
+    
+    Returns:
+        Tuple of (expert documents, retrieval summary)
+    """
+    retrieval = {'retrieve_top': retrieve_top, 'experts_retrieved': None}
+    if retrieve_top > 0:
+        from ai.embedding_codec import decode_embedding
+        from ai.expert_index import retrieve_expert_ids
+        from ai import generate_item_embedding
+        
+        item_embedding = decode_embedding(item.get('embedding'))
+        if item_embedding is None:
+            item_embedding = generate_item_embedding(item)
+        expert_ids = retrieve_expert_ids(item_embedding, retrieve_top)
+        if expert_ids:
+            experts = list(experts_collection.find({
+                '_id': {'$in': [ObjectId(expert_id) for expert_id in expert_ids]}
+            }))
+            retrieval['experts_retrieved'] = len(experts)
+            return experts, retrieval
+    
+    return list(experts_collection.find()), retrieval
+
+
+def _request_deadline(value):
+    """
+    Start the deadline for a request's LLM work.
+    
+    Args:
+        value: 'latency_budget' option in seconds (None = server default
+            MATCHING_LATENCY_BUDGET, 0 = no deadline)
+    """
+    from ai.ollama_client import Deadline
+    return Deadline(float(value) if value is not None else None)
+
+
+def _wants_sse():
+    """Whether the client asked for Server-Sent Events instead of NDJSON."""
+    return (request.args.get('format') == 'sse' or
+            'text/event-stream' in request.headers.get('Accept', ''))
+
+
+def _stream_response(events, sse):
+    """
+    Wrap a generator of (event, payload) pairs in a streaming response.
+    
+    NDJSON: one {"event": ..., **payload} object per line.
+    SSE: "event: <event>" and "data: <payload JSON>" blocks.
+    """
+    def encode():
+        for event, payload in events:
+            if sse:
+                yield f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+            else:
+                yield json.dumps({'event': event, **payload}) + "\n"
+    
+    return Response(
+        stream_with_context(encode()),
+        mimetype='text/event-stream' if sse else 'application/x-ndjson',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
+def _store_scores(scored_experts, item, experts):
+    """
+    Save the item's scores into the score store, one row per expert.
+    
+    Explanations are not stored here: they are generated on demand
+    (see /reason).
+    """
+    from ai.score_store import save_scores
+    return save_scores(item, experts, scored_experts)
+
+
+def _refresh_stored_scores(item):
+    """
+    Recompute the stored scores of an item that have gone stale.
+    
+    Rows go stale when their expert's profile changes, or when the item or
+    its candidate pool changes. Each is rescored with the weights and w2
+    method it was stored with; fresh rows are not touched. This runs
+    inside read requests, so no LLM calls are made: LLM-scored rows get a
+    cheap w2 and stay flagged llmPending until /calculate with use_llm.
+    
+    Returns:
+        Number of rows recomputed
+    """
+    from ai import batch_calculate_relevance_scores
+    from ai.score_store import (
+        invalidate_outdated_scores, get_stale_scores, rescore_options, needs_llm, save_scores, delete_scores
+    )
+    
+    invalidate_outdated_scores(item)
+    stale = get_stale_scores(item['_id'])
+    if not stale:
+        return 0
+    
+    experts = {
+        str(expert['_id']): expert
+        for expert in experts_collection.find({'_id': {'$in': [ObjectId(row['expertId']) for row in stale]}})
+    }
+    removed = [row['expertId'] for row in stale if row['expertId'] not in experts]
+    if removed:
+        delete_scores(expert_ids=removed)
+    
+    # One scoring call per (w2 method, LLM pending, weights) combination
+    groups = {}
+    for row in stale:
+        if row['expertId'] in experts:
+            key = (row.get('w2Method'), needs_llm(row), tuple(sorted((row.get('weights') or {}).items())))
+            groups.setdefault(key, []).append(experts[row['expertId']])
+    
+    candidates, candidate_pool = _load_candidate_pool(item)
+    refreshed = 0
+    for (w2_method, llm_pending, weights), group in groups.items():
+        scored = batch_calculate_relevance_scores(
+            item,
+            group,
+            candidates,
+            weights=dict(weights) or None,
+            candidate_pool=candidate_pool,
+            use_llm=False,
+            **rescore_options(w2_method)
+        )
+        refreshed += save_scores(item, group, scored, llm_pending=llm_pending)
+    return refreshed
+
+
+def _load_reason_request(item_id, expert_id):
+    """
+    Resolve the pair and options of a /reason request.
+    
+    Returns:
+        Tuple of (error response or None, explain_relevance keyword arguments)
+    """
+    try:
+        item = items_collection.find_one({'_id': ObjectId(item_id)})
+    except:
+        item = items_collection.find_one({'itemNo': int(item_id)})
+    
+    if not item:
+        return (jsonify({'error': 'Item not found'}), 404), None
+    
+    try:
+        expert = experts_collection.find_one({'_id': ObjectId(expert_id)})
+    except:
+        return (jsonify({'error': 'Invalid expert ID'}), 400), None
+    
+    if not expert:
+        return (jsonify({'error': 'Expert not found'}), 404), None
+    
+    candidates, candidate_pool = _load_candidate_pool(item)
+    weights = request.args.get('weights')
+    return None, {
+        'item': item,
+        'expert': expert,
+        'candidates': candidates,
+        'candidate_pool': candidate_pool,
+        'weights': json.loads(weights) if weights else None,
+        'llm_w2': request.args.get('llm_w2', 'true').lower() == 'true',
+        'distilled_w2': request.args.get('distilled_w2', 'false').lower() == 'true',
+        'cross_encoder_w2': request.args.get('cross_encoder_w2', 'false').lower() == 'true',
+        'deadline': _request_deadline(request.args.get('latency_budget'))
+    }
+
+
+def _start_reason_prefetch(item, experts, panel_result, weights, candidate_pool):
+    """Queue background explanations for the recommended panel."""
+    from ai.relevance_scorer import prefetch_reasons
+    return prefetch_reasons(
+        item,
+        experts,
+        panel_result.get('recommended_panel', []),
+        weights=weights,
+        candidate_pool=candidate_pool
+    )
+
+
+def _load_item_candidates(item):
+    """Candidate documents that applied to an item."""
+    if candidates_collection is None:
+        return []
+    return list(candidates_collection.find({'appliedItemId': item.get('_id')}))
+
+
+def _load_candidate_pool(item, top_candidates=0):
+    """
+    Load the candidate side of scoring for an item.
+    
+    When per-candidate rows are not needed, the item's stored centroid is
+    used and no candidate documents are read.
+    
+    Returns:
+        Tuple of (candidate documents, CandidatePool or None)
+    """
+    from ai.candidate_pool import get_item_candidate_pool
+    
+    if not top_candidates:
+        pool = get_item_candidate_pool(item)
+        if pool is not None:
+            return [], pool
+    
+    return _load_item_candidates(item), None
+
+
 @matching_bp.route('/calculate/<item_id>', methods=['POST'])
 def calculate_scores(item_id):
     """
@@ -64,6 +319,15 @@ def calculate_scores(item_id):
     Request body (optional):
     {
         "use_llm": false,  // Use LLM for semantic scoring (slower)
+        "top_candidates": 0,  // Best matching candidates to list per expert
+        "quantization": "none",  // "int8": shortlist experts on the index's int8 codes first (only with EMBEDDING_QUANTIZATION=int8)
+        "retrieve_top": 0,  // Score only the top N experts per category from the index
+        "llm_rerank_top": 5,  // With use_llm: experts per category given LLM calls (0 = all)
+        "llm_batch_size": 8,  // With use_llm: expert profiles per LLM scoring prompt
+        "latency_budget": 60,  // With use_llm: seconds before remaining experts fall back to cosine (0 = none)
+        "w2_surrogate": false,  // w2 from the distilled model; with use_llm only uncertain experts get LLM calls
+        "w2_cross_encoder": false,  // w2 from the CPU cross-encoder where not LLM-scored
+        "prune_top_k": 3,  // With use_llm: exact top N per category by branch and bound (replaces llm_rerank_top)
         "weights": {       // Custom weights
             "w1_item_expert_cosine": 0.35,
             "w2_item_expert_llm": 0.35,
@@ -73,11 +337,15 @@ def calculate_scores(item_id):
     }
     """
     try:
+        data = request.json or {}
+        deadline = _request_deadline(data.get('latency_budget'))
+        
         # Load AI modules
         if not _load_ai_modules():
             return jsonify({'error': 'AI modules not available'}), 500
         
         from ai import batch_calculate_relevance_scores
+        from ai.relevance_scorer import llm_usage_summary
         
         # Get item
         try:
@@ -88,22 +356,32 @@ def calculate_scores(item_id):
         if not item:
             return jsonify({'error': 'Item not found'}), 404
         
-        # Get all experts
-        experts = list(experts_collection.find())
+        # Parse request options
+        use_llm = data.get('use_llm', False)
+        weights = data.get('weights', None)
+        top_candidates = int(data.get('top_candidates', 0))
+        quantization = data.get('quantization')
+        llm_rerank_top = data.get('llm_rerank_top')
+        llm_rerank_top = int(llm_rerank_top) if llm_rerank_top is not None else None
+        llm_batch_size = data.get('llm_batch_size')
+        llm_batch_size = int(llm_batch_size) if llm_batch_size is not None else None
+        retrieve_top = int(data.get('retrieve_top', 0))
+        use_surrogate = data.get('w2_surrogate')
+        use_cross_encoder = data.get('w2_cross_encoder')
+        prune_top_k = data.get('prune_top_k')
+        if prune_top_k is not None:
+            prune_top_k = (
+                {str(k).lower(): int(v) for k, v in prune_top_k.items()}
+                if isinstance(prune_top_k, dict) else int(prune_top_k)
+            )
+        
+        # Get experts (all, or the top per category from the index)
+        experts, retrieval = _load_experts(item, retrieve_top)
         if not experts:
             return jsonify({'error': 'No experts found'}), 404
         
         # Get candidates for this item (if any)
-        candidates = []
-        if candidates_collection is not None:
-            candidates = list(candidates_collection.find({
-                'appliedItemId': item.get('_id')
-            }))
-        
-        # Parse request options
-        data = request.json or {}
-        use_llm = data.get('use_llm', False)
-        weights = data.get('weights', None)
+        candidates, candidate_pool = _load_candidate_pool(item, top_candidates)
         
         # Calculate scores
         scored_experts = batch_calculate_relevance_scores(
@@ -111,29 +389,27 @@ def calculate_scores(item_id):
             experts,
             candidates,
             weights=weights,
-            use_llm=use_llm
+            use_llm=use_llm,
+            candidate_pool=candidate_pool,
+            top_candidates=top_candidates,
+            quantization=quantization,
+            llm_rerank_top=llm_rerank_top,
+            llm_batch_size=llm_batch_size,
+            deadline=deadline,
+            use_surrogate=use_surrogate,
+            use_cross_encoder=use_cross_encoder,
+            prune_top_k=prune_top_k
         )
         
-        # Update experts in database with new scores
-        for scored in scored_experts:
-            try:
-                experts_collection.update_one(
-                    {'_id': ObjectId(scored['expert_id'])},
-                    {'$set': {
-                        'relevanceScore': round(scored['final_score']),
-                        'scoreDetails': scored.get('component_scores', {}),
-                        'reason': scored.get('reason', ''),
-                        'scoredAt': datetime.now(),
-                        'scoredForItem': item_id
-                    }}
-                )
-            except Exception as e:
-                print(f"Error updating expert {scored.get('expert_name')}: {e}")
+        # Store the item's scores
+        _store_scores(scored_experts, item, experts)
         
         return jsonify({
             'item_id': item_id,
             'experts_scored': len(scored_experts),
             'scored_experts': scored_experts,
+            'retrieval': retrieval,
+            'llm_usage': llm_usage_summary(scored_experts, use_llm, llm_batch_size),
             'calculated_at': datetime.now().isoformat()
         })
         
@@ -142,6 +418,361 @@ def calculate_scores(item_id):
         return jsonify({'error': str(e)}), 500
 
 
+@matching_bp.route('/calculate/<item_id>/stream', methods=['POST'])
+def calculate_scores_stream(item_id):
+    """
+    Streaming variant of /calculate for LLM-backed scoring.
+    
+    Responds with NDJSON (one JSON object per line), or Server-Sent Events
+    with ?format=sse or an "Accept: text/event-stream" header. Events:
+    - ranking: every expert scored without LLM calls (w2_method 'cosine',
+      'distilled' with w2_surrogate or 'cross_encoder' with w2_cross_encoder),
+      sent as soon as it is ready
+    - expert: one LLM-scored expert (w2) as soon as it is ready
+    - done: final scored_experts and llm_usage; scores are stored like /calculate
+    - error: scoring failed
+    
+    Request body: same options as /calculate, but use_llm defaults to true.
+    With "panel_size" (3, 5 or 7) the done event also carries the
+    /generate-panel result built from the final scores as "panel" (under
+    the composition "rules", if given), and "prefetch_reasons": true
+    explains its members in the background.
+    """
+    try:
+        data = request.json or {}
+        deadline = _request_deadline(data.get('latency_budget'))
+        sse = _wants_sse()
+        
+        if not _load_ai_modules():
+            return jsonify({'error': 'AI modules not available'}), 500
+        
+        from ai import ScoringBatch, generate_optimal_panel
+        from ai.relevance_scorer import llm_usage_summary
+        
+        # Get item
+        try:
+            item = items_collection.find_one({'_id': ObjectId(item_id)})
+        except:
+            item = items_collection.find_one({'itemNo': int(item_id)})
+        
+        if not item:
+            return jsonify({'error': 'Item not found'}), 404
+        
+        # Parse request options
+        use_llm = data.get('use_llm', True)
+        panel_size = data.get('panel_size')
+        prefetch = data.get('prefetch_reasons', False)
+        from ai.panel_rules import parse_rules
+        try:
+            rules = parse_rules(data.get('rules'))
+        except ValueError as e:
+            return jsonify({'error': f'Invalid rules: {e}'}), 400
+        llm_rerank_top = data.get('llm_rerank_top')
+        llm_batch_size = data.get('llm_batch_size')
+        options = {
+            'weights': data.get('weights', None),
+            'top_candidates': int(data.get('top_candidates', 0)),
+            'quantization': data.get('quantization'),
+            'use_surrogate': data.get('w2_surrogate'),
+            'use_cross_encoder': data.get('w2_cross_encoder')
+        }
+        llm_options = {
+            'llm_rerank_top': int(llm_rerank_top) if llm_rerank_top is not None else None,
+            'llm_batch_size': int(llm_batch_size) if llm_batch_size is not None else None
+        }
+        retrieve_top = int(data.get('retrieve_top', 0))
+        
+        experts, retrieval = _load_experts(item, retrieve_top)
+        if not experts:
+            return jsonify({'error': 'No experts found'}), 404
+        
+        candidates, candidate_pool = _load_candidate_pool(item, options['top_candidates'])
+        options['candidate_pool'] = candidate_pool
+    
+    except Exception as e:
+        traceback.print_exc()
+        return jsonify({'error': str(e)}), 500
+    
+    def events():
+        try:
+            # Ranking without LLM calls first, ready in well under a second;
+            # the LLM pass reuses its embeddings and matrices
+            batch = ScoringBatch(item, experts, candidates, **options)
+            ranking = batch.score()
+            yield 'ranking', serialize_doc({
+                'item_id': item_id,
+                'experts_scored': len(ranking),
+                'scored_experts': ranking,
+                'retrieval': retrieval
+            })
+            
+            scored_experts = ranking
+            if use_llm:
+                # LLM scoring runs on a worker thread and reports each expert when done
+                updates = queue.Queue()
+                outcome = {}
+                
+                def score():
+                    try:
+                        outcome['scored'] = batch.score(
+                            use_llm=True, deadline=deadline, on_result=updates.put, **llm_options
+                        )
+                    except Exception as e:
+                        traceback.print_exc()
+                        outcome['error'] = str(e)
+                    finally:
+                        updates.put(None)
+                
+                threading.Thread(target=score, name='matching-stream', daemon=True).start()
+                while True:
+                    result = updates.get()
+                    if result is None:
+                        break
+                    yield 'expert', serialize_doc(result)
+                
+                if 'error' in outcome:
+                    yield 'error', {'error': outcome['error']}
+                    return
+                scored_experts = outcome['scored']
+            
+            _store_scores(scored_experts, item, experts)
+            done = {
+                'item_id': item_id,
+                'experts_scored': len(scored_experts),
+                'scored_experts': scored_experts,
+                'llm_usage': llm_usage_summary(scored_experts, use_llm, llm_options['llm_batch_size']),
+                'calculated_at': datetime.now().isoformat()
+            }
+            if panel_size is not None:
+                panel = generate_optimal_panel(
+                    item, experts, panel_size=int(panel_size), use_llm=use_llm,
+                    llm_batch_size=llm_options['llm_batch_size'], scored_experts=scored_experts,
+                    rules=rules
+                )
+                panel.pop('all_scored_experts', None)  # Same list as scored_experts
+                if prefetch:
+                    panel['reasons_prefetched'] = _start_reason_prefetch(
+                        item, experts, panel, options['weights'], candidate_pool
+                    )
+                done['panel'] = panel
+            yield 'done', serialize_doc(done)
+        
+        except Exception as e:
+            traceback.print_exc()
+            yield 'error', {'error': str(e)}
+    
+    return _stream_response(events(), sse)
+
+
+def _load_advertisement_items(advertisement_id):
+    """Items of an advertisement, by its _id or advertisementNo."""
+    try:
+        advertisement_key = ObjectId(advertisement_id)
+    except Exception:
+        advertisement_key = None
+        if advertisements_collection is not None and str(advertisement_id).isdigit():
+            advertisement = advertisements_collection.find_one(
+                {'advertisementNo': int(advertisement_id)}, {'_id': 1}
+            )
+            advertisement_key = advertisement['_id'] if advertisement else None
+    if advertisement_key is None:
+        return []
+    return list(items_collection.find({'advertisementId': advertisement_key}).sort('itemNo', 1))
+
+
+@matching_bp.route('/calculate-advertisement/<advertisement_id>', methods=['POST'])
+def calculate_advertisement_scores(advertisement_id):
+    """
+    Score every item of an advertisement against every expert in one pass.
+    
+    Experts are read and their embeddings decoded once; w1 for all items is
+    one items x experts matrix product, w3/w4 come from each item's
+    candidate pool, and all results go to the score store in one bulk
+    write. w2 is the w2 /calculate gives without use_llm (refine an item
+    with use_llm through /calculate).
+    
+    Responds with NDJSON (one JSON object per line), or Server-Sent Events
+    with ?format=sse or an "Accept: text/event-stream" header. Events:
+    - item: one item scored (item_id, item_no, done, total,
+      experts_scored, best_score, seconds)
+    - done: items_scored, experts_scored, scores_stored and calculated_at
+    - error: scoring failed
+    
+    Request body (optional):
+    {
+        "weights": {...},  // Custom weights (see /calculate)
+        "w2_surrogate": false,  // w2 from the distilled model (default: W2_SURROGATE)
+        "w2_cross_encoder": false  // w2 from the CPU cross-encoder (default: W2_CROSS_ENCODER)
+    }
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        sse = _wants_sse()
+        
+        if not _load_ai_modules():
+            return jsonify({'error': 'AI modules not available'}), 500
+        
+        from ai.batch_scorer import score_items
+        from ai.score_store import save_item_scores
+        
+        items = _load_advertisement_items(advertisement_id)
+        if not items:
+            return jsonify({'error': 'No items found for this advertisement'}), 404
+        
+        experts = list(experts_collection.find({}))
+        if not experts:
+            return jsonify({'error': 'No experts found'}), 404
+        
+    except Exception as e:
+        traceback.print_exc()
+        return jsonify({'error': str(e)}), 500
+    
+    def events():
+        # Scoring runs on a worker thread and reports each item when done
+        updates = queue.Queue()
+        outcome = {}
+        
+        def score():
+            try:
+                outcome['results'] = score_items(
+                    items,
+                    experts,
+                    weights=data.get('weights'),
+                    candidates_fn=_load_item_candidates,
+                    progress_fn=updates.put,
+                    use_surrogate=data.get('w2_surrogate'),
+                    use_cross_encoder=data.get('w2_cross_encoder')
+                )
+            except Exception as e:
+                traceback.print_exc()
+                outcome['error'] = str(e)
+            finally:
+                updates.put(None)
+        
+        threading.Thread(target=score, name='advertisement-scoring', daemon=True).start()
+        while True:
+            progress = updates.get()
+            if progress is None:
+                break
+            print(f"📊 Item {progress['item_no']} ({progress['done']}/{progress['total']}): "
+                  f"{progress['experts_scored']} experts, best {progress['best_score']}")
+            yield 'item', progress
+        
+        if 'error' in outcome:
+            yield 'error', {'error': outcome['error']}
+            return
+        try:
+            stored = save_item_scores(items, experts, outcome['results'])
+            yield 'done', {
+                'advertisement_id': advertisement_id,
+                'items_scored': len(items),
+                'experts_scored': len(experts),
+                'scores_stored': stored,
+                'calculated_at': datetime.now().isoformat()
+            }
+        except Exception as e:
+            traceback.print_exc()
+            yield 'error', {'error': str(e)}
+    
+    return _stream_response(events(), sse)
+
+
+def _declined_pairs(items):
+    """Item _id -> ids of experts who declined a panel invitation for it."""
+    declined = {}
+    if panels_collection is None:
+        return declined
+    panels = panels_collection.find(
+        {'itemId': {'$in': [item['_id'] for item in items]}, 'panelists.status': 'declined'},
+        {'itemId': 1, 'panelists': 1}
+    )
+    for panel in panels:
+        for panelist in panel.get('panelists', []):
+            if panelist.get('status') == 'declined':
+                declined.setdefault(str(panel['itemId']), set()).add(str(panelist.get('expertId')))
+    return declined
+
+
+@matching_bp.route('/assign-panels/<advertisement_id>', methods=['POST'])
+def assign_advertisement_panels(advertisement_id):
+    """
+    Fill the panels of every item of an advertisement together.
+    
+    Maximizes the total relevance score of all panels while keeping each
+    item's panel composition, limiting how many boards one expert sits on
+    and leaving out experts who declined an item (see panel_assignment.py).
+    Stored scores are used (stale ones recomputed); items never scored are
+    scored first in one pass, as /calculate-advertisement does.
+    
+    Request body (optional):
+    {
+        "panel_size": 5,              // Or {"<itemId or itemNo>": size, ...}
+        "max_boards_per_expert": 2,
+        "exclude_expert_ids": [],     // Never assigned to any item
+        "exclude_declined": true,     // Skip experts who declined the item
+        "method": "auto"              // "milp", "greedy" or "auto"
+    }
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        
+        if not _load_ai_modules():
+            return jsonify({'error': 'AI modules not available'}), 500
+        
+        from ai.batch_scorer import score_items
+        from ai.panel_assignment import assign_panels
+        from ai.score_store import load_scored_experts, save_item_scores
+        
+        items = _load_advertisement_items(advertisement_id)
+        if not items:
+            return jsonify({'error': 'No items found for this advertisement'}), 404
+        
+        # Stored scores, scoring the items that have none in one pass
+        item_scores = {}
+        unscored = []
+        for item in items:
+            _refresh_stored_scores(item)
+            scored = load_scored_experts(item['_id'])
+            if scored:
+                item_scores[str(item['_id'])] = scored
+            else:
+                unscored.append(item)
+        if unscored:
+            experts = list(experts_collection.find({}))
+            results = score_items(unscored, experts, candidates_fn=_load_item_candidates)
+            save_item_scores(unscored, experts, results)
+            item_scores.update(results)
+        
+        panel_size = data.get('panel_size', 5)
+        panel_sizes = {}
+        for item in items:
+            item_id = str(item['_id'])
+            if isinstance(panel_size, dict):
+                size = panel_size.get(item_id, panel_size.get(str(item.get('itemNo')), 5))
+            else:
+                size = panel_size
+            panel_sizes[item_id] = int(size)
+        
+        assignment = assign_panels(
+            item_scores,
+            panel_sizes=panel_sizes,
+            max_boards=data.get('max_boards_per_expert'),
+            excluded_pairs=_declined_pairs(items) if data.get('exclude_declined', True) else None,
+            excluded_experts=set(data.get('exclude_expert_ids', [])),
+            method=data.get('method', 'auto')
+        )
+        for item in items:
+            assignment['panels'][str(item['_id'])]['item_no'] = item.get('itemNo')
+        assignment['advertisement_id'] = advertisement_id
+        assignment['items_scored_now'] = len(unscored)
+        
+        return jsonify(serialize_doc(assignment))
+        
+    except Exception as e:
+        traceback.print_exc()
+        return jsonify({'error': str(e)}), 500
+
+
 @matching_bp.route('/generate-panel/<item_id>', methods=['POST'])
 def generate_panel(item_id):
     """
@@ -151,10 +782,30 @@ def generate_panel(item_id):
     {
         "panel_size": 5,   // 3, 5, or 7
         "use_llm": false,
+        "top_candidates": 0,
+        "quantization": "none",  // or "int8" (only with EMBEDDING_QUANTIZATION=int8)
+        "retrieve_top": 0,  // Score only the top N experts per category from the index (0 = all experts)
+        "llm_rerank_top": 5,  // With use_llm: experts per category given LLM calls (0 = all)
+        "llm_batch_size": 8,  // With use_llm: expert profiles per LLM scoring prompt
+        "latency_budget": 60,  // With use_llm: seconds of LLM work allowed (0 = no limit)
+        "prefetch_reasons": false,  // Explain the recommended panel in the background
+        "w2_surrogate": false,  // w2 from the distilled model (see /calculate)
+        "w2_cross_encoder": false,  // w2 from the CPU cross-encoder (see /calculate)
+        "branch_and_bound": false,  // With use_llm: LLM calls only for experts that can still make the panel
+        "rules": [...],  // Composition rules on top of the size's category counts, e.g.
+                         // {"type": "count", "where": {"category": "external", "organization": {"not": "DRDO"}}, "min": 1}
+                         // {"type": "distinct", "field": "affiliation"}
+                         // {"type": "each", "must": {"experience_years": {"min": 15}}}
         "weights": {...}
     }
+    
+    Explanations are not generated here; each expert carries a
+    reason_handle for GET /reason/{itemId}/{expertId}.
     """
     try:
+        data = request.json or {}
+        deadline = _request_deadline(data.get('latency_budget'))
+        
         if not _load_ai_modules():
             return jsonify({'error': 'AI modules not available'}), 500
         
@@ -169,21 +820,30 @@ def generate_panel(item_id):
         if not item:
             return jsonify({'error': 'Item not found'}), 404
         
-        # Get all experts
-        experts = list(experts_collection.find())
-        
-        # Get candidates
-        candidates = []
-        if candidates_collection is not None:
-            candidates = list(candidates_collection.find({
-                'appliedItemId': item.get('_id')
-            }))
-        
         # Parse options
-        data = request.json or {}
         panel_size = data.get('panel_size', 5)
         use_llm = data.get('use_llm', False)
         weights = data.get('weights', None)
+        top_candidates = int(data.get('top_candidates', 0))
+        quantization = data.get('quantization')
+        llm_rerank_top = data.get('llm_rerank_top')
+        llm_rerank_top = int(llm_rerank_top) if llm_rerank_top is not None else None
+        llm_batch_size = data.get('llm_batch_size')
+        llm_batch_size = int(llm_batch_size) if llm_batch_size is not None else None
+        
+        from ai.panel_rules import parse_rules
+        try:
+            rules = parse_rules(data.get('rules'))
+        except ValueError as e:
+            return jsonify({'error': f'Invalid rules: {e}'}), 400
+        
+        retrieve_top = int(data.get('retrieve_top', 0))
+        
+        # Get the experts worth scoring
+        experts, retrieval = _load_experts(item, retrieve_top)
+        
+        # Get candidates
+        candidates, candidate_pool = _load_candidate_pool(item, top_candidates)
         
         # Generate panel
         panel_result = generate_optimal_panel(
@@ -192,8 +852,24 @@ def generate_panel(item_id):
             candidates,
             panel_size=panel_size,
             weights=weights,
-            use_llm=use_llm
+            use_llm=use_llm,
+            top_candidates=top_candidates,
+            candidate_pool=candidate_pool,
+            quantization=quantization,
+            llm_rerank_top=llm_rerank_top,
+            llm_batch_size=llm_batch_size,
+            deadline=deadline,
+            use_surrogate=data.get('w2_surrogate'),
+            use_cross_encoder=data.get('w2_cross_encoder'),
+            branch_and_bound=bool(data.get('branch_and_bound', False)),
+            rules=rules
         )
+        panel_result['retrieval'] = retrieval
+        
+        if data.get('prefetch_reasons', False):
+            panel_result['reasons_prefetched'] = _start_reason_prefetch(
+                item, experts, panel_result, weights, candidate_pool
+            )
         
         return jsonify(serialize_doc(panel_result))
         
@@ -202,12 +878,117 @@ def generate_panel(item_id):
         return jsonify({'error': str(e)}), 500
 
 
+@matching_bp.route('/rerank/<item_id>', methods=['POST'])
+def rerank_scores(item_id):
+    """
+    Re-rank an item's stored scores under new weights, without rescoring.
+    
+    Only the blend of the stored component scores (w1-w4) and the ranking
+    are recomputed, so this answers in milliseconds (weight sliders).
+    Scores must have been stored by /calculate first.
+    
+    Request body:
+    {
+        "weights": {...},  // Or a list of weight objects to compare side by side
+        "panel_size": 5,   // Also build the panel under each weight set (optional)
+        "rules": [...],    // Composition rules for that panel (see /generate-panel)
+        "limit": 0         // Experts returned per weight set (0 = all)
+    }
+    """
+    try:
+        data = request.json or {}
+        
+        if not _load_ai_modules():
+            return jsonify({'error': 'AI modules not available'}), 500
+        
+        from ai import reblend_scores, generate_optimal_panel
+        from ai.score_store import load_scored_experts
+        from ai.panel_rules import parse_rules, rule_fields
+        
+        # Get item
+        try:
+            item = items_collection.find_one({'_id': ObjectId(item_id)})
+        except:
+            item = items_collection.find_one({'itemNo': int(item_id)})
+        
+        if not item:
+            return jsonify({'error': 'Item not found'}), 404
+        
+        weight_sets = data.get('weights') or {}
+        if isinstance(weight_sets, dict):
+            weight_sets = [weight_sets]
+        panel_size = data.get('panel_size')
+        limit = int(data.get('limit', 0))
+        try:
+            rules = parse_rules(data.get('rules'))
+        except ValueError as e:
+            return jsonify({'error': f'Invalid rules: {e}'}), 400
+        
+        scored_experts = load_scored_experts(item['_id'])
+        if not scored_experts:
+            return jsonify({'error': 'No stored scores for this item; run /calculate first'}), 404
+        
+        try:
+            rankings = reblend_scores(scored_experts, weight_sets)
+        except (TypeError, ValueError) as e:
+            return jsonify({'error': f'Invalid weights: {e}'}), 400
+        
+        # Profile fields the rules read (scores carry only name and category)
+        rule_experts = []
+        if panel_size and rules:
+            fields = {field: 1 for field in rule_fields(rules)}
+            fields['experience'] = 1
+            rule_experts = list(experts_collection.find(
+                {'_id': {'$in': [ObjectId(expert['expert_id']) for expert in scored_experts]}}, fields
+            ))
+        
+        results = []
+        for ranked in rankings:
+            result = {
+                'weights_used': ranked[0]['weights_used'] if ranked else None,
+                'scored_experts': ranked[:limit] if limit > 0 else ranked
+            }
+            if panel_size:
+                panel = generate_optimal_panel(
+                    item, rule_experts, panel_size=int(panel_size), scored_experts=ranked, rules=rules
+                )
+                result['panel'] = {
+                    'recommended_panel': panel['recommended_panel'],
+                    'panel_composition': panel['panel_composition'],
+                    'constraints': panel['constraints'],
+                    'average_score': panel['average_score']
+                }
+            results.append(result)
+        
+        return jsonify(serialize_doc({
+            'item_id': str(item['_id']),
+            'experts_scored': len(scored_experts),
+            'stale_experts': sum(1 for expert in scored_experts if expert['stale']),
+            'results': results
+        }))
+        
+    except Exception as e:
+        traceback.print_exc()
+        return jsonify({'error': str(e)}), 500
+
+
 @matching_bp.route('/score/<item_id>/<expert_id>', methods=['GET'])
 def get_score(item_id, expert_id):
     """
     Get detailed score breakdown for a specific expert-item pair.
+    
+    Query parameters:
+        use_llm: 'true' (default) or 'false'
+        latency_budget: Seconds allowed for the LLM score and reason
+            (default: MATCHING_LATENCY_BUDGET, 0 = no limit)
+        w2_surrogate: 'true' to take w2 from the distilled model
+            (the LLM is then only asked when it is uncertain)
+        w2_cross_encoder: 'true' to take w2 from the CPU cross-encoder
+            (with use_llm=false)
     """
     try:
+        deadline = _request_deadline(request.args.get('latency_budget'))
+        
         if not _load_ai_modules():
             return jsonify({'error': 'AI modules not available'}), 500
         
@@ -232,22 +1013,29 @@ def get_score(item_id, expert_id):
             return jsonify({'error': 'Expert not found'}), 404
         
         # Get candidates
-        candidates = []
-        if candidates_collection is not None:
-            candidates = list(candidates_collection.find({
-                'appliedItemId': item.get('_id')
-            }))
+        candidates, candidate_pool = _load_candidate_pool(item)
         
         # Use LLM for detailed single-expert scoring
         use_llm = request.args.get('use_llm', 'true').lower() == 'true'
+        use_surrogate = request.args.get('w2_surrogate')
+        if use_surrogate is not None:
+            use_surrogate = use_surrogate.lower() == 'true'
+        use_cross_encoder = request.args.get('w2_cross_encoder')
+        if use_cross_encoder is not None:
+            use_cross_encoder = use_cross_encoder.lower() == 'true'
         
         # Get detailed breakdown
         breakdown = get_expert_score_breakdown(
             item,
             expert,
             candidates,
-            use_llm=use_llm
+            use_llm=use_llm,
+            candidate_pool=candidate_pool,
+            deadline=deadline,
+            use_surrogate=use_surrogate,
+            use_cross_encoder=use_cross_encoder
         )
+        breakdown['llm_scored'] = breakdown.get('w2_method') == 'llm'
         
         return jsonify(serialize_doc(breakdown))
         
@@ -256,72 +1044,184 @@ def get_score(item_id, expert_id):
         return jsonify({'error': str(e)}), 500
 
 
+@matching_bp.route('/reason/<item_id>/<expert_id>', methods=['GET'])
+def get_reason(item_id, expert_id):
+    """
+    Explanation of one expert's score for an item, generated on first request.
+    
+    Scoring only returns a reason_handle per expert; this endpoint turns it
+    into the LLM explanation and caches it (LLM cache), so only the experts
+    a user actually opens cost an LLM call.
+    
+    Query parameters (from the reason_handle / scoring options):
+        llm_w2: 'true' (default) if the explained score used the LLM w2
+        distilled_w2: 'true' if it used the distilled w2
+        cross_encoder_w2: 'true' if it used the cross-encoder w2
+        weights: JSON object of custom weights used for scoring
+        latency_budget: Seconds allowed for the LLM w2 lookup
+    """
+    try:
+        if not _load_ai_modules():
+            return jsonify({'error': 'AI modules not available'}), 500
+        
+        from ai.relevance_scorer import explain_relevance
+        
+        error, args = _load_reason_request(item_id, expert_id)
+        if error:
+            return error
+        
+        return jsonify({
+            'item_id': item_id,
+            'expert_id': expert_id,
+            'reason': explain_relevance(**args)
+        })
+        
+    except Exception as e:
+        traceback.print_exc()
+        return jsonify({'error': str(e)}), 500
+
+
+@matching_bp.route('/reason/<item_id>/<expert_id>/stream', methods=['GET'])
+def stream_reason(item_id, expert_id):
+    """
+    Stream the LLM explanation for one expert-item pair token by token.
+    
+    Events (NDJSON lines, or SSE with ?format=sse / Accept: text/event-stream):
+    - token: {"text": "..."} chunks; concatenated they form the reason
+    - reset: {"text": "..."} the stream broke off; this text replaces the
+      tokens sent so far (the reason generated again, or the fallback)
+    - done: {"reason": full text}
+    - error
+    
+    A reason that is already cached arrives as a single token. Takes the
+    same query parameters as GET /reason/{itemId}/{expertId}.
+    """
+    try:
+        sse = _wants_sse()
+        
+        if not _load_ai_modules():
+            return jsonify({'error': 'AI modules not available'}), 500
+        
+        from ai.relevance_scorer import stream_relevance_reason
+        from ai.similarity_calculator import ReasonRestart
+        
+        error, args = _load_reason_request(item_id, expert_id)
+        if error:
+            return error
+    
+    except Exception as e:
+        traceback.print_exc()
+        return jsonify({'error': str(e)}), 500
+    
+    def events():
+        parts = []
+        try:
+            for text in stream_relevance_reason(**args):
+                if isinstance(text, ReasonRestart):
+                    parts = [str(text)]
+                    yield 'reset', {'text': str(text)}
+                    continue
+                parts.append(text)
+                yield 'token', {'text': text}
+            yield 'done', {'expert_id': expert_id, 'reason': ''.join(parts)}
+        except Exception as e:
+            traceback.print_exc()
+            yield 'error', {'error': str(e)}
+    
+    return _stream_response(events(), sse)
+
+
 @matching_bp.route('/update-embeddings', methods=['POST'])
 def update_embeddings():
     """
     Update embeddings for all experts, items, and candidates.
     This should be run after adding new data or periodically.
+    
+    Only documents whose profile-text fingerprint or embedding model changed
+    are re-embedded; the rest are skipped.
+    
+    Documents are streamed in chunks, each chunk is encoded with one model
+    call and written back with one bulk write.
+    
+    Request body (optional):
+    {
+        "force": false,      // Re-embed every document regardless of fingerprint
+        "batch_size": 256,   // Documents per chunk
+        "progress": false    // Include per-chunk progress in the response
+    }
     """
     try:
         if not _load_ai_modules():
             return jsonify({'error': 'AI modules not available'}), 500
         
-        from ai import (
-            generate_expert_embedding,
-            generate_item_embedding,
-            generate_candidate_embedding
-        )
+        from ai.embedding_refresh import refresh_collection_embeddings
         
-        results = {
-            'experts_updated': 0,
-            'items_updated': 0,
-            'candidates_updated': 0,
-            'errors': []
-        }
+        data = request.get_json(silent=True) or {}
+        force = bool(data.get('force', False))
+        batch_size = data.get('batch_size')
+        batch_size = int(batch_size) if batch_size else None
         
-        # Update expert embeddings
-        experts = list(experts_collection.find())
-        for expert in experts:
-            try:
-                embedding = generate_expert_embedding(expert)
-                if embedding:
-                    experts_collection.update_one(
-                        {'_id': expert['_id']},
-                        {'$set': {'skillEmbedding': embedding, 'embeddingUpdatedAt': datetime.now()}}
-                    )
-                    results['experts_updated'] += 1
-            except Exception as e:
-                results['errors'].append(f"Expert {expert.get('name')}: {str(e)}")
+        results = {'errors': []}
+        progress_log = []
         
-        # Update item embeddings
-        items = list(items_collection.find())
-        for item in items:
-            try:
-                embedding = generate_item_embedding(item)
-                if embedding:
-                    items_collection.update_one(
-                        {'_id': item['_id']},
-                        {'$set': {'embedding': embedding, 'embeddingUpdatedAt': datetime.now()}}
-                    )
-                    results['items_updated'] += 1
-            except Exception as e:
-                results['errors'].append(f"Item {item.get('itemNo')}: {str(e)}")
+        def report_progress(progress):
+            print(f"📦 {progress['kind']} chunk {progress['chunk']}: "
+                  f"{progress['processed']} processed, {progress['refreshed']} refreshed, "
+                  f"{progress['skipped']} skipped, {progress['failed']} failed")
+            if data.get('progress'):
+                progress_log.append(progress)
         
-        # Update candidate embeddings
+        targets = [
+            ('experts', experts_collection, 'expert', lambda d: d.get('name')),
+            ('items', items_collection, 'item', lambda d: d.get('itemNo')),
+        ]
         if candidates_collection is not None:
-            candidates = list(candidates_collection.find())
-            for candidate in candidates:
-                try:
-                    embedding = generate_candidate_embedding(candidate)
-                    if embedding:
-                        candidates_collection.update_one(
-                            {'_id': candidate['_id']},
-                            {'$set': {'skillEmbedding': embedding, 'embeddingUpdatedAt': datetime.now()}}
-                        )
-                        results['candidates_updated'] += 1
-                except Exception as e:
-                    results['errors'].append(f"Candidate {candidate.get('name')}: {str(e)}")
+            targets.append(('candidates', candidates_collection, 'candidate', lambda d: d.get('name')))
+        
+        refreshed_ids = {}
+        for key, collection, kind, label_fn in targets:
+            stats = refresh_collection_embeddings(
+                collection,
+                kind,
+                force=force,
+                label_fn=label_fn,
+                batch_size=batch_size,
+                progress_fn=report_progress
+            )
+            refreshed_ids[key] = stats.pop('refreshed_ids')
+            results['errors'].extend(stats.pop('errors'))
+            results[key] = stats
+            results[f'{key}_updated'] = stats['refreshed']
+        
+        # Keep the in-process expert index in step with re-embedded experts
+        from ai.expert_index import get_expert_index
+        get_expert_index().sync(refreshed_ids['experts'])
         
+        # Stored scores of re-embedded experts are stale (item-side changes
+        # are detected from the item's stamps when its scores are read)
+        from ai.score_store import invalidate_scores
+        results['stored_scores_invalidated'] = invalidate_scores(expert_ids=refreshed_ids['experts'])
+        
+        if candidates_collection is not None:
+            # Rebuild centroids of items whose candidates changed (or never had one)
+            from ai.candidate_pool import rebuild_item_centroid
+            affected = set(candidates_collection.distinct(
+                'appliedItemId', {'_id': {'$in': refreshed_ids['candidates']}}
+            )) if refreshed_ids['candidates'] else set()
+            affected.update(
+                item['_id'] for item in items_collection.find(
+                    {'candidateCount': {'$exists': False}}, {'_id': 1}
+                )
+            )
+            for item_id in affected:
+                rebuild_item_centroid(items_collection, candidates_collection, item_id)
+            results['candidate_pools_rebuilt'] = len(affected)
+        
+        if data.get('progress'):
+            results['progress'] = progress_log
+        
+        from ai.embedding_cache import get_embedding_cache_stats
+        results['embedding_cache'] = get_embedding_cache_stats()
         results['updated_at'] = datetime.now().isoformat()
         
         return jsonify(results)
@@ -331,11 +1231,151 @@ def update_embeddings():
         return jsonify({'error': str(e)}), 500
 
 
+@matching_bp.route('/embedding-cache', methods=['GET'])
+def embedding_cache_stats():
+    """
+    Get hit/miss counters for the embedding cache (memory and persistent tiers).
+    """
+    try:
+        from ai.embedding_cache import get_embedding_cache_stats
+        return jsonify(get_embedding_cache_stats())
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@matching_bp.route('/migrate-embeddings', methods=['POST'])
+def migrate_embeddings():
+    """
+    Convert embeddings stored as BSON arrays to the compact binary format.
+    
+    Request body (optional):
+    {
+        "dtype": "float32"   // or "float16"
+    }
+    
+    Safe to re-run: documents already in the binary format are not touched.
+    """
+    try:
+        from ai.embedding_codec import migrate_collection_embeddings, STORAGE_DTYPE
+        from ai.embedding_cache import get_embedding_cache
+        
+        data = request.json or {}
+        dtype = data.get('dtype', STORAGE_DTYPE)
+        if dtype not in ('float32', 'float16'):
+            return jsonify({'error': 'dtype must be float32 or float16'}), 400
+        
+        results = {
+            'dtype': dtype,
+            'experts': migrate_collection_embeddings(experts_collection, ['skillEmbedding'], dtype),
+            'items': migrate_collection_embeddings(items_collection, ['embedding', 'candidateCentroid'], dtype)
+        }
+        if candidates_collection is not None:
+            results['candidates'] = migrate_collection_embeddings(candidates_collection, ['skillEmbedding'], dtype)
+        cache_collection = get_embedding_cache().collection
+        if cache_collection is not None:
+            results['embedding_cache'] = migrate_collection_embeddings(cache_collection, ['embedding'], dtype)
+        
+        return jsonify({'success': True, **results})
+    
+    except Exception as e:
+        traceback.print_exc()
+        return jsonify({'error': str(e)}), 500
+
+
+@matching_bp.route('/llm-cache', methods=['GET'])
+def llm_cache_stats():
+    """
+    Get hit/miss counters for the LLM score and reason cache.
+    """
+    try:
+        from ai.llm_cache import get_llm_cache_stats
+        return jsonify(get_llm_cache_stats())
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@matching_bp.route('/expert-index', methods=['GET'])
+def expert_index_stats():
+    """
+    Get the size and search mode of each expert index partition.
+    """
+    try:
+        from ai.expert_index import get_expert_index
+        return jsonify(get_expert_index().stats())
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@matching_bp.route('/expert-index/rebuild', methods=['POST'])
+def rebuild_expert_index():
+    """
+    Rebuild the expert index from the experts collection.
+    """
+    try:
+        from ai.expert_index import get_expert_index
+        index = get_expert_index()
+        index.build()
+        return jsonify({'success': True, **index.stats()})
+    except Exception as e:
+        traceback.print_exc()
+        return jsonify({'error': str(e)}), 500
+
+
+@matching_bp.route('/w2-surrogate', methods=['GET'])
+def w2_surrogate_status():
+    """
+    Get the distilled w2 model status, its held-out evaluation and the
+    number of LLM scores logged for training.
+    """
+    try:
+        from ai.score_distiller import get_surrogate_status
+        return jsonify(get_surrogate_status())
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@matching_bp.route('/w2-surrogate/train', methods=['POST'])
+def w2_surrogate_train():
+    """
+    Train the distilled w2 model on the logged LLM scores.
+    
+    Request body (optional):
+    {
+        "test_size": 0.2,  // Fraction of examples held out for the report
+        "min_examples": 50
+    }
+    """
+    try:
+        data = request.json or {}
+        from ai.score_distiller import train_w2_surrogate
+        report = train_w2_surrogate(
+            test_size=float(data.get('test_size', 0.2)),
+            min_examples=data.get('min_examples')
+        )
+        return jsonify({'success': True, 'report': report})
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        traceback.print_exc()
+        return jsonify({'error': str(e)}), 500
+
+
 @matching_bp.route('/experts-with-scores/<item_id>', methods=['GET'])
 def get_experts_with_scores(item_id):
     """
-    Get all experts with their cached scores for an item.
-    Returns experts sorted by relevance score.
+    Get all experts with their stored scores for an item.
+    Returns experts sorted by relevance score within each category.
+    
+    Stale rows (expert, item or candidate pool changed since they were
+    computed) are recomputed first; the ranking itself is one indexed
+    query on the score store. Each expert document carries its row as
+    relevanceScore / scoreDetails / scoredAt / scoredForItem, plus
+    finalScore, w2Method, stale and llmPending. Experts not scored for
+    the item follow with relevanceScore 0 when no limit is given.
+    
+    Query params:
+        category: Only this category
+        limit: At most this many scored experts (0 = all experts)
     """
     try:
         # Get item to validate
@@ -347,8 +1387,23 @@ def get_experts_with_scores(item_id):
         if not item:
             return jsonify({'error': 'Item not found'}), 404
         
-        # Get all experts sorted by relevance score
-        experts = list(experts_collection.find().sort('relevanceScore', -1))
+        from ai.score_store import get_ranked_scores
+        
+        # Recompute only what changed since the scores were stored
+        refreshed = _refresh_stored_scores(item) if _load_ai_modules() else 0
+        
+        category_filter = request.args.get('category')
+        limit = int(request.args.get('limit', 0))
+        scores = get_ranked_scores(item['_id'], category=category_filter, limit=limit)
+        
+        # Join each row onto its expert document
+        experts = {
+            str(expert['_id']): expert
+            for expert in experts_collection.find(
+                {'_id': {'$in': [ObjectId(score['expertId']) for score in scores]}},
+                {'skillEmbedding': 0}
+            )
+        }
         
         # Group by category
         grouped = {
@@ -357,15 +1412,42 @@ def get_experts_with_scores(item_id):
             'external': []
         }
         
-        for expert in experts:
-            category = expert.get('category', 'departmental')
-            if category in grouped:
-                grouped[category].append(serialize_doc(expert))
+        total = 0
+        for score in scores:
+            expert = experts.get(score['expertId'])
+            if expert is None or score.get('category') not in grouped:
+                continue
+            grouped[score['category']].append(serialize_doc({
+                **expert,
+                'relevanceScore': round(score.get('finalScore', 0)),
+                'scoreDetails': score.get('componentScores', {}),
+                'scoredAt': score.get('computedAt'),
+                'scoredForItem': str(item['_id']),
+                'finalScore': score.get('finalScore', 0),
+                'w2Method': score.get('w2Method'),
+                'stale': score.get('stale', False),
+                'llmPending': score.get('llmPending', False),
+                'scored': True
+            }))
+            total += 1
+        
+        # Experts without a stored score for this item
+        if not limit:
+            unscored = experts_collection.find(
+                {'_id': {'$nin': [expert['_id'] for expert in experts.values()]}},
+                {'skillEmbedding': 0}
+            )
+            for expert in unscored:
+                category = (expert.get('category') or 'departmental').lower()
+                if category in grouped and category_filter in (None, category):
+                    grouped[category].append(serialize_doc({**expert, 'relevanceScore': 0, 'scored': False}))
+                    total += 1
         
         return jsonify({
             'item_id': item_id,
             'experts_by_category': grouped,
-            'total_experts': len(experts)
+            'total_experts': total,
+            'scores_refreshed': refreshed
         })
         
     except Exception as e:
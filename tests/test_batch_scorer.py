@@ -0,0 +1,64 @@
+"""
+Advertisement batch scoring against the per-item batch scorer.
+
+score_items must store the scores /calculate (without use_llm) gives each
+item, including the w2 of an enabled w2 model.
+"""
+
+import numpy as np
+import pytest
+import ai.relevance_scorer as relevance_scorer
+from ai.batch_scorer import score_items
+from ai.relevance_scorer import batch_calculate_relevance_scores
+
+
+DIM = 32
+CATEGORIES = ['chairperson', 'departmental', 'external']
+
+
+def _documents(seed, n_items=3, n_experts=12, n_candidates=5):
+    rng = np.random.default_rng(seed)
+    items = [
+        {'_id': f'item{k}', 'itemNo': k + 1, 'title': f'Scientist {k}', 'description': 'Radar signal processing',
+         'embedding': rng.normal(size=DIM).tolist()}
+        for k in range(n_items)
+    ]
+    experts = [
+        {'_id': f'expert{i}', 'name': f'Expert {i}', 'category': CATEGORIES[i % 3],
+         'role': 'Scientist', 'skills': ['Radar', f'Skill {i}'], 'skillEmbedding': rng.normal(size=DIM).tolist()}
+        for i in range(n_experts)
+    ]
+    # The last item has no candidates
+    candidates = {
+        item['_id']: [
+            {'_id': f'{item["_id"]}-candidate{j}', 'skills': ['VLSI'], 'skillEmbedding': rng.normal(size=DIM).tolist()}
+            for j in range(n_candidates)
+        ] if k < n_items - 1 else []
+        for k, item in enumerate(items)
+    }
+    return items, experts, candidates
+
+
+def _fake_cross_encoder(item_text, texts):
+    return [float(sum(map(ord, item_text + text)) % 100) for text in texts]
+
+
+@pytest.mark.parametrize('use_cross_encoder', [False, True])
+def test_items_match_the_per_item_scorer(monkeypatch, use_cross_encoder):
+    monkeypatch.setattr(relevance_scorer, 'cross_encoder_similarity', _fake_cross_encoder)
+    items, experts, candidates = _documents(seed=0)
+
+    results = score_items(items, experts, candidates_fn=lambda item: candidates[item['_id']],
+                          use_surrogate=False, use_cross_encoder=use_cross_encoder)
+
+    for item in items:
+        expected = {r['expert_id']: r for r in batch_calculate_relevance_scores(
+            item, experts, candidates[item['_id']] or None, use_llm=False, quantization='none',
+            use_surrogate=False, use_cross_encoder=use_cross_encoder)}
+        for result in results[item['_id']]:
+            single = expected[result['expert_id']]
+            assert result['w2_method'] == single['w2_method']
+            assert result['w2_method'] == ('cross_encoder' if use_cross_encoder else 'cosine')
+            assert result['final_score'] == pytest.approx(single['final_score'], abs=0.02)
+            for key, value in single['component_scores'].items():
+                assert result['component_scores'][key] == pytest.approx(value, abs=0.02)
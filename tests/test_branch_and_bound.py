@@ -0,0 +1,64 @@
+"""
+branch_and_bound_w2 against scoring every expert.
+
+The top-k of each category must be the same as with every w2 known,
+while experts whose bound cannot reach the top-k are never evaluated.
+"""
+
+import numpy as np
+import pytest
+from ai.relevance_scorer import W2_MAX, branch_and_bound_w2
+
+
+CATEGORIES = ['chairperson', 'departmental', 'external']
+
+
+def _top_scores(categories, finals, indices, k):
+    top = {}
+    for category in set(categories):
+        scores = sorted((finals[i] for i in indices if categories[i] == category), reverse=True)
+        top[category] = scores[:k.get(category, 0) if isinstance(k, dict) else k]
+    return top
+
+
+@pytest.mark.parametrize('seed', range(25))
+@pytest.mark.parametrize('top_k', [1, 3, {'chairperson': 1, 'departmental': 2, 'external': 2}])
+def test_top_k_matches_exhaustive(seed, top_k):
+    rng = np.random.default_rng(seed)
+    n = int(rng.integers(5, 120))
+    categories = [CATEGORIES[i] for i in rng.integers(0, 3, size=n)]
+    base = rng.uniform(0, 60, size=n)
+    true_w2 = rng.uniform(0, W2_MAX, size=n)
+    w2_weight = 0.35
+    evaluated = []
+
+    def evaluate(indices):
+        evaluated.extend(indices)
+        return [float(true_w2[i]) for i in indices]
+
+    search = branch_and_bound_w2(categories, base, w2_weight, top_k, evaluate)
+
+    finals = base + w2_weight * true_w2
+    assert set(search['w2']) == set(evaluated)
+    assert not set(search['pruned']) & set(evaluated)
+    assert _top_scores(categories, finals, search['w2'], top_k) == \
+        _top_scores(categories, finals, range(n), top_k)
+
+
+def test_known_scores_are_not_evaluated():
+    categories = ['external'] * 4
+    base = np.array([50.0, 40.0, 30.0, 0.0])
+    search = branch_and_bound_w2(
+        categories, base, 0.5, 1, lambda indices: [100.0] * len(indices), known_w2={0: 100.0}
+    )
+    # Expert 0 is known at 100 and no other bound (at most 90) can beat it
+    assert search['w2'] == {}
+    assert set(search['pruned']) == {1, 2, 3}
+
+
+def test_missed_deadline_is_not_reported_as_pruned():
+    categories = ['external'] * 5
+    base = np.zeros(5)
+    search = branch_and_bound_w2(categories, base, 1.0, 2, lambda indices: [None] * len(indices))
+    assert search['pruned'] == []
+    assert all(score is None for score in search['w2'].values())
@@ -0,0 +1,75 @@
+"""
+Stored candidate centroids against the candidate documents.
+
+After any sequence of candidate changes, the item's centroid must equal
+the one rebuilt from all its candidates, including items whose
+candidates existed before the item had a centroid.
+"""
+
+import numpy as np
+import pytest
+from ai.candidate_pool import apply_candidate_change, get_item_candidate_pool
+
+mongomock = pytest.importorskip('mongomock')
+
+
+DIM = 16
+
+
+def _database(n_candidates=6, centroid=False, seed=0):
+    rng = np.random.default_rng(seed)
+    db = mongomock.MongoClient().db
+    db.items.insert_one({'_id': 'item', 'title': 'Scientist B'})
+    db.candidates.insert_many([
+        {'_id': f'candidate{i}', 'appliedItemId': 'item', 'skillEmbedding': rng.normal(size=DIM).tolist()}
+        for i in range(n_candidates)
+    ])
+    if centroid:
+        from ai.candidate_pool import rebuild_item_centroid
+        rebuild_item_centroid(db.items, db.candidates, 'item')
+    return db, rng
+
+
+def _expected_centroid(db):
+    vectors = [np.asarray(c['skillEmbedding'], dtype=np.float64) for c in db.candidates.find({'appliedItemId': 'item'})]
+    return np.mean([v / np.linalg.norm(v) for v in vectors], axis=0), len(vectors)
+
+
+def _assert_matches_candidates(db):
+    centroid, count = _expected_centroid(db)
+    item = db.items.find_one({'_id': 'item'})
+    assert item['candidateCount'] == count
+    pool = get_item_candidate_pool(item)
+    assert np.allclose(pool.centroid, centroid, atol=1e-5)
+
+
+@pytest.mark.parametrize('centroid', [False, True])
+def test_add_to_existing_candidates(centroid):
+    db, rng = _database(centroid=centroid)
+    embedding = rng.normal(size=DIM).tolist()
+    db.candidates.insert_one({'_id': 'new', 'appliedItemId': 'item', 'skillEmbedding': embedding})
+
+    apply_candidate_change(db.items, 'item', add_embedding=embedding, candidates_collection=db.candidates)
+
+    _assert_matches_candidates(db)
+
+
+@pytest.mark.parametrize('centroid', [False, True])
+def test_remove_from_existing_candidates(centroid):
+    db, _ = _database(centroid=centroid)
+    removed = db.candidates.find_one_and_delete({'_id': 'candidate2'})
+
+    apply_candidate_change(db.items, 'item', remove_embedding=removed['skillEmbedding'],
+                           candidates_collection=db.candidates)
+
+    _assert_matches_candidates(db)
+
+
+def test_candidates_collection_defaults_to_the_items_database():
+    db, rng = _database()
+    embedding = rng.normal(size=DIM).tolist()
+    db.candidates.insert_one({'_id': 'new', 'appliedItemId': 'item', 'skillEmbedding': embedding})
+
+    apply_candidate_change(db.items, 'item', add_embedding=embedding)
+
+    _assert_matches_candidates(db)
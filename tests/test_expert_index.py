@@ -0,0 +1,59 @@
+"""
+Expert index copies of several workers sharing one experts collection.
+
+Each ExpertIndex stands in for one worker process's copy.
+"""
+
+import numpy as np
+import pytest
+from ai.expert_index import ExpertIndex
+
+mongomock = pytest.importorskip('mongomock')
+
+
+DIM = 16
+
+
+def _collection(n_experts=20, seed=0):
+    rng = np.random.default_rng(seed)
+    collection = mongomock.MongoClient().db.experts
+    collection.insert_many([
+        {'_id': f'expert{i}', 'category': ['chairperson', 'external', None][i % 3],
+         'skillEmbedding': rng.normal(size=DIM).tolist()}
+        for i in range(n_experts)
+    ])
+    return collection, rng
+
+
+def test_other_workers_see_a_synced_expert():
+    collection, rng = _collection()
+    writer, reader = ExpertIndex(collection), ExpertIndex(collection)
+    query = rng.normal(size=DIM).tolist()
+    writer.search(query, 3)
+    reader.search(query, 3)
+
+    collection.insert_one({'_id': 'new', 'category': 'external', 'skillEmbedding': query})
+    writer.sync(['new'])
+
+    assert writer.version == writer.stored_version()  # No rebuild needed for its own change
+    assert reader.search(query, 1)['external'][0][0] == 'new'
+    assert reader.version == writer.version
+
+
+def test_deleted_expert_leaves_other_workers():
+    collection, rng = _collection()
+    writer, reader = ExpertIndex(collection), ExpertIndex(collection)
+    reader.search(rng.normal(size=DIM).tolist(), 3)
+
+    collection.delete_one({'_id': 'expert0'})
+    writer.sync(['expert0'])
+
+    reader.search(rng.normal(size=DIM).tolist(), 3)
+    assert 'expert0' not in reader.category_of
+
+
+def test_missing_category_matches_the_scorer():
+    collection, rng = _collection()
+    index = ExpertIndex(collection)
+    hits = index.search(rng.normal(size=DIM).tolist(), 3)
+    assert set(hits) == {'chairperson', 'external', ''}
@@ -0,0 +1,132 @@
+"""
+Global panel assignment: MILP against greedy and against the unpruned problem.
+
+The MILP must never do worse than the greedy fallback, pruning candidate
+pairs must not change the optimum, and every assignment must respect
+max_boards and the exclusions.
+"""
+
+from collections import Counter
+import numpy as np
+import pytest
+import ai.panel_assignment as panel_assignment
+from ai.panel_assignment import assign_panels, _candidate_pairs, _solve_milp
+from ai.panel_generator import PANEL_SIZES
+
+
+CATEGORIES = ['chairperson', 'departmental', 'external']
+
+
+def _item_scores(rng, n_items=6, n_experts=18):
+    """Experts of similar quality for every item, so the top ones are contended."""
+    quality = rng.uniform(40, 90, size=n_experts)
+    return {
+        f'item{k}': [
+            {'expert_id': f'expert{i}', 'expert_name': f'Expert {i}', 'category': CATEGORIES[i % 3],
+             'final_score': round(float(quality[i] + rng.normal(0, 5)), 2)}
+            for i in range(n_experts)
+        ]
+        for k in range(n_items)
+    }
+
+
+def _panel_sizes(rng, item_scores):
+    return {item_id: int(rng.choice([3, 5, 7])) for item_id in item_scores}
+
+
+def _assert_valid(result, item_scores, panel_sizes, max_boards, excluded_pairs=None, excluded_experts=()):
+    load = Counter()
+    for item_id, panel in result['panels'].items():
+        members = [e['expert_id'] for e in panel['recommended_panel']]
+        assert len(members) == len(set(members))
+        assert not set(members) & (excluded_pairs or {}).get(item_id, set())
+        assert not set(members) & set(excluded_experts)
+        target = PANEL_SIZES[panel_sizes[item_id]]
+        for category, count in panel['panel_composition']['actual'].items():
+            assert count <= target[category]
+        load.update(members)
+    assert max(load.values(), default=0) <= max_boards
+
+
+def _all_pairs(item_scores, compositions):
+    """Every (item, expert) pair, without pruning."""
+    return [
+        (item_id, e['expert_id'], e['category'], e['final_score'])
+        for item_id, scored_experts in item_scores.items()
+        for e in scored_experts if e['category'] in compositions[item_id]
+    ]
+
+
+def _objective(pairs, chosen):
+    return len(chosen), sum(pairs[k][3] for k in chosen)
+
+
+@pytest.mark.parametrize('seed', range(8))
+@pytest.mark.parametrize('max_boards', [1, 2, 3])
+def test_milp_is_at_least_as_good_as_greedy(seed, max_boards):
+    rng = np.random.default_rng(seed)
+    item_scores = _item_scores(rng)
+    panel_sizes = _panel_sizes(rng, item_scores)
+
+    milp = assign_panels(item_scores, panel_sizes, max_boards=max_boards, method='milp')
+    greedy = assign_panels(item_scores, panel_sizes, max_boards=max_boards, method='greedy')
+
+    assert milp['method'] == 'milp' and greedy['method'] == 'greedy'
+    _assert_valid(milp, item_scores, panel_sizes, max_boards)
+    _assert_valid(greedy, item_scores, panel_sizes, max_boards)
+    assert milp['seats_filled'] >= greedy['seats_filled']
+    if milp['seats_filled'] == greedy['seats_filled']:
+        assert milp['total_score'] >= greedy['total_score'] - 1e-6
+
+
+@pytest.mark.parametrize('seed', range(8))
+@pytest.mark.parametrize('max_boards', [1, 2])
+def test_pruning_keeps_the_optimum(seed, max_boards):
+    rng = np.random.default_rng(seed)
+    item_scores = _item_scores(rng, n_items=int(rng.integers(3, 8)), n_experts=int(rng.integers(9, 30)))
+    compositions = {item_id: PANEL_SIZES[size] for item_id, size in _panel_sizes(rng, item_scores).items()}
+
+    pruned, considered = _candidate_pairs(item_scores, compositions, max_boards, {}, set())
+    unpruned = _all_pairs(item_scores, compositions)
+    assert considered == len(unpruned) and len(pruned) <= len(unpruned)
+
+    best_pruned = _objective(pruned, _solve_milp(pruned, compositions, max_boards, 30))
+    best_unpruned = _objective(unpruned, _solve_milp(unpruned, compositions, max_boards, 30))
+    assert best_pruned[0] == best_unpruned[0]
+    assert best_pruned[1] == pytest.approx(best_unpruned[1])
+
+
+@pytest.mark.parametrize('method', ['milp', 'greedy'])
+def test_max_boards_and_exclusions_are_respected(method):
+    rng = np.random.default_rng(3)
+    item_scores = _item_scores(rng, n_items=8, n_experts=15)
+    panel_sizes = {item_id: 5 for item_id in item_scores}
+    best = {
+        item_id: {e['expert_id'] for e in sorted(scored, key=lambda e: -e['final_score'])[:3]}
+        for item_id, scored in item_scores.items()
+    }
+    excluded_pairs = {'item0': best['item0'], 'item5': best['item5']}
+    excluded_experts = {'expert1', 'expert2'}
+
+    result = assign_panels(item_scores, panel_sizes, max_boards=2, excluded_pairs=excluded_pairs,
+                           excluded_experts=excluded_experts, method=method)
+
+    assert result['method'] == method
+    assert result['max_expert_load'] <= 2
+    _assert_valid(result, item_scores, panel_sizes, 2, excluded_pairs, excluded_experts)
+
+
+def test_greedy_fallback_when_milp_is_unavailable(monkeypatch):
+    rng = np.random.default_rng(5)
+    item_scores = _item_scores(rng)
+    panel_sizes = {item_id: 3 for item_id in item_scores}
+    greedy = assign_panels(item_scores, panel_sizes, max_boards=2, method='greedy')
+    monkeypatch.setattr(panel_assignment, '_solve_milp', lambda *args: None)
+
+    result = assign_panels(item_scores, panel_sizes, max_boards=2)
+
+    assert result['method'] == 'greedy'
+    assert result['total_score'] == greedy['total_score']
+    _assert_valid(result, item_scores, panel_sizes, 2)
+    # 6 experts per category on at most 2 boards each cover all 6 seats of it
+    assert result['seats_filled'] == result['seats_total']
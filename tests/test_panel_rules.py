@@ -0,0 +1,118 @@
+"""
+solve_panel against enumerating every panel.
+
+The solver must return a panel with the best total score among those
+satisfying every rule, fall back to relaxed rules when none does, and
+stay within its search budget.
+"""
+
+import itertools
+import time
+import numpy as np
+import pytest
+from ai.panel_rules import category_rules, check_rules, parse_rules, solve_panel
+
+
+CATEGORIES = ['chairperson', 'departmental', 'external']
+AFFILIATIONS = ['DRDO', 'IISc', 'IIT Delhi', 'IIT Bombay', 'ISRO']
+
+
+def _experts(rng, n):
+    return [
+        {'expert_id': f'expert{i}', 'expert_name': f'Expert {i}',
+         'category': CATEGORIES[int(rng.integers(0, 3))],
+         'affiliation': AFFILIATIONS[int(rng.integers(0, len(AFFILIATIONS)))],
+         'experience': f"{int(rng.integers(5, 35))} years",
+         'final_score': round(float(rng.uniform(20, 95)), 2)}
+        for i in range(n)
+    ]
+
+
+def _total(panel):
+    return sum(expert['final_score'] for expert in panel)
+
+
+def _best_total(experts, size, rules):
+    totals = [
+        _total(panel) for panel in itertools.combinations(experts, size)
+        if not check_rules(list(panel), rules)
+    ]
+    return max(totals) if totals else None
+
+
+RULE_SETS = [
+    [],
+    [{'type': 'distinct', 'field': 'affiliation'}],
+    [{'type': 'count', 'where': {'affiliation': {'not': 'DRDO'}, 'category': 'external'}, 'min': 1}],
+    [{'type': 'each', 'must': {'experience_years': {'min': 10}}},
+     {'type': 'distinct', 'field': 'affiliation'}],
+]
+
+
+@pytest.mark.parametrize('seed', range(12))
+@pytest.mark.parametrize('extra_rules', RULE_SETS)
+def test_best_panel_matches_enumeration(seed, extra_rules):
+    rng = np.random.default_rng(seed)
+    experts = _experts(rng, int(rng.integers(6, 14)))
+    rules = category_rules({'chairperson': 1, 'departmental': 1, 'external': 1}) + parse_rules(extra_rules)
+
+    solution = solve_panel(experts, 3, rules)
+    best = _best_total(experts, 3, rules)
+    panel = [expert for expert, _ in solution['panel']]
+
+    assert solution['optimal']
+    if best is None:
+        assert not solution['feasible']
+    else:
+        assert solution['feasible']
+        assert not check_rules(panel, rules)
+        assert _total(panel) == pytest.approx(best)
+
+
+def test_unmeetable_distinct_rule_still_fills_the_panel():
+    rng = np.random.default_rng(0)
+    experts = _experts(rng, 12)
+    for expert in experts:
+        expert['affiliation'] = 'DRDO'
+    rules = parse_rules([{'type': 'distinct', 'field': 'affiliation'}])
+
+    solution = solve_panel(experts, 5, rules)
+
+    assert len(solution['panel']) == 5
+    assert solution['relaxed'] and not solution['feasible']
+    selection = [selection_type for _, selection_type in solution['panel']]
+    assert selection.count('ai_recommended_fill') == 4
+
+
+def _hard_rules(rng, experts):
+    """Distinct affiliations plus two externals of one affiliation: infeasible, but only a search shows it."""
+    for expert in experts:
+        expert['affiliation'] = 'ABCDEFGH'[int(rng.integers(0, 8))]
+    return category_rules({'chairperson': 1, 'departmental': 3, 'external': 3}) + parse_rules([
+        {'type': 'distinct', 'field': 'affiliation'},
+        {'type': 'count', 'where': {'category': 'external', 'affiliation': 'A'}, 'min': 2}
+    ])
+
+
+def test_search_budget_bounds_runtime():
+    rng = np.random.default_rng(1)
+    experts = _experts(rng, 1000)
+    rules = _hard_rules(rng, experts)
+
+    started = time.perf_counter()
+    solution = solve_panel(experts, 7, rules, time_limit=0.5)
+
+    assert time.perf_counter() - started < 1.5
+    assert len(solution['panel']) == 7
+    assert not solution['optimal']
+
+
+def test_truncated_strict_attempt_is_not_reported_optimal():
+    rng = np.random.default_rng(1)
+    experts = _experts(rng, 200)
+    rules = _hard_rules(rng, experts)
+
+    solution = solve_panel(experts, 7, rules, node_limit=1000)
+
+    assert solution['relaxed'] and len(solution['panel']) == 7
+    assert not solution['optimal']
@@ -0,0 +1,51 @@
+"""
+Streaming reasons that break off partway.
+
+The Ollama client is replaced by a fake whose stream fails after a few
+chunks, so no server is needed.
+"""
+
+import pytest
+import ai.similarity_calculator as similarity_calculator
+from ai.similarity_calculator import ReasonRestart, llm_generate_reason_stream
+
+
+FULL_REASON = 'Strengths: radar signal processing. Gaps: none. Verdict: suitable.'
+
+
+class _BrokenStreamClient:
+    def generate_stream(self, prompt, model, options=None):
+        yield 'Strengths: '
+        yield 'radar'
+        raise ConnectionError('connection reset')
+
+
+@pytest.fixture
+def broken_stream(monkeypatch):
+    monkeypatch.setenv('USE_MOCK_LLM', 'false')
+    monkeypatch.setattr(similarity_calculator, '_check_ollama_available', lambda: True)
+    monkeypatch.setattr(similarity_calculator, 'get_ollama_client', lambda: _BrokenStreamClient())
+
+
+def _stream(expert_text):
+    return list(llm_generate_reason_stream('Radar engineer', expert_text, 'Dr. A', {'w1': 80.0}, 80.0))
+
+
+def test_broken_stream_is_replaced_by_the_full_reason(broken_stream, monkeypatch):
+    monkeypatch.setattr(similarity_calculator, '_get_ollama_response', lambda *args, **kwargs: FULL_REASON)
+    chunks = _stream('Radar DSP expert one')
+
+    assert chunks[:2] == ['Strengths: ', 'radar']
+    assert isinstance(chunks[-1], ReasonRestart)
+    assert chunks[-1] == FULL_REASON
+
+
+def test_broken_stream_falls_back_without_caching_partial_text(broken_stream, monkeypatch):
+    monkeypatch.setattr(similarity_calculator, '_get_ollama_response', lambda *args, **kwargs: None)
+    chunks = _stream('Radar DSP expert two')
+
+    assert isinstance(chunks[-1], ReasonRestart)
+    assert chunks[-1] == similarity_calculator._generate_fallback_reason('Radar engineer', 'Radar DSP expert two')
+
+    # Nothing was cached, so a second request streams (and breaks) again
+    assert _stream('Radar DSP expert two')[:2] == ['Strengths: ', 'radar']
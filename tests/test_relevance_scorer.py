@@ -0,0 +1,158 @@
+"""
+Batch scoring against the per-pair scorer.
+
+batch_calculate_relevance_scores must give every expert the scores
+calculate_relevance_score gives that expert on its own. Embeddings are
+stored on the documents, so no model or database is needed.
+"""
+
+import numpy as np
+import pytest
+import ai.relevance_scorer as relevance_scorer
+from ai.expert_index import ExpertIndex
+from ai.relevance_scorer import (
+    DEFAULT_WEIGHTS,
+    ScoringBatch,
+    batch_calculate_relevance_scores,
+    calculate_relevance_score
+)
+
+
+DIM = 32
+CATEGORIES = ['chairperson', 'departmental', 'external']
+
+
+def _vector(rng):
+    return rng.normal(size=DIM).tolist()
+
+
+def _documents(seed, n_experts=25, n_candidates=8):
+    rng = np.random.default_rng(seed)
+    item = {'_id': 'item', 'title': 'Scientist B', 'description': 'Radar signal processing',
+            'embedding': _vector(rng)}
+    experts = [
+        {'_id': f'expert{i}', 'name': f'Expert {i}', 'category': CATEGORIES[i % 3],
+         'role': 'Scientist', 'skills': ['Radar', 'DSP'], 'skillEmbedding': _vector(rng)}
+        for i in range(n_experts)
+    ]
+    candidates = [
+        {'_id': f'candidate{i}', 'name': f'Candidate {i}', 'skills': ['VLSI'], 'skillEmbedding': _vector(rng)}
+        for i in range(n_candidates)
+    ]
+    return item, experts, candidates
+
+
+@pytest.mark.parametrize('with_candidates', [True, False])
+@pytest.mark.parametrize('weights', [None, {'w1_item_expert_cosine': 0.7, 'w2_item_expert_llm': 0.1,
+                                            'w3_expert_candidates_cosine': 0.1, 'w4_expert_candidates_llm': 0.1}])
+def test_batch_matches_per_pair_scores(with_candidates, weights):
+    item, experts, candidates = _documents(seed=1)
+    candidates = candidates if with_candidates else None
+
+    batch = batch_calculate_relevance_scores(
+        item, experts, candidates, weights, use_llm=False,
+        quantization='none', use_surrogate=False, use_cross_encoder=False
+    )
+
+    assert len(batch) == len(experts)
+    by_id = {result['expert_id']: result for result in batch}
+    for expert in experts:
+        single = calculate_relevance_score(
+            item, expert, candidates, weights or DEFAULT_WEIGHTS, use_llm=False,
+            use_surrogate=False, use_cross_encoder=False
+        )
+        result = by_id[expert['_id']]
+        assert result['final_score'] == pytest.approx(single['final_score'], abs=0.011)
+        for key, value in single['component_scores'].items():
+            assert result['component_scores'][key] == pytest.approx(value, abs=0.011)
+        assert result['w2_method'] == single['w2_method'] == 'cosine'
+
+
+def test_batch_is_ranked_best_first():
+    item, experts, candidates = _documents(seed=2)
+    scores = [r['final_score'] for r in batch_calculate_relevance_scores(item, experts, candidates)]
+    assert scores == sorted(scores, reverse=True)
+
+
+def test_scoring_batch_reused_for_a_second_pass():
+    item, experts, candidates = _documents(seed=3)
+    batch = ScoringBatch(item, experts, candidates, quantization='none',
+                         use_surrogate=False, use_cross_encoder=False)
+    assert batch.score() == batch.score()
+    assert batch.score() == batch_calculate_relevance_scores(
+        item, experts, candidates, quantization='none', use_surrogate=False, use_cross_encoder=False
+    )
+
+
+def test_no_experts():
+    item, _, candidates = _documents(seed=4)
+    assert batch_calculate_relevance_scores(item, [], candidates) == []
+
+
+def test_int8_keeps_experts_outside_the_shortlist(monkeypatch):
+    item, experts, candidates = _documents(seed=5)
+    index = ExpertIndex(quantization='int8')
+    index.built = True
+    index._add_many(experts[:-2])  # The last two have no stored codes
+    monkeypatch.setattr(relevance_scorer, 'get_expert_index', lambda: index)
+
+    options = dict(use_surrogate=False, use_cross_encoder=False)
+    exact = {r['expert_id']: r for r in batch_calculate_relevance_scores(
+        item, experts, candidates, quantization='none', **options)}
+    results = batch_calculate_relevance_scores(
+        item, experts, candidates, quantization='int8', rescore_top=3, use_llm=True, **options)
+
+    assert len(results) == len(experts)
+    approximate = {r['expert_id'] for r in results if r.get('approximate')}
+    assert len(approximate) == len(experts) - 3 * len(CATEGORIES) - 2
+    assert not approximate & {expert['_id'] for expert in experts[-2:]}
+    for result in results:
+        expected = exact[result['expert_id']]['component_scores']
+        tolerance = 0.5 if result['expert_id'] in approximate else 0
+        for key in ('w1_item_expert_cosine', 'w3_expert_candidates_cosine', 'w4_expert_candidates_llm'):
+            assert result['component_scores'][key] == pytest.approx(expected[key], abs=tolerance)
+        if result['expert_id'] in approximate:
+            # No LLM calls for approximate experts
+            assert result['w2_method'] == 'cosine'
+
+
+def test_int8_is_ignored_without_int8_codes(monkeypatch):
+    item, experts, candidates = _documents(seed=5)
+    index = ExpertIndex(quantization='none')
+    index.built = True
+    index._add_many(experts)
+    monkeypatch.setattr(relevance_scorer, 'get_expert_index', lambda: index)
+
+    options = dict(use_surrogate=False, use_cross_encoder=False)
+    exact = batch_calculate_relevance_scores(item, experts, candidates, quantization='none', **options)
+    results = batch_calculate_relevance_scores(
+        item, experts, candidates, quantization='int8', rescore_top=3, **options)
+
+    assert not any(r.get('approximate') for r in results)
+    assert [r['component_scores'] for r in results] == [r['component_scores'] for r in exact]
+
+
+def test_batched_llm_results_reported_as_batches_finish(monkeypatch):
+    item, experts, candidates = _documents(seed=6)
+    events = []
+
+    def fake_batch_similarity(text, texts, batch_size=None, deadline=None, on_score=None):
+        for start in range(0, len(texts), batch_size):
+            for n in range(start, min(start + batch_size, len(texts))):
+                on_score(n, 50.0)
+            events.append('batch')
+        return [50.0] * len(texts)
+
+    monkeypatch.setattr(relevance_scorer, 'llm_batch_similarity', fake_batch_similarity)
+    batch = ScoringBatch(item, experts, candidates, quantization='none',
+                         use_surrogate=False, use_cross_encoder=False)
+    reported = []
+    results = batch.score(use_llm=True, llm_rerank_top=2, llm_batch_size=2,
+                          on_result=lambda result: (reported.append(result), events.append('result')))
+
+    # Every LLM expert is reported once, each before the next batch is sent
+    assert events[:3] == ['result', 'result', 'batch']
+    llm_results = [r for r in results if r['w2_method'] == 'llm']
+    assert len(llm_results) == 2 * len(CATEGORIES)
+    assert sorted(r['expert_id'] for r in reported) == sorted(r['expert_id'] for r in llm_results)
+    assert all(r in llm_results for r in reported)
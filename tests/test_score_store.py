@@ -0,0 +1,73 @@
+"""
+Targeted invalidation of stored scores.
+
+An expert change must mark only that expert's rows stale and an item
+change only that item's rows; rescoring stale rows never calls the LLM.
+"""
+
+import pytest
+from ai import score_store
+from ai.score_store import (
+    get_stale_scores, init_score_store, invalidate_outdated_scores, invalidate_scores,
+    load_scored_experts, needs_llm, rescore_options, save_scores
+)
+
+mongomock = pytest.importorskip('mongomock')
+
+
+ITEMS = [{'_id': f'item{i}', 'embeddingFingerprint': f'item{i}-v1', 'candidateCount': 0} for i in range(2)]
+EXPERTS = [{'_id': f'expert{i}', 'embeddingFingerprint': f'expert{i}-v1'} for i in range(3)]
+
+
+def _scored(expert, w2_method='cosine'):
+    return {'expert_id': expert['_id'], 'expert_name': expert['_id'], 'category': 'external',
+            'final_score': 50.0, 'component_scores': {'w1': 50.0}, 'w2_method': w2_method}
+
+
+@pytest.fixture
+def scores():
+    collection = mongomock.MongoClient().db.expert_scores
+    init_score_store(collection)
+    for item in ITEMS:
+        save_scores(item, EXPERTS, [_scored(expert) for expert in EXPERTS])
+    yield collection
+    score_store._scores_collection = None
+
+
+def _stale_pairs(collection):
+    return {(row['itemId'], row['expertId']) for row in collection.find({'stale': True})}
+
+
+def test_expert_change_marks_only_its_rows(scores):
+    assert invalidate_scores(expert_ids=['expert1']) == 2
+    assert _stale_pairs(scores) == {('item0', 'expert1'), ('item1', 'expert1')}
+
+
+def test_item_change_marks_only_its_rows(scores):
+    assert invalidate_scores(item_ids=['item0']) == 3
+    assert _stale_pairs(scores) == {('item0', f'expert{i}') for i in range(3)}
+    assert [row['expertId'] for row in get_stale_scores('item1')] == []
+
+
+def test_outdated_item_stamps_mark_only_that_item(scores):
+    changed = dict(ITEMS[1], embeddingFingerprint='item1-v2')
+    assert invalidate_outdated_scores(ITEMS[0]) == 0
+    assert invalidate_outdated_scores(changed) == 3
+    assert _stale_pairs(scores) == {('item1', f'expert{i}') for i in range(3)}
+
+
+def test_llm_rows_rescore_without_llm_and_stay_pending(scores):
+    save_scores(ITEMS[0], EXPERTS, [_scored(EXPERTS[0], 'llm')])
+    invalidate_scores(expert_ids=['expert0'])
+    row = next(row for row in get_stale_scores('item0') if row['expertId'] == 'expert0')
+
+    assert needs_llm(row)
+    assert 'use_llm' not in rescore_options(row['w2Method'])
+
+    save_scores(ITEMS[0], EXPERTS, [_scored(EXPERTS[0])], llm_pending=needs_llm(row))
+    stored = {expert['expert_id']: expert for expert in load_scored_experts('item0')}
+    assert stored['expert0']['llm_pending'] and not stored['expert1']['llm_pending']
+
+    save_scores(ITEMS[0], EXPERTS, [_scored(EXPERTS[0], 'llm')], llm_pending=True)
+    stored = {expert['expert_id']: expert for expert in load_scored_experts('item0')}
+    assert not stored['expert0']['llm_pending']